@@ -1,22 +1,18 @@
-import copy
+from .tracer import ListSink, GeneratorSink, CounterSink
 
-def get_binary_search_steps(arr, target):
+
+def trace_binary_search(tracer, target):
     """
-    Binary Search অ্যালগরিদমের প্রতিটি ধাপ তৈরি করে।
-    এটি মনে করে যে ইনপুট অ্যারেটি সাজানো (sorted) আছে।
+    Binary Search অ্যালগরিদমের প্রতিটি ধাপ তৈরি হওয়ার সাথে সাথে yield করে।
+    এটি মনে করে যে ইনপুট অ্যারেটি (tracer.array) সাজানো (sorted) আছে।
+    সাধারণ fields ছাড়াও প্রতিটি ধাপে event, event_args, low, high, mid, found থাকে
+    (event-এর লেখা algorithms.messages-এ, শুধু দরকার হলে তৈরি হয়)।
     """
-    steps = []
+    arr = tracer.array
     
     # প্রাথমিক ধাপ ট্র‍্যাক করা
-    steps.append({
-        "array": copy.deepcopy(arr), 
-        "action": f"Search started for {target}", 
-        "indices": [],
-        "low": 0,
-        "high": len(arr) - 1,
-        "mid": -1,
-        "found": False
-    })
+    yield tracer.step("initial", (), event='search.start', event_args=(target,),
+                      low=0, high=len(arr) - 1, mid=-1, found=False)
 
     low = 0
     high = len(arr) - 1
@@ -26,68 +22,57 @@ def get_binary_search_steps(arr, target):
         mid = (low + high) // 2
         
         # মধ্যম উপাদান (mid element) ট্র‍্যাক করা
-        steps.append({
-            "array": copy.deepcopy(arr), 
-            "action": f"Checking mid element at index {mid}: Value is {arr[mid]}", 
-            "indices": [mid],
-            "low": low,
-            "high": high,
-            "mid": mid,
-            "found": False
-        })
+        yield tracer.step("check_mid", (mid,),
+                          event='binary.check_mid', event_args=(mid, arr[mid]),
+                          low=low, high=high, mid=mid, found=False)
         
         # তুলনা
-        if arr[mid] == target:
+        order = tracer.compare_value(mid, target)
+        if order == 0:
             found = True
             break
-        elif arr[mid] < target:
+        elif order < 0:
             # মধ্যম উপাদানের ডান দিকে সার্চ করা হবে
             low = mid + 1
-            steps.append({
-                "array": copy.deepcopy(arr), 
-                "action": f"Target is greater than {arr[mid]}. Setting new low to {low}.", 
-                "indices": [],
-                "low": low,
-                "high": high,
-                "mid": mid,
-                "found": False
-            })
+            yield tracer.step("move_low", (),
+                              event='binary.move_low', event_args=(arr[mid], low),
+                              low=low, high=high, mid=mid, found=False)
         else:
             # মধ্যম উপাদানের বাম দিকে সার্চ করা হবে
             high = mid - 1
-            steps.append({
-                "array": copy.deepcopy(arr), 
-                "action": f"Target is less than {arr[mid]}. Setting new high to {high}.", 
-                "indices": [],
-                "low": low,
-                "high": high,
-                "mid": mid,
-                "found": False
-            })
+            yield tracer.step("move_high", (),
+                              event='binary.move_high', event_args=(arr[mid], high),
+                              low=low, high=high, mid=mid, found=False)
 
     # চূড়ান্ত ফলাফল ট্র‍্যাক করা
     if found:
-        steps.append({
-            "array": copy.deepcopy(arr), 
-            "action": f"Target {target} found at index {mid}", 
-            "indices": [mid],
-            "low": low,
-            "high": high,
-            "mid": mid,
-            "found": True
-        })
+        yield tracer.step("found", (mid,), event='search.found', event_args=(target, mid),
+                          low=low, high=high, mid=mid, found=True)
     else:
-        steps.append({
-            "array": copy.deepcopy(arr), 
-            "action": f"Target {target} not found in the array.", 
-            "indices": [],
-            "low": low,
-            "high": high,
-            "mid": -1,
-            "found": False
-        })
-        
-    return steps
+        yield tracer.step("not_found", (), event='binary.not_found', event_args=(target,),
+                          low=low, high=high, mid=-1, found=False)
+
+
+def iter_binary_search_steps(arr, target):
+    """
+    Binary Search অ্যালগরিদমের প্রতিটি ধাপ তৈরি হওয়ার সাথে সাথে yield করে।
+    """
+    return GeneratorSink().run(trace_binary_search, arr, target)
+
+
+def get_binary_search_steps(arr, target):
+    """
+    Binary Search অ্যালগরিদমের সব ধাপ (steps) একটি list হিসেবে ফেরত দেয়।
+    """
+    return ListSink().run(trace_binary_search, arr, target)['steps']
+
+
+def get_binary_search_stats(arr, target):
+    """
+    কোনো ধাপ (steps) তৈরি না করে Binary Search চালায় এবং শুধু counters ফেরত দেয়
+    (steps, comparisons, swaps, writes, max_depth)।
+    """
+    return CounterSink().run(trace_binary_search, arr, target)
 
 if __name__ == '__main__':
     # দ্রুত পরীক্ষা করার জন্য
@@ -6,29 +6,173 @@ class Node:
         self.left = left
         self.right = right
 
+    # Extra per-node fields of the balanced trees (AVL height, red-black color)
+    def attrs(self):
+        return {}
+
+    # Restores those fields from a serialized node, once its children are attached
+    def load(self, data):
+        pass
+
+    # Recomputes derived fields after the children changed
+    def update(self):
+        pass
+
+    # The node on its own, children still None (filled in by to_dict)
+    def _entry(self):
+        entry = {'value': self.value, 'left': None, 'right': None}
+        entry.update(self.attrs())
+        return entry
+
     # Helper function to convert Node structure to a serializable dictionary
     def to_dict(self):
-        # Recursively convert the tree structure to a dictionary
-        return {
-            'value': self.value,
+        # Walks the tree with an explicit stack, so skewed trees cannot hit the recursion limit
+        root = self._entry()
+        stack = [(self, root)]
+        while stack:
+            node, entry = stack.pop()
             # If a child is None, it serializes to JSON's null.
-            'left': self.left.to_dict() if self.left else None,
-            'right': self.right.to_dict() if self.right else None,
-        }
+            if node.left is not None:
+                entry['left'] = child = node.left._entry()
+                stack.append((node.left, child))
+            if node.right is not None:
+                entry['right'] = child = node.right._entry()
+                stack.append((node.right, child))
+        return root
+
+
+class AVLNode(Node):
+    def __init__(self, value, left=None, right=None):
+        super().__init__(value, left, right)
+        self.height = 1
+
+    def attrs(self):
+        return {'height': self.height}
+
+    def load(self, data):
+        # Heights are recomputed rather than trusted
+        self.update()
+
+    def update(self):
+        self.height = 1 + max(height(self.left), height(self.right))
+
+
+class RBNode(Node):
+    def __init__(self, value, left=None, right=None):
+        super().__init__(value, left, right)
+        # New nodes are always red
+        self.red = True
+
+    def attrs(self):
+        return {'color': 'red' if self.red else 'black'}
+
+    def load(self, data):
+        self.red = data.get('color') == 'red'
+
+
+def height(node):
+    return node.height if node else 0
+
+def is_red(node):
+    return node is not None and node.red
+
+def _is_node_dict(data):
+    return isinstance(data, dict) and 'value' in data
 
 # Helper function to convert a dictionary back into a Node structure
-def from_dict(data):
+def from_dict(data, node_class=Node):
     # CRITICAL: Handles the initial state where data is None/null
-    if data is None: 
+    # Unexpected data structures are treated as empty (sub)trees
+    if not _is_node_dict(data):
+        return None
+
+    root = node_class(int(data['value']))
+    # Nodes in pre-order: walked backwards, every node comes after its children
+    created = [(root, data)]
+    stack = [(root, data)]
+    while stack:
+        node, entry = stack.pop()
+        left, right = entry.get('left'), entry.get('right')
+        if _is_node_dict(left):
+            node.left = child = node_class(int(left['value']))
+            created.append((child, left))
+            stack.append((child, left))
+        if _is_node_dict(right):
+            node.right = child = node_class(int(right['value']))
+            created.append((child, right))
+            stack.append((child, right))
+
+    for node, entry in reversed(created):
+        node.load(entry)
+    return root
+
+# Per-node fields of the balanced trees, as parallel arrays of the flat format
+FLAT_ATTRS = ('height', 'color')
+
+def to_flat(root):
+    """
+    Flat tree format: the nodes in pre-order (the root is node 0) as parallel
+    arrays 'values', 'left' and 'right', where 'left'/'right' hold the index of
+    the child node or -1. Balanced trees add a 'height' or 'color' array.
+    """
+    flat = {'format': 'flat', 'values': [], 'left': [], 'right': []}
+    if root is None:
+        return flat
+    values, lefts, rights = flat['values'], flat['left'], flat['right']
+    attrs = {key: [] for key in root.attrs()}
+    flat.update(attrs)
+
+    # Pre-order walk; every child's index is patched into its parent when it is reached
+    stack = [(root, -1, None)]
+    while stack:
+        node, parent, links = stack.pop()
+        index = len(values)
+        if parent >= 0:
+            links[parent] = index
+        values.append(node.value)
+        lefts.append(-1)
+        rights.append(-1)
+        for key, value in node.attrs().items():
+            attrs[key].append(value)
+        if node.right is not None:
+            stack.append((node.right, index, rights))
+        if node.left is not None:
+            stack.append((node.left, index, lefts))
+    return flat
+
+def from_flat(flat, node_class=Node):
+    """Builds the nodes of a tree in the flat format (see to_flat); raises ValueError if it is malformed."""
+    if not isinstance(flat, dict):
+        raise ValueError("A flat tree must be an object")
+    values = flat.get('values') or []
+    lefts = flat.get('left') or []
+    rights = flat.get('right') or []
+    count = len(values)
+    if len(lefts) != count or len(rights) != count:
+        raise ValueError("'values', 'left' and 'right' must have the same length")
+    if count == 0:
         return None
-    if not isinstance(data, dict) or 'value' not in data:
-        # Fallback for unexpected data structure, treat as empty
-        return None 
-        
-    node = Node(int(data['value'])) 
-    node.left = from_dict(data.get('left'))
-    node.right = from_dict(data.get('right'))
-    return node
+
+    attrs = [key for key in FLAT_ATTRS if key in flat]
+    nodes = [node_class(int(value)) for value in values]
+    linked = 0
+    for index in range(count):
+        node = nodes[index]
+        for side, links in (('left', lefts), ('right', rights)):
+            child = links[index]
+            if child == -1:
+                continue
+            # Children come after their parent in pre-order: rules out cycles
+            if not isinstance(child, int) or not index < child < count:
+                raise ValueError(f"Invalid child index {child} of node {index}")
+            setattr(node, side, nodes[child])
+            linked += 1
+    if linked != count - 1:
+        raise ValueError("Every node except the root must be the child of exactly one node")
+
+    for index in range(count - 1, -1, -1):
+        nodes[index].load({key: flat[key][index] for key in attrs})
+    return nodes[0]
 
 # Finds the in-order successor (smallest in the right subtree)
 def find_min(node):
@@ -37,73 +181,577 @@ def find_min(node):
         current = current.left
     return current
 
-def get_bst_steps(tree_state, operation, value):
+# Nodes of the tree, parents before children
+def preorder_nodes(root):
+    nodes = []
+    stack = [root] if root else []
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        if node.right is not None:
+            stack.append(node.right)
+        if node.left is not None:
+            stack.append(node.left)
+    return nodes
+
+# Values of the tree in sorted order
+def inorder_values(root):
+    values = []
+    stack = []
+    node = root
+    while stack or node is not None:
+        while node is not None:
+            stack.append(node)
+            node = node.left
+        node = stack.pop()
+        values.append(node.value)
+        node = node.right
+    return values
+
+
+class StepBudgetExceeded(ValueError):
     """
-    Processes a BST operation and returns visualization steps and the new tree state.
+    A batch stopped after recording more than `max_steps` steps (`steps` so
+    far). The operations up to that point were already applied to the tree.
     """
-    
-    # 1. Deserialize the tree state
-    root = from_dict(tree_state)
-    steps = []
 
-    if operation == 'insert':
-        # Insert logic
-        def insert_recursive(node, value):
-            if node is None:
-                steps.append({'value': value, 'action': 'Inserted', 'path': []})
-                return Node(value)
+    def __init__(self, message, steps, max_steps):
+        super().__init__(message)
+        self.steps = steps
+        self.max_steps = max_steps
+
+
+class BinarySearchTree:
+    """
+    A BST that stays alive between operations (see bst_sessions.py).
+
+    Every operation only walks one root-to-leaf path, and remembers the nodes
+    on it, so the change can be reported as a structural diff of O(height)
+    nodes instead of re-sending the whole tree.
+
+    The plain tree never rebalances; AVLTree and RedBlackTree hook into the
+    same walk through _fix() (applied to every node on the way back up) and
+    _finish(), and record their rotations as steps.
+    """
+    node_class = Node
+
+    def __init__(self, root=None):
+        self.root = root
+
+    @classmethod
+    def from_state(cls, tree_state, tree_format='nested'):
+        """Loads a tree sent by the client in the 'nested' (dict) or 'flat' format."""
+        if tree_format == 'flat':
+            root = from_flat(tree_state, cls.node_class) if tree_state is not None else None
+        else:
+            root = from_dict(tree_state, cls.node_class)
+        tree = cls(root)
+        if not tree.is_valid():
+            # e.g. a plain BST (or a tree of another mode) sent to a balanced mode
+            tree = cls.from_sorted(inorder_values(tree.root))
+        return tree
+
+    @classmethod
+    def from_sorted(cls, values, steps=None):
+        """
+        Builds a balanced tree from sorted, distinct values in O(n): the middle
+        value becomes the root and both halves are built the same way. When a
+        `steps` list is given, an insert step is recorded for every node.
+        """
+        tree = cls()
+        created = []
+        # (slice start, slice end, parent, attach as left child)
+        stack = [(0, len(values), None, False)]
+        while stack:
+            lo, hi, parent, left = stack.pop()
+            if lo == hi:
+                continue
+            mid = (lo + hi) // 2
+            node = tree._attach(cls.node_class(values[mid]), parent, left)
+            created.append(node)
+            stack.append((mid + 1, hi, node, False))
+            stack.append((lo, mid, node, True))
+
+        # Pre-order, so walked backwards every node comes after its children
+        for node in reversed(created):
+            node.update()
+        if steps is not None:
+            record_build_steps(created, steps)
+        return tree
+
+    def _attach(self, node, parent, left):
+        if parent is None:
+            self.root = node
+        elif left:
+            parent.left = node
+        else:
+            parent.right = node
+        return node
 
+    def is_valid(self):
+        """Whether the tree satisfies the balance invariant of its mode."""
+        return True
+
+    def to_dict(self):
+        return self.root.to_dict() if self.root else None
+
+    def to_state(self, tree_format='nested'):
+        return to_flat(self.root) if tree_format == 'flat' else self.to_dict()
+
+    def apply(self, operation, value):
+        """
+        Runs one insert/delete/search; returns (steps, diff), see
+        structural_diff() for the diff format.
+        """
+        steps, diff, _ = self.apply_batch([(operation, value)])
+        return steps, diff
+
+    def apply_batch(self, operations, max_steps=None):
+        """
+        Runs a list of (operation, value) pairs in order. Returns (steps, diff,
+        spans): the steps of all operations one after the other, one diff for
+        the whole batch, and (first step, step count) of every operation.
+        Raises StepBudgetExceeded as soon as more than `max_steps` steps were
+        recorded (a skewed plain tree costs O(n) steps per operation).
+        """
+        steps = []
+        # Nodes whose value or children may have changed
+        touched = []
+        # Nodes taken out of the tree
+        unlinked = []
+        removed = []
+        spans = []
+
+        for operation, value in operations:
+            first = len(steps)
+            if operation == 'insert':
+                self._insert(value, steps, touched)
+            elif operation == 'delete':
+                if self._delete(value, steps, touched, unlinked):
+                    removed.append(value)
+            elif operation == 'search':
+                self._search(value, steps)
+            else:
+                raise ValueError(f"Unsupported BST operation: {operation}")
+            self._finish(touched)
+            spans.append((first, len(steps) - first))
+            if max_steps is not None and len(steps) > max_steps:
+                raise StepBudgetExceeded(f"The batch would record more than {max_steps} steps "
+                                         f"({len(steps)} after {len(spans)} operations)", len(steps), max_steps)
+
+        return steps, structural_diff(self.root, touched, unlinked, removed), spans
+
+    def build(self, values):
+        """
+        Replaces the whole tree by a balanced one holding `values` (see
+        from_sorted); returns (steps, diff).
+        """
+        steps = []
+        old_values = inorder_values(self.root)
+        self.root = type(self).from_sorted(sorted_distinct(values), steps).root
+        return steps, structural_diff(self.root, preorder_nodes(self.root), [], old_values)
+
+    def _search(self, value, steps):
+        node = self.root
+        while node is not None:
             steps.append({'value': node.value, 'action': 'Visiting', 'path': []})
-            
             if value < node.value:
                 steps.append({'value': node.value, 'action': 'Move Left', 'path': []})
-                node.left = insert_recursive(node.left, value)
+                node = node.left
             elif value > node.value:
                 steps.append({'value': node.value, 'action': 'Move Right', 'path': []})
-                node.right = insert_recursive(node.right, value)
+                node = node.right
             else:
-                steps.append({'value': node.value, 'action': 'Value Already Exists (Skipping)', 'path': []})
-            
-            return node
+                steps.append({'value': node.value, 'action': 'Target Found', 'path': []})
+                return True
+        steps.append({'value': value, 'action': 'Value Not Found', 'path': []})
+        return False
 
+    def _relink(self, path, subtree, steps, touched):
+        """
+        Hangs `subtree` back into the last node of `path` (a list of (node,
+        went_left) pairs from the root down) and runs _fix() on every node of
+        the path, bottom-up, as a recursive implementation would on return.
+        """
+        for node, went_left in reversed(path):
+            if went_left:
+                node.left = subtree
+            else:
+                node.right = subtree
+            subtree = self._fix(node, steps, touched)
+        self.root = subtree
+
+    def _insert(self, value, steps, touched):
         # Handle root insertion (when tree is empty)
-        if root is None:
-            root = Node(value)
+        if self.root is None:
+            self.root = self.node_class(value)
+            touched.append(self.root)
             steps.append({'value': value, 'action': 'Root Inserted', 'path': []})
+            return
+
+        # Insert logic: walk down iteratively, remembering the path
+        path = []
+        node = self.root
+        while node is not None:
+            touched.append(node)
+            steps.append({'value': node.value, 'action': 'Visiting', 'path': []})
+
+            if value < node.value:
+                steps.append({'value': node.value, 'action': 'Move Left', 'path': []})
+                path.append((node, True))
+                node = node.left
+            elif value > node.value:
+                steps.append({'value': node.value, 'action': 'Move Right', 'path': []})
+                path.append((node, False))
+                node = node.right
+            else:
+                steps.append({'value': node.value, 'action': 'Value Already Exists (Skipping)', 'path': []})
+                break
         else:
-            root = insert_recursive(root, value)
-            
-    elif operation == 'delete':
-        # Delete logic (omitted for brevity, assume correctness)
-        def delete_recursive(node, value):
+            steps.append({'value': value, 'action': 'Inserted', 'path': []})
+            node = self.node_class(value)
+            touched.append(node)
+
+        self._relink(path, node, steps, touched)
+
+    def _delete(self, value, steps, touched, unlinked):
+        """Returns True if the value was found (and removed)."""
+        found = False
+        path = []
+        node = self.root
+        while True:
             if node is None:
                 steps.append({'value': value, 'action': 'Value Not Found', 'path': []})
-                return None
-            
+                break
+
+            touched.append(node)
             steps.append({'value': node.value, 'action': 'Visiting', 'path': []})
 
             if value < node.value:
-                node.left = delete_recursive(node.left, value)
+                path.append((node, True))
+                node = node.left
             elif value > node.value:
-                node.right = delete_recursive(node.right, value)
+                path.append((node, False))
+                node = node.right
             else:
                 steps.append({'value': node.value, 'action': 'Target Found', 'path': []})
-                if node.left is None: return node.right
-                if node.right is None: return node.left
+                found = True
+                if node.left is None or node.right is None:
+                    unlinked.append(node)
+                    node = node.left if node.left is not None else node.right
+                    break
 
+                # Two children: the successor's value moves up here and the
+                # successor node itself is unlinked from the right subtree
                 temp = find_min(node.right)
-                node.value = temp.value
-                node.right = delete_recursive(node.right, temp.value)
+                node.value = value = temp.value
+                path.append((node, False))
+                node = node.right
+
+        self._relink(path, node, steps, touched)
+        return found
+
+    def _fix(self, node, steps, touched):
+        """Restores the balance of `node` on the way back up; returns the subtree root."""
+        return node
+
+    def _finish(self, touched):
+        """Called once the operation has reached the root."""
+
+    def _rotate_left(self, node, steps, touched):
+        steps.append({'value': node.value, 'action': 'Rotate Left', 'path': []})
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        node.update()
+        pivot.update()
+        touched.append(node)
+        touched.append(pivot)
+        return pivot
+
+    def _rotate_right(self, node, steps, touched):
+        steps.append({'value': node.value, 'action': 'Rotate Right', 'path': []})
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        node.update()
+        pivot.update()
+        touched.append(node)
+        touched.append(pivot)
+        return pivot
+
+
+class AVLTree(BinarySearchTree):
+    """
+    AVL tree: the heights of the two subtrees of every node differ by at most
+    one, so the height stays below 1.44 log2(n).
+    """
+    node_class = AVLNode
+
+    def is_valid(self):
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            if abs(height(node.left) - height(node.right)) > 1:
+                return False
+            stack.extend(child for child in (node.left, node.right) if child)
+        return True
+
+    def _fix(self, node, steps, touched):
+        node.update()
+        balance = height(node.left) - height(node.right)
+        if balance > 1:
+            # Left-right case: turn it into a left-left case first
+            if height(node.left.left) < height(node.left.right):
+                node.left = self._rotate_left(node.left, steps, touched)
+            return self._rotate_right(node, steps, touched)
+        if balance < -1:
+            if height(node.right.right) < height(node.right.left):
+                node.right = self._rotate_right(node.right, steps, touched)
+            return self._rotate_left(node, steps, touched)
+        return node
+
+
+class RedBlackTree(BinarySearchTree):
+    """
+    Left-leaning red-black tree (Sedgewick): a red node is always the left
+    child of a black one, and every path from the root down to a missing child
+    passes the same number of black nodes, so the height stays below 2 log2(n).
+    """
+    node_class = RBNode
+
+    def is_valid(self):
+        if is_red(self.root):
+            return False
+        black_heights = set()
+        stack = [(self.root, 0)]
+        while stack:
+            node, blacks = stack.pop()
+            if node is None:
+                black_heights.add(blacks)
+                continue
+            if is_red(node.right) or (node.red and is_red(node.left)):
+                return False
+            blacks += not node.red
+            stack.append((node.left, blacks))
+            stack.append((node.right, blacks))
+        return len(black_heights) == 1
+
+    def _rotate_left(self, node, steps, touched):
+        pivot = super()._rotate_left(node, steps, touched)
+        pivot.red = node.red
+        node.red = True
+        return pivot
+
+    def _rotate_right(self, node, steps, touched):
+        pivot = super()._rotate_right(node, steps, touched)
+        pivot.red = node.red
+        node.red = True
+        return pivot
+
+    @classmethod
+    def from_sorted(cls, values, steps=None):
+        """
+        Builds a balanced left-leaning red-black tree from sorted, distinct
+        values in O(n). The tree is built as a 2-3 tree of black height b
+        (which holds between 2^b - 1 and 3^b - 1 values): a slice becomes a
+        2-node (one black node) when its two halves fit below it, otherwise a
+        3-node (a black node with a red left child) over three thirds.
+        """
+        tree = cls()
+        created = []
+        count = len(values)
+        # The largest black height with 2^b - 1 <= count
+        stack = [(0, count, (count + 1).bit_length() - 1, None, False)]
+        while stack:
+            lo, hi, black_height, parent, left = stack.pop()
+            if black_height == 0:
+                continue
+            size = hi - lo
+            child_max = 3 ** (black_height - 1) - 1
+            if size - 1 <= 2 * child_max:
+                mid = lo + (size - 1) // 2
+                node = tree._attach(RBNode(values[mid]), parent, left)
+                node.red = False
+                created.append(node)
+                stack.append((mid + 1, hi, black_height - 1, node, False))
+                stack.append((lo, mid, black_height - 1, node, True))
+            else:
+                first = (size - 2) // 3
+                third = (size - 2 - first) // 2
+                low = lo + first
+                high = hi - third - 1
+                node = tree._attach(RBNode(values[high]), parent, left)
+                node.red = False
+                node.left = red = RBNode(values[low])
+                created.append(node)
+                created.append(red)
+                stack.append((high + 1, hi, black_height - 1, node, False))
+                stack.append((low + 1, high, black_height - 1, red, False))
+                stack.append((lo, low, black_height - 1, red, True))
+
+        if steps is not None:
+            record_build_steps(created, steps)
+        return tree
+
+    def _flip_colors(self, node, steps, touched):
+        steps.append({'value': node.value, 'action': 'Color Flip', 'path': []})
+        for n in (node, node.left, node.right):
+            n.red = not n.red
+            touched.append(n)
+
+    def _fix(self, node, steps, touched):
+        if is_red(node.right) and not is_red(node.left):
+            node = self._rotate_left(node, steps, touched)
+        if is_red(node.left) and is_red(node.left.left):
+            node = self._rotate_right(node, steps, touched)
+        if is_red(node.left) and is_red(node.right):
+            self._flip_colors(node, steps, touched)
+        return node
+
+    def _finish(self, touched):
+        # The root is always black
+        if self.root is not None and self.root.red:
+            self.root.red = False
+            touched.append(self.root)
+
+    def _move_red_left(self, node, steps, touched):
+        # Makes node.left or one of its children red, before descending left
+        self._flip_colors(node, steps, touched)
+        if is_red(node.right.left):
+            node.right = self._rotate_right(node.right, steps, touched)
+            node = self._rotate_left(node, steps, touched)
+            self._flip_colors(node, steps, touched)
+        return node
+
+    def _move_red_right(self, node, steps, touched):
+        self._flip_colors(node, steps, touched)
+        if is_red(node.left.left):
+            node = self._rotate_right(node, steps, touched)
+            self._flip_colors(node, steps, touched)
+        return node
+
+    def _delete(self, value, steps, touched, unlinked):
+        # The top-down deletion below expects the value to be present
+        node = self.root
+        while node is not None and node.value != value:
+            node = node.left if value < node.value else node.right
+        if node is None:
+            node = self.root
+            while node is not None:
+                steps.append({'value': node.value, 'action': 'Visiting', 'path': []})
+                node = node.left if value < node.value else node.right
+            steps.append({'value': value, 'action': 'Value Not Found', 'path': []})
+            return False
+
+        def delete_min(node):
+            touched.append(node)
+            if node.left is None:
+                unlinked.append(node)
+                return None
+            if not is_red(node.left) and not is_red(node.left.left):
+                node = self._move_red_left(node, steps, touched)
+            node.left = delete_min(node.left)
+            return self._fix(node, steps, touched)
+
+        # Recursive, but only as deep as the tree: at most 2 log2(n) levels
+        def delete_recursive(node, value):
+            touched.append(node)
+            steps.append({'value': node.value, 'action': 'Visiting', 'path': []})
+            if value < node.value:
+                if not is_red(node.left) and not is_red(node.left.left):
+                    node = self._move_red_left(node, steps, touched)
+                node.left = delete_recursive(node.left, value)
+            else:
+                if is_red(node.left):
+                    node = self._rotate_right(node, steps, touched)
+                if value == node.value and node.right is None:
+                    steps.append({'value': node.value, 'action': 'Target Found', 'path': []})
+                    unlinked.append(node)
+                    return None
+                if not is_red(node.right) and not is_red(node.right.left):
+                    node = self._move_red_right(node, steps, touched)
+                if value == node.value:
+                    steps.append({'value': node.value, 'action': 'Target Found', 'path': []})
+                    # The successor's value moves up here, the successor node is unlinked
+                    node.value = find_min(node.right).value
+                    node.right = delete_min(node.right)
+                else:
+                    node.right = delete_recursive(node.right, value)
+            return self._fix(node, steps, touched)
+
+        root = self.root
+        if not is_red(root.left) and not is_red(root.right):
+            root.red = True
+            touched.append(root)
+        self.root = delete_recursive(root, value)
+        return True
 
-            return node
-            
-        root = delete_recursive(root, value)
+
+# Tree modes selectable through the 'tree_type' field of /api/bst
+TREE_TYPES = {
+    'bst': BinarySearchTree,
+    'avl': AVLTree,
+    'red_black': RedBlackTree,
+}
+
+# Wire formats of the tree state ('tree_format' of /api/bst)
+TREE_FORMATS = ('nested', 'flat')
+
+
+def record_build_steps(nodes, steps):
+    """Steps of a bulk build: one insert per node, parents before children."""
+    for i, node in enumerate(nodes):
+        steps.append({'value': node.value, 'action': 'Inserted' if i else 'Root Inserted', 'path': []})
+
+
+def sorted_distinct(values):
+    """The values as a strictly increasing list (a BST holds every value once)."""
+    if all(a < b for a, b in zip(values, values[1:])):
+        return list(values)
+    return sorted(set(values))
+
+
+def structural_diff(root, touched, unlinked, removed):
+    """
+    Describes what an operation changed, keyed by node value (values are unique
+    in a BST):
+    - 'root': value of the root after the operation (None for an empty tree).
+    - 'nodes': {'value', 'left', 'right'} with child values (plus 'height' or
+      'color' in the balanced modes), for every node that may have changed; the
+      client overwrites its copy of these nodes.
+    - 'removed': values that are no longer in the tree.
+    """
+    gone = {id(node) for node in unlinked}
+    nodes = {}
+    for node in touched:
+        if id(node) not in gone:
+            entry = {
+                'value': node.value,
+                'left': node.left.value if node.left else None,
+                'right': node.right.value if node.right else None,
+            }
+            entry.update(node.attrs())
+            nodes[node.value] = entry
+    return {
+        'root': root.value if root else None,
+        'nodes': list(nodes.values()),
+        # A value removed and inserted again within a batch is not removed
+        'removed': [value for value in dict.fromkeys(removed) if value not in nodes],
+    }
+
+
+def get_bst_steps(tree_state, operation, value, tree_type='bst', tree_format='nested'):
+    """
+    Processes a BST operation and returns visualization steps and the new tree state.
+    """
     
-    # 2. Return the steps and the new serialized dictionary state (or None)
-    # This ensures a dictionary is returned if root exists, and None otherwise.
-    new_tree_state_dict = root.to_dict() if root else None
+    # 1. Deserialize the tree state
+    tree = TREE_TYPES[tree_type].from_state(tree_state, tree_format)
+    steps, _ = tree.apply(operation, value)
     
-    # Optional: Log to your Python console to confirm the output structure
-    print(f"[BST DEBUG] New tree state being returned: {new_tree_state_dict}")
+    # 2. Return the steps and the new serialized state
+    # Nested format: a dictionary if root exists, and None otherwise.
+    new_tree_state = tree.to_state(tree_format)
     
-    return steps, new_tree_state_dict
\ No newline at end of file
+    return steps, new_tree_state
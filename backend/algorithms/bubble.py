@@ -1,33 +1,148 @@
 # backend/algorithms/bubble.py
+from .tracer import ListSink, GeneratorSink, CounterSink
 
-def get_bubble_sort_steps(array):
+
+def trace_bubble_sort(tracer):
     """
-    Placeholder implementation of Bubble Sort step recording.
-    Returns a list of array states.
+    Runs Bubble Sort on tracer.array and yields a step for every action.
     """
-    
-    working_array = list(array)
-    steps = []
-    n = len(working_array)
+    n = len(tracer.array)
     
     # 1. Initial State
-    steps.append({'array': list(working_array), 'highlight_indices': [], 'action': 'initial'})
+    yield tracer.step('initial')
 
     # Actual Bubble Sort logic
     for i in range(n):
         for j in range(0, n - i - 1):
             
             # State before comparison
-            steps.append({'array': list(working_array), 'highlight_indices': [j, j+1], 'action': 'comparing'})
+            yield tracer.step('comparing', (j, j + 1))
             
-            if working_array[j] > working_array[j + 1]:
+            if tracer.compare(j, j + 1) > 0:
                 # Swap
-                working_array[j], working_array[j + 1] = working_array[j + 1], working_array[j]
+                tracer.swap(j, j + 1)
                 
                 # State after swap
-                steps.append({'array': list(working_array), 'highlight_indices': [j, j+1], 'action': 'swapped'})
+                yield tracer.step('swapped', (j, j + 1))
     
     # 2. Final state
-    steps.append({'array': list(working_array), 'highlight_indices': [], 'action': 'complete'})
-    
-    return steps
\ No newline at end of file
+    yield tracer.step('complete')
+
+
+def trace_adaptive_bubble_sort(tracer):
+    """
+    Runs Bubble Sort with early termination on tracer.array and yields a step
+    for every action.
+
+    Everything behind the last swap of a pass is already sorted, so the next
+    pass stops there; a pass without any swap ends the sort. Sorted input
+    takes a single pass. Besides the common fields, each step carries
+    'boundary': the elements from this index on are in their final place.
+    """
+    n = len(tracer.array)
+    boundary = n
+
+    yield tracer.step('initial', boundary=boundary)
+
+    while boundary > 1:
+        last_swap = 0
+        for j in range(0, boundary - 1):
+            yield tracer.step('comparing', (j, j + 1), boundary=boundary)
+
+            if tracer.compare(j, j + 1) > 0:
+                tracer.swap(j, j + 1)
+                last_swap = j + 1
+                yield tracer.step('swapped', (j, j + 1), boundary=boundary)
+
+        if last_swap == 0:
+            # No swap in this pass: the rest is already sorted
+            yield tracer.step('early_exit', boundary=boundary)
+            break
+
+        boundary = last_swap
+        yield tracer.step('pass_complete', (boundary,), boundary=boundary)
+
+    yield tracer.step('complete', boundary=0)
+
+
+def trace_cocktail_shaker_sort(tracer):
+    """
+    Runs Cocktail Shaker Sort on tracer.array and yields a step for every action.
+
+    Bubble Sort passes alternate between left-to-right and right-to-left, and
+    each pass stops at the last swap of the previous one in that direction, so
+    small elements near the end ("turtles") no longer need a pass each.
+    Besides the common fields, each step carries 'boundary_left' and
+    'boundary_right': only [boundary_left, boundary_right] is still unsorted.
+    """
+    n = len(tracer.array)
+    lo, hi = 0, n - 1
+
+    yield tracer.step('initial', boundary_left=lo, boundary_right=hi)
+
+    while lo < hi:
+        # Left to right: the largest element moves to hi
+        last_swap = None
+        for j in range(lo, hi):
+            yield tracer.step('comparing', (j, j + 1), boundary_left=lo, boundary_right=hi)
+            if tracer.compare(j, j + 1) > 0:
+                tracer.swap(j, j + 1)
+                last_swap = j
+                yield tracer.step('swapped', (j, j + 1), boundary_left=lo, boundary_right=hi)
+
+        if last_swap is None:
+            yield tracer.step('early_exit', boundary_left=lo, boundary_right=hi)
+            break
+        hi = last_swap
+        yield tracer.step('pass_complete', (hi + 1,), boundary_left=lo, boundary_right=hi)
+
+        # Right to left: the smallest element moves to lo
+        last_swap = hi
+        for j in range(hi, lo, -1):
+            yield tracer.step('comparing', (j - 1, j), boundary_left=lo, boundary_right=hi)
+            if tracer.compare(j - 1, j) > 0:
+                tracer.swap(j - 1, j)
+                last_swap = j
+                yield tracer.step('swapped', (j - 1, j), boundary_left=lo, boundary_right=hi)
+
+        lo = last_swap
+        yield tracer.step('pass_complete', (lo - 1,), boundary_left=lo, boundary_right=hi)
+
+    yield tracer.step('complete', boundary_left=-1, boundary_right=-1)
+
+
+def iter_bubble_sort_steps(array):
+    """
+    Runs Bubble Sort and yields every step as soon as it is recorded.
+    """
+    return GeneratorSink().run(trace_bubble_sort, array)
+
+
+def get_bubble_sort_steps(array):
+    """
+    Bubble Sort step recording.
+    Returns a list of array states.
+    """
+    return ListSink().run(trace_bubble_sort, array)['steps']
+
+
+def get_bubble_sort_stats(array):
+    """
+    Runs Bubble Sort without recording any steps and returns its counters
+    (steps, comparisons, swaps, writes, max_depth).
+    """
+    return CounterSink().run(trace_bubble_sort, array)
+
+
+def get_adaptive_bubble_sort_steps(array):
+    """
+    Runs Bubble Sort with early termination and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_adaptive_bubble_sort, array)['steps']
+
+
+def get_cocktail_shaker_sort_steps(array):
+    """
+    Runs Cocktail Shaker Sort and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_cocktail_shaker_sort, array)['steps']
@@ -0,0 +1,481 @@
+# backend/algorithms/cost.py
+"""
+Predicts how long a trace will be before any step is recorded, so that a
+request for a huge trace can be turned down (or reduced) up front.
+
+step_bounds() gives closed-form (low, high) bounds of the step count of
+every built-in algorithm: e.g. Bubble Sort and Insertion Sort produce
+exactly one swap / shift per inversion, so their step counts are exact after
+an O(n log n) inversion count, while the n log n / n^2 comparison bounds of
+Quick Sort or Heap Sort leave a range. Only when the bounds cannot decide is
+the algorithm counted by running it in 'count' mode (no steps are created)
+with a cap, see predict_steps().
+"""
+import json
+from bisect import bisect_right
+from itertools import islice, repeat
+from math import isqrt
+from statistics import median
+
+from .tracer import Tracer
+from .messages import render_messages
+
+# Steps recorded to measure the average encoded size of a step
+PROBE_STEPS = 64
+
+
+def count_inversions(values):
+    """Number of pairs i < j with values[i] > values[j], in O(n log n)."""
+    a = list(values)
+    n = len(a)
+    inversions = 0
+    width = 1
+    while width < n:
+        for lo in range(0, n - width, 2 * width):
+            mid, hi = lo + width, min(lo + 2 * width, n)
+            left = a[lo:mid]
+            right = a[mid:hi]
+            # Every element of the right block is passed by the left elements greater than it
+            inversions += len(left) * len(right) - sum(map(bisect_right, repeat(left, len(right)), right))
+            # Two sorted runs: sorted() merges them in linear time
+            a[lo:hi] = sorted(a[lo:hi])
+        width *= 2
+    return inversions
+
+
+def _pairs(n):
+    return n * (n - 1) // 2
+
+
+def _bubble_bounds(array, limit):
+    n = len(array)
+    # One 'comparing' step per pair, plus one 'swapped' step per inversion
+    base = 2 + _pairs(n)
+    if base > limit:
+        return base, base + _pairs(n)
+    steps = base + count_inversions(array)
+    return steps, steps
+
+
+def _adaptive_bubble_bounds(array, limit, extra_passes=0):
+    # Swaps are exact; the passes (and their comparisons) stop early on sorted runs
+    n = len(array)
+    if n < 2:
+        return 2, 2
+    if n > limit:
+        return 2 + n, 2 + 2 * _pairs(n) + n + extra_passes
+    swaps = count_inversions(array)
+    return 2 + swaps + n, 2 + swaps + _pairs(n) + n - 1 + extra_passes
+
+
+def _cocktail_shaker_bounds(array, limit):
+    # A last, empty right-to-left pass may still report 'pass_complete'
+    return _adaptive_bubble_bounds(array, limit, extra_passes=1)
+
+
+def _insertion_bounds(array, limit):
+    n = len(array)
+    # 'select_key' and 'inserted' for every key, 'comparing' and 'shifted' for every inversion
+    base = 2 + 2 * max(n - 1, 0)
+    if base > limit:
+        return base, base + 2 * _pairs(n)
+    steps = base + 2 * count_inversions(array)
+    return steps, steps
+
+
+def _binary_insertion_bounds(array, limit):
+    n = len(array)
+    low = high = 2 + 3 * max(n - 1, 0)
+    if n < 2:
+        return low, high
+    largest = array[0]
+    for i in range(1, n):
+        value = array[i]
+        if value < largest:
+            # Out of place: a binary search over the i candidate positions, then the shift
+            low += i.bit_length()
+            high += (i - 1).bit_length() + 1
+        else:
+            largest = value
+    return low, high
+
+
+def _selection_bounds(array, limit):
+    n = len(array)
+    # 'start_min_search' and 'sorted_position' per position, 'comparing' per pair;
+    # at most one 'new_minimum' per comparison and one 'swap' per position
+    low = 2 + 2 * n + _pairs(n)
+    return low, low + _pairs(n) + max(n - 1, 0)
+
+
+def _double_selection_bounds(array, limit):
+    low = high = 2
+    length = len(array)
+    while length > 1:
+        # One or two comparisons per element, at most one new minimum / maximum per element, two swaps
+        low += 2 + (length - 1)
+        high += 2 + 3 * (length - 1) + 2
+        length -= 2
+    return low, high
+
+
+def _merge_bounds(array, limit):
+    # The split sizes do not depend on the values: every merge of a + b elements
+    # places a + b elements after min(a, b) to a + b - 1 comparisons, then reports 'merged'
+    sizes = {}
+    pending = [len(array)]
+    while pending:
+        size = pending[-1]
+        if size < 2:
+            sizes[size] = (0, 0)
+            pending.pop()
+            continue
+        left, right = (size + 1) // 2, size // 2
+        missing = [part for part in (left, right) if part not in sizes]
+        if missing:
+            pending.extend(missing)
+            continue
+        pending.pop()
+        sizes[size] = (sizes[left][0] + sizes[right][0] + size + right + 1,
+                       sizes[left][1] + sizes[right][1] + 2 * size)
+    low, high = sizes[len(array)]
+    return 2 + low, 2 + high
+
+
+def _floor_log2_sum(n):
+    """Sum of floor(log2 e) for e = 1..n, in O(log n)."""
+    total = 0
+    k = 1
+    while (1 << k) <= n:
+        # e in [2^k, 2^(k+1)) contributes k each
+        total += k * (min(n, (1 << (k + 1)) - 1) - (1 << k) + 1)
+        k += 1
+    return total
+
+
+def _best_case_partitions(n):
+    """
+    Fewest comparisons a partitioning sort can make on n distinct keys: every
+    partition of m keys compares m - 1 of them and, at best, leaves two halves.
+    """
+    costs = {0: 0, 1: 0}
+    pending = [n]
+    while pending:
+        size = pending[-1]
+        if size in costs:
+            pending.pop()
+            continue
+        left, right = (size - 1) // 2, size - 1 - (size - 1) // 2
+        missing = [part for part in (left, right) if part not in costs]
+        if missing:
+            pending.extend(missing)
+            continue
+        pending.pop()
+        costs[size] = size - 1 + costs[left] + costs[right]
+    return costs[n]
+
+
+def _quick_bounds(array, limit, pivot='last', scheme='two_way'):
+    n = len(array)
+    if n < 2:
+        return 2, 2
+    # A three-way partition takes every copy of its pivot out at once, so only the distinct keys count
+    keys = n if scheme == 'two_way' else len(set(array))
+    # At least one partition per two keys, each with 'select_pivot' and 'pivot_placed';
+    # the first partition alone compares all n - 1 other elements
+    low = 2 + max(_best_case_partitions(keys) + 2 * (keys // 2), n + 1)
+    if scheme == 'two_way':
+        # At most n - 1 partitions of m elements: m - 1 comparisons and swaps, plus
+        # 'choose_pivot', 'select_pivot' and 'pivot_placed'
+        return low, 2 + 2 * _pairs(n) + 3 * (n - 1)
+    # Every partition of m elements scans from both ends (at most 2m - 1 comparisons,
+    # m swaps) and removes at least one key: the ranges add up to at most keys * n elements
+    partitions = min(n - 1, keys)
+    elements = min(n * (n + 1) // 2, keys * n)
+    return low, 2 + 3 * elements + 3 * partitions
+
+
+def _heap_high(n):
+    """Upper bound of the steps of heap_sort_range() on n > 1 elements."""
+    # 'heap_built' and n - 1 'sorted_position'; a sift-down makes at most 3 steps per level:
+    # the heights of all roots add up to less than n, and extraction sifts through a heap of `end`
+    return 1 + (n - 1) + 3 * n + 3 * _floor_log2_sum(n - 1)
+
+
+def _heap_bounds(array, limit):
+    n = len(array)
+    if n < 2:
+        return 2, 2
+    # Every sift-down of the build makes at least one comparison; in the extraction,
+    # heaps of two elements take one and larger heaps two
+    low = 2 + 1 + (n - 1) + n // 2 + max(0, 2 * (n - 1) - 3)
+    return low, 2 + _heap_high(n)
+
+
+def _shell_bounds(array, limit, gaps='ciura'):
+    # Imported here, like the algorithms themselves (see registry), so loading cost imports no algorithm
+    from .shell import GAP_SEQUENCES
+    n = len(array)
+    # Per gap g: the 'gap' step, then 'select_key' and at least one comparison for each of the n - g keys
+    gap_sizes = GAP_SEQUENCES[gaps](n)
+    low = 2 + sum(1 + 2 * max(n - gap, 0) for gap in gap_sizes)
+    if low > limit:
+        return low, low + 3 * _pairs(n)
+    # Every shift removes at least one inversion, and brings at most one more comparison and 'inserted'
+    return low, low + 3 * count_inversions(array)
+
+
+def _intro_bounds(array, limit):
+    from .intro import INSERTION_CUTOFF
+    n = len(array)
+    if n < 2:
+        return 2, 2
+    # Every element but one is compared at least once, by a partition or insertion sort
+    low = 2 + (n - 1)
+    # A partition of m elements records at most 2m steps, and the partitions of one depth
+    # cover each element once; insertion sort on at most INSERTION_CUTOFF elements records
+    # fewer than INSERTION_CUTOFF / 2 + 1 steps per element; the heap sort fallbacks cover
+    # disjoint ranges, and cost no more than one heap sort of all n elements
+    depth_limit = 2 * n.bit_length()
+    high = (2 + 2 * n * depth_limit + n * (INSERTION_CUTOFF // 2 + 1) + _heap_high(n)
+            + n // (INSERTION_CUTOFF + 1))
+    return low, high
+
+
+def _bottom_up_merge_bounds(array, limit):
+    from .merge import BOTTOM_UP_CUTOFF
+    n = len(array)
+    low = high = 2
+    # Insertion sort of every block: k - 1 to k(k - 1) / 2 comparisons, at most k - 1 placements
+    for size in (BOTTOM_UP_CUTOFF,) * (n // BOTTOM_UP_CUTOFF) + (n % BOTTOM_UP_CUTOFF,):
+        if size > 1:
+            low += size - 1
+            high += _pairs(size) + size - 1
+    # Every pair of runs: one comparison to skip it when already in order, otherwise
+    # merging a + b elements records at most 2(a + b) more steps including 'merged'
+    width = BOTTOM_UP_CUTOFF
+    while width < n:
+        pairs = len(range(0, n - width, 2 * width))
+        low += pairs
+        high += pairs + 2 * n
+        width *= 2
+    return low, high
+
+
+def _natural_merge_bounds(array, limit):
+    n = len(array)
+    # Every element but the first is compared at least once while the runs are found
+    if n + 1 > limit:
+        return n + 1, 2 + 2 * n * (n + 1)
+    from .merge import min_run_length
+    min_run = min_run_length(n)
+    # Finding the runs is exact: the values are scanned just like trace_natural_merge_sort() does
+    exact = 2
+    low = high = 0
+    runs = []
+    lo = 0
+    while lo < n:
+        end = lo + 1
+        if end < n:
+            descending = array[end] < array[lo]
+            end += 1
+            exact += 1
+            while end < n:
+                exact += 1
+                if (array[end] < array[end - 1]) != descending:
+                    break
+                end += 1
+            # 'reversed'
+            exact += descending
+        # Extending to min_run: a placement and 1 to (position in the run) comparisons per element
+        forced_end = max(min(lo + min_run, n), end)
+        low += 2 * (forced_end - end)
+        high += (forced_end - end) + sum(range(end - lo, forced_end - lo))
+        # 'run_found'
+        exact += 1
+        runs.append(forced_end - lo)
+        lo = forced_end
+
+    # Replays the merges of the run stack; merging a + b elements records 2 min(a, b) + 1 to 2(a + b) steps
+    def merge(i):
+        a, b = stack[i], stack[i + 1]
+        stack[i:i + 2] = [a + b]
+        return 2 * min(a, b) + 1, 2 * (a + b)
+
+    stack = []
+    merges = []
+    for length in runs:
+        stack.append(length)
+        while len(stack) > 1:
+            i = len(stack) - 2
+            if (i > 0 and stack[i - 1] <= stack[i] + stack[i + 1]) or \
+                    (i > 1 and stack[i - 2] <= stack[i - 1] + stack[i]):
+                if stack[i - 1] < stack[i + 1]:
+                    i -= 1
+            elif stack[i] > stack[i + 1]:
+                break
+            merges.append(merge(i))
+    while len(stack) > 1:
+        i = len(stack) - 2
+        if i > 0 and stack[i - 1] < stack[i + 1]:
+            i -= 1
+        merges.append(merge(i))
+
+    low += sum(cost for cost, _ in merges)
+    high += sum(cost for _, cost in merges)
+    return exact + low, exact + high
+
+
+def _linear_search_bounds(array, limit, target):
+    # 'comparing' plus 'no_match' for every element before the first match
+    for index, value in enumerate(array):
+        if value == target:
+            steps = 3 + 2 * index
+            return steps, steps
+    steps = 2 + 2 * len(array)
+    return steps, steps
+
+
+def _binary_search_bounds(array, limit, target):
+    # A found target ends after its first probe at best; every probe takes
+    # 'check_mid' plus a move (or 'found'), at most floor(log2 n) + 1 times
+    n = len(array)
+    return 2 + (n > 0), 2 + 2 * n.bit_length()
+
+
+def _interpolation_search_bounds(array, limit, target):
+    # Every probe narrows [low, high] by at least one element
+    return 2, 2 + 2 * len(array)
+
+
+def _exponential_search_bounds(array, limit, target):
+    # 'extend_bound' while the bound doubles below n, then a binary search of at most n elements
+    n = len(array)
+    return 2 + (n > 0), 2 + max(n - 1, 0).bit_length() + 2 * n.bit_length()
+
+
+def _jump_search_bounds(array, limit, target):
+    # At most one 'jump' per block, then 'probe' (and 'found') within one block
+    n = len(array)
+    block = isqrt(n) or 1
+    return 2 + (n > 0), 2 + -(-n // block) + block + 1
+
+
+def _fibonacci_search_bounds(array, limit, target):
+    # Every probe at least drops to the previous Fibonacci number, plus a last leftover probe
+    n = len(array)
+    probes = 0
+    fib2, fib1 = 0, 1
+    while fib1 + fib2 < n:
+        fib2, fib1 = fib1, fib1 + fib2
+        probes += 1
+    return 2 + (n > 0), 2 + 2 * (probes + 1) + 2
+
+
+_BOUNDS = {
+    'bubble_sort': _bubble_bounds,
+    'adaptive_bubble_sort': _adaptive_bubble_bounds,
+    'cocktail_shaker_sort': _cocktail_shaker_bounds,
+    'insertion_sort': _insertion_bounds,
+    'binary_insertion_sort': _binary_insertion_bounds,
+    'selection_sort': _selection_bounds,
+    'double_selection_sort': _double_selection_bounds,
+    'merge_sort': _merge_bounds,
+    'bottom_up_merge_sort': _bottom_up_merge_bounds,
+    'natural_merge_sort': _natural_merge_bounds,
+    'quick_sort': _quick_bounds,
+    'intro_sort': _intro_bounds,
+    'heap_sort': _heap_bounds,
+    'shell_sort': _shell_bounds,
+    'linear_search': _linear_search_bounds,
+    'binary_search': _binary_search_bounds,
+    'interpolation_search': _interpolation_search_bounds,
+    'exponential_search': _exponential_search_bounds,
+    'jump_search': _jump_search_bounds,
+    'fibonacci_search': _fibonacci_search_bounds,
+}
+
+
+def step_bounds(algorithm_id, array, args=(), limit=None):
+    """
+    Closed-form (low, high) bounds of the number of steps the algorithm records
+    on `array`; low == high when the count is exact. None for algorithms
+    without a formula. Past `limit` steps the bounds may be left loose, since
+    the trace is too long either way.
+    """
+    bounds = _BOUNDS.get(algorithm_id)
+    if bounds is None:
+        return None
+    return bounds(array, float('inf') if limit is None else limit, *args)
+
+
+def count_steps(trace, array, args=(), limit=None):
+    """
+    Runs `trace` in 'count' mode; returns its exact step count, or None as soon
+    as it goes over `limit` steps.
+    """
+    tracer = Tracer(array, mode='count')
+    for _ in trace(tracer, *args):
+        if limit is not None and tracer.steps > limit:
+            return None
+    return tracer.steps
+
+
+def predict_steps(algorithm_id, trace, array, args, limit, exact=False):
+    """
+    Bounds the step count of a trace without recording it. Returns (low,
+    high), equal when the count is exact.
+
+    Only the closed-form bounds of step_bounds() are used ((0, inf) for an
+    algorithm without them), unless exact=True asks for the algorithm to be
+    counted in 'count' mode when they differ. Traces of more than `limit`
+    steps are not counted to the end: their low bound is then above `limit`.
+    """
+    bounds = step_bounds(algorithm_id, array, args, limit)
+    if bounds is not None:
+        low, high = bounds
+        if low == high or low > limit or not exact:
+            return low, high
+    elif not exact:
+        return 0, float('inf')
+    steps = count_steps(trace, array, args, limit)
+    if steps is None:
+        return limit + 1, float('inf')
+    return steps, steps
+
+
+def measure_steps(trace, array, args, encoding='full', locale=None):
+    """
+    Returns (array bytes, step bytes): the encoded length of `array` and the
+    median size of the first PROBE_STEPS steps without their array (with
+    their messages rendered in `locale`, if given), for trace_bytes(). The
+    median, since a single step highlighting a whole range (a partition, a
+    merge) would dominate the mean of so few steps.
+    """
+    array_bytes = len(json.dumps(array))
+    probe = islice(trace(Tracer(array, mode='delta'), *args), PROBE_STEPS)
+    if locale is not None:
+        probe = render_messages(probe, locale)
+    step_sizes = []
+    for step in probe:
+        entry = {'action': step.action, 'highlight_indices': list(step.indices)}
+        if step.extra:
+            entry.update(step.extra)
+        if encoding == 'delta':
+            entry['ops'] = step.ops
+        step_sizes.append(len(json.dumps(entry)))
+    return array_bytes, median(step_sizes) if step_sizes else 0
+
+
+def trace_bytes(steps, array_bytes, step_bytes, encoding='full', keyframe_interval=None):
+    """
+    Estimated size of the JSON response of a `steps`-step trace, given the
+    measure_steps() of the algorithm. Full snapshots are counted at the
+    encoded length of the array: sorting only moves its values around.
+    """
+    if encoding == 'delta':
+        keyframes = steps // keyframe_interval if keyframe_interval else 0
+        return int(array_bytes * (keyframes + 1) + step_bytes * steps)
+    # ', "array": ' plus the snapshot
+    return int((step_bytes + array_bytes + 11) * steps)
+
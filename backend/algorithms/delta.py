@@ -0,0 +1,48 @@
+# backend/algorithms/delta.py
+
+def iter_delta_trace(steps):
+    """
+    Lazily delta-encodes a stream of Step records recorded in 'delta' mode.
+
+    The first item yielded is the header {'format': 'delta', 'initial': [...]},
+    taken from the snapshot of the first step. Every step after that keeps its
+    metadata (action, highlighted indices, ...) and carries 'ops', the
+    operations applied to the array since the previous step:
+    - ['swap', i, j]: positions i and j exchanged their values.
+    - ['write', k, v]: position k now holds v.
+
+    Replaying the ops of steps 0..s on top of 'initial' yields the array of step s.
+    Steps recorded with a keyframe interval also carry 'keyframe', the full
+    array of that step, so a client can start replaying from there instead.
+    """
+    first = True
+    for step in steps:
+        if first:
+            first = False
+            yield {'format': 'delta', 'initial': step.array}
+            entry = step.to_delta()
+            # The header already holds the first snapshot
+            del entry['keyframe']
+            yield entry
+        else:
+            yield step.to_delta()
+
+
+def default_keyframe_interval(array_len):
+    """
+    Keyframe spacing used when the client does not pick one: a keyframe costs
+    as much as `array_len` single-element ops, so spacing them `array_len` steps
+    apart (and at least 256) keeps their overhead at about one value per step.
+    """
+    return max(256, array_len)
+
+
+def apply_delta_ops(array, ops):
+    """Applies the ops of one delta step to `array` in place and returns it."""
+    for op in ops:
+        if op[0] == 'swap':
+            i, j = op[1], op[2]
+            array[i], array[j] = array[j], array[i]
+        elif op[0] == 'write':
+            array[op[1]] = op[2]
+    return array
@@ -0,0 +1,54 @@
+# backend/algorithms/exponential.py
+from .tracer import ListSink
+
+
+def trace_exponential_search(tracer, target):
+    """
+    Runs Exponential Search on the sorted tracer.array and yields a step for
+    every action.
+
+    The upper bound doubles (1, 2, 4, ...) until it passes the target, then a
+    binary search runs between the last two bounds: O(log i) for a target at
+    index i, which suits targets near the front of large arrays.
+    Besides the common fields, each step carries 'low', 'high', 'probe' and 'found'.
+    """
+    arr = tracer.array
+    n = len(arr)
+
+    yield tracer.step('initial', (), low=0, high=n - 1, probe=-1, found=False)
+
+    if n == 0:
+        yield tracer.step('not_found', (), low=0, high=-1, probe=-1, found=False)
+        return
+
+    bound = 1
+    while bound < n:
+        yield tracer.step('extend_bound', (bound,), low=bound // 2, high=bound, probe=bound, found=False)
+        if tracer.compare_value(bound, target) >= 0:
+            break
+        bound *= 2
+
+    # Binary search in [bound / 2, min(bound, n - 1)]
+    low, high = bound // 2, min(bound, n - 1)
+    while low <= high:
+        mid = (low + high) // 2
+        yield tracer.step('probe', (mid,), low=low, high=high, probe=mid, found=False)
+        order = tracer.compare_value(mid, target)
+        if order == 0:
+            yield tracer.step('found', (mid,), low=low, high=high, probe=mid, found=True)
+            return
+        if order < 0:
+            low = mid + 1
+            yield tracer.step('move_low', (), low=low, high=high, probe=mid, found=False)
+        else:
+            high = mid - 1
+            yield tracer.step('move_high', (), low=low, high=high, probe=mid, found=False)
+
+    yield tracer.step('not_found', (), low=low, high=high, probe=-1, found=False)
+
+
+def get_exponential_search_steps(arr, target):
+    """
+    Runs Exponential Search and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_exponential_search, arr, target)['steps']
@@ -0,0 +1,64 @@
+# backend/algorithms/fibonacci.py
+from .tracer import ListSink
+
+
+def trace_fibonacci_search(tracer, target):
+    """
+    Runs Fibonacci Search on the sorted tracer.array and yields a step for
+    every action.
+
+    Like Binary Search, but the range is split at Fibonacci numbers instead of
+    halves, so probe positions only need additions and subtractions: O(log n).
+    Besides the common fields, each step carries 'low', 'high', 'probe' and 'found'.
+    """
+    arr = tracer.array
+    n = len(arr)
+
+    yield tracer.step('initial', (), low=0, high=n - 1, probe=-1, found=False)
+
+    # Smallest Fibonacci number >= n, and the two before it
+    fib2, fib1 = 0, 1
+    fib = fib1 + fib2
+    while fib < n:
+        fib2, fib1 = fib1, fib
+        fib = fib1 + fib2
+
+    # Everything up to offset is known to be smaller than the target
+    offset = -1
+    while fib > 1:
+        probe = min(offset + fib2, n - 1)
+        low, high = offset + 1, min(offset + fib, n - 1)
+        yield tracer.step('probe', (probe,), low=low, high=high, probe=probe, found=False)
+
+        order = tracer.compare_value(probe, target)
+        if order == 0:
+            yield tracer.step('found', (probe,), low=low, high=high, probe=probe, found=True)
+            return
+        if order < 0:
+            # Continue in the part after the probe: one Fibonacci number down
+            fib, fib1 = fib1, fib2
+            fib2 = fib - fib1
+            offset = probe
+            yield tracer.step('move_low', (), low=offset + 1, high=high, probe=probe, found=False)
+        else:
+            # Continue in the part before the probe: two Fibonacci numbers down
+            fib, fib1 = fib2, fib1 - fib2
+            fib2 = fib - fib1
+            yield tracer.step('move_high', (), low=low, high=probe - 1, probe=probe, found=False)
+
+    # One candidate can be left over
+    if fib1 and offset + 1 < n:
+        probe = offset + 1
+        yield tracer.step('probe', (probe,), low=probe, high=probe, probe=probe, found=False)
+        if tracer.compare_value(probe, target) == 0:
+            yield tracer.step('found', (probe,), low=probe, high=probe, probe=probe, found=True)
+            return
+
+    yield tracer.step('not_found', (), low=offset + 1, high=n - 1, probe=-1, found=False)
+
+
+def get_fibonacci_search_steps(arr, target):
+    """
+    Runs Fibonacci Search and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_fibonacci_search, arr, target)['steps']
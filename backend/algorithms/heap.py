@@ -0,0 +1,76 @@
+# backend/algorithms/heap.py
+from .tracer import ListSink, GeneratorSink, CounterSink
+
+
+def sift_down(tracer, lo, root, size, extra):
+    """
+    Moves the element at heap position `root` down until neither child is
+    larger. The heap occupies array[lo:lo + size]; position p lives at index
+    lo + p, its children at 2p + 1 and 2p + 2. `extra` holds additional
+    fields for every step (used by introsort).
+    """
+    while True:
+        child = 2 * root + 1
+        if child >= size:
+            return
+        if child + 1 < size:
+            yield tracer.step('comparing', (lo + child, lo + child + 1), heap_size=size, **extra)
+            if tracer.compare(lo + child + 1, lo + child) > 0:
+                child += 1
+        yield tracer.step('comparing', (lo + root, lo + child), heap_size=size, **extra)
+        if tracer.compare(lo + root, lo + child) >= 0:
+            return
+        tracer.swap(lo + root, lo + child)
+        yield tracer.step('swapped', (lo + root, lo + child), heap_size=size, **extra)
+        root = child
+
+
+def heap_sort_range(tracer, lo, hi, **extra):
+    """Heap-sorts array[lo:hi + 1] in place (also used by introsort as its fallback)."""
+    size = hi - lo + 1
+    # Build a max-heap bottom-up, starting from the last parent
+    for root in range(size // 2 - 1, -1, -1):
+        yield from sift_down(tracer, lo, root, size, extra)
+    yield tracer.step('heap_built', range(lo, hi + 1), heap_size=size, **extra)
+
+    # Move the maximum behind the heap and restore the heap on the rest
+    for end in range(size - 1, 0, -1):
+        tracer.swap(lo, lo + end)
+        yield tracer.step('sorted_position', (lo, lo + end), heap_size=end, **extra)
+        yield from sift_down(tracer, lo, 0, end, extra)
+
+
+def trace_heap_sort(tracer):
+    """
+    Runs Heap Sort on tracer.array and yields a step for every action.
+
+    Besides the common fields, each step carries 'heap_size': the array
+    positions [0, heap_size) still form the heap, everything after it is sorted.
+    """
+    n = len(tracer.array)
+    yield tracer.step('initial', (), heap_size=n)
+    if n > 1:
+        yield from heap_sort_range(tracer, 0, n - 1)
+    yield tracer.step('complete', range(n), heap_size=0)
+
+
+def iter_heap_sort_steps(array):
+    """
+    Runs Heap Sort and yields every step as soon as it is recorded.
+    """
+    return GeneratorSink().run(trace_heap_sort, array)
+
+
+def get_heap_sort_steps(array):
+    """
+    Runs Heap Sort and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_heap_sort, array)['steps']
+
+
+def get_heap_sort_stats(array):
+    """
+    Runs Heap Sort without recording any steps and returns its counters
+    (steps, comparisons, swaps, writes, max_depth).
+    """
+    return CounterSink().run(trace_heap_sort, array)
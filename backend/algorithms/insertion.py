@@ -1,29 +1,21 @@
-import copy
+from .tracer import ListSink, GeneratorSink, CounterSink
 
-def get_insertion_sort_steps(arr):
+
+def trace_insertion_sort(tracer):
     """
-    Sorts an array using Insertion Sort and records every step for visualization.
+    Sorts tracer.array using Insertion Sort and yields every step for visualization.
 
-    Each step is a dictionary containing:
-    - 'array': The list state at that moment.
-    - 'highlighted_indices': Indices currently being compared or shifted.
+    Besides the common fields, each step carries:
     - 'pivot_index': The index of the key element being inserted.
-    - 'status': A description of the current action.
+    - 'event' / 'event_args': The action's message code and arguments (see algorithms.messages).
     - 'sorted_until': The index up to which the array is considered sorted.
     """
-    steps = []
-    n = len(arr)
-    # Use a deep copy to ensure the original list is not modified during the process
-    array = arr[:]
+    array = tracer.array
+    n = len(array)
 
     # --- Initial State ---
-    steps.append({
-        "array": array[:],
-        "highlighted_indices": [],
-        "pivot_index": -1,
-        "status": "Initial state: Starting Insertion Sort.",
-        "sorted_until": 0
-    })
+    yield tracer.step('initial', (), pivot_index=-1,
+                      event='insertion.initial', event_args=(), sorted_until=0)
 
     # The outer loop traverses from the second element (index 1) to the end
     for i in range(1, n):
@@ -31,62 +23,118 @@ def get_insertion_sort_steps(arr):
         j = i - 1
 
         # --- Step: Picking the Key ---
-        steps.append({
-            "array": array[:],
-            "highlighted_indices": [i],
-            "pivot_index": i,
-            "status": f"Selecting key {key} at index {i}. This element will be inserted into the sorted sub-array.",
-            "sorted_until": i
-        })
+        yield tracer.step('select_key', (i,), pivot_index=i,
+                          event='insertion.select_key', event_args=(key, i),
+                          sorted_until=i)
 
         # The inner loop shifts elements greater than the key to the right
-        while j >= 0 and key < array[j]:
+        while j >= 0 and tracer.compare_value(j, key) > 0:
             
             # --- Step: Comparison & Shift preparation ---
-            steps.append({
-                "array": array[:],
-                "highlighted_indices": [i, j], # Highlight key (i) and the element it's compared against (j)
-                "pivot_index": i,
-                "status": f"Comparing key {key} with {array[j]} at index {j}. Since {array[j]} > {key}, shifting {array[j]} right.",
-                "sorted_until": i
-            })
+            # Highlight key (i) and the element it's compared against (j)
+            yield tracer.step('comparing', (i, j), pivot_index=i,
+                              event='insertion.compare', event_args=(key, array[j], j),
+                              sorted_until=i)
 
             # Perform the shift
-            array[j + 1] = array[j]
+            tracer.write(j + 1, array[j])
             
             # --- Step: Post-Shift state (showing the gap) ---
-            steps.append({
-                "array": array[:],
-                "highlighted_indices": [j + 1], # Highlight the element that was just shifted
-                "pivot_index": i,
-                "status": f"Element {array[j + 1]} shifted to index {j+1}.",
-                "sorted_until": i
-            })
+            # Highlight the element that was just shifted
+            yield tracer.step('shifted', (j + 1,), pivot_index=i,
+                              event='insertion.shift', event_args=(array[j + 1], j + 1),
+                              sorted_until=i)
             
             j -= 1
 
         # Insert the key into its correct position
-        array[j + 1] = key
+        tracer.write(j + 1, key)
         
         # --- Step: Insertion complete ---
-        steps.append({
-            "array": array[:],
-            "highlighted_indices": [j + 1],
-            "pivot_index": -1,
-            "status": f"Key {key} inserted into final position {j + 1}. The sub-array up to index {i} is now sorted.",
-            "sorted_until": i + 1
-        })
+        yield tracer.step('inserted', (j + 1,), pivot_index=-1,
+                          event='insertion.insert', event_args=(key, j + 1, i),
+                          sorted_until=i + 1)
         
     # --- Final State ---
-    steps.append({
-        "array": array[:],
-        "highlighted_indices": [],
-        "pivot_index": -1,
-        "status": "Sorting complete.",
-        "sorted_until": n
-    })
+    yield tracer.step('complete', (), pivot_index=-1, event='insertion.complete', event_args=(),
+                      sorted_until=n)
+
+
+def trace_binary_insertion_sort(tracer):
+    """
+    Sorts tracer.array using Binary Insertion Sort and yields every step.
+
+    The key is first compared with its left neighbour, so keys that are
+    already in place cost a single comparison (sorted input is linear);
+    otherwise the insertion point is found by binary search over the sorted
+    part, and the elements after it are shifted right as one block.
+
+    Besides the common fields, each step carries 'pivot_index' (the key being
+    inserted, -1 if none) and 'sorted_until' (as in trace_insertion_sort).
+    """
+    array = tracer.array
+    n = len(array)
+
+    yield tracer.step('initial', (), pivot_index=-1, sorted_until=0)
+
+    for i in range(1, n):
+        key = array[i]
+        yield tracer.step('select_key', (i,), pivot_index=i, sorted_until=i)
+
+        yield tracer.step('comparing', (i - 1, i), pivot_index=i, sorted_until=i)
+        if tracer.compare_value(i - 1, key) <= 0:
+            # Already in place
+            yield tracer.step('inserted', (i,), pivot_index=-1, sorted_until=i + 1)
+            continue
+
+        # Binary search for the first element greater than the key (keeps equal keys in order)
+        lo, hi = 0, i - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            yield tracer.step('comparing', (mid, i), pivot_index=i, sorted_until=i)
+            if tracer.compare_value(mid, key) > 0:
+                hi = mid
+            else:
+                lo = mid + 1
+
+        # Shift the block [lo, i) one position right
+        for j in range(i, lo, -1):
+            tracer.write(j, array[j - 1])
+        yield tracer.step('shifted', range(lo + 1, i + 1), pivot_index=i, sorted_until=i)
+
+        tracer.write(lo, key)
+        yield tracer.step('inserted', (lo,), pivot_index=-1, sorted_until=i + 1)
 
-    return steps
+    yield tracer.step('complete', (), pivot_index=-1, sorted_until=n)
+
+
+def iter_insertion_sort_steps(arr):
+    """
+    Sorts an array using Insertion Sort and yields every step for visualization.
+    """
+    return GeneratorSink().run(trace_insertion_sort, arr)
+
+
+def get_insertion_sort_steps(arr):
+    """
+    Sorts an array using Insertion Sort and returns the list of recorded steps
+    (see trace_insertion_sort for the step format).
+    """
+    return ListSink().run(trace_insertion_sort, arr)['steps']
+
+
+def get_insertion_sort_stats(arr):
+    """
+    Sorts an array using Insertion Sort without recording any steps and
+    returns its counters (steps, comparisons, swaps, writes, max_depth).
+    """
+    return CounterSink().run(trace_insertion_sort, arr)
+
+def get_binary_insertion_sort_steps(arr):
+    """
+    Sorts an array using Binary Insertion Sort and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_binary_insertion_sort, arr)['steps']
 
 # Keep the original function (though it might not be used by app.py)
 def insertion_sort(arr):
@@ -106,4 +154,4 @@ if __name__ == "__main__":
     steps = get_insertion_sort_steps(data)
     print(f"Total steps generated: {len(steps)}")
     # for i, step in enumerate(steps):
-    #     print(f"Step {i}: Array: {step['array']}, Status: {step['status']}")
\ No newline at end of file
+    #     print(f"Step {i}: Array: {step['array']}, Event: {step['event']}")
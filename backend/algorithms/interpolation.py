@@ -0,0 +1,47 @@
+# backend/algorithms/interpolation.py
+from .tracer import ListSink
+
+
+def trace_interpolation_search(tracer, target):
+    """
+    Runs Interpolation Search on the sorted tracer.array and yields a step for
+    every action.
+
+    Instead of the middle, the probe is placed where the target would be if
+    the values were evenly spread between array[low] and array[high]: about
+    log log n probes on uniformly distributed data, up to n on skewed data.
+    Besides the common fields, each step carries 'low', 'high', 'probe' and 'found'.
+    """
+    arr = tracer.array
+    low, high = 0, len(arr) - 1
+
+    yield tracer.step('initial', (), low=low, high=high, probe=-1, found=False)
+
+    # The target can only be in [low, high] while array[low] <= target <= array[high]
+    while low <= high and tracer.compare_value(low, target) <= 0 and tracer.compare_value(high, target) >= 0:
+        span = arr[high] - arr[low]
+        if span == 0:
+            probe = low
+        else:
+            probe = low + int((target - arr[low]) * (high - low) / span)
+
+        yield tracer.step('probe', (probe,), low=low, high=high, probe=probe, found=False)
+        order = tracer.compare_value(probe, target)
+        if order == 0:
+            yield tracer.step('found', (probe,), low=low, high=high, probe=probe, found=True)
+            return
+        if order < 0:
+            low = probe + 1
+            yield tracer.step('move_low', (), low=low, high=high, probe=probe, found=False)
+        else:
+            high = probe - 1
+            yield tracer.step('move_high', (), low=low, high=high, probe=probe, found=False)
+
+    yield tracer.step('not_found', (), low=low, high=high, probe=-1, found=False)
+
+
+def get_interpolation_search_steps(arr, target):
+    """
+    Runs Interpolation Search and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_interpolation_search, arr, target)['steps']
@@ -0,0 +1,116 @@
+# backend/algorithms/intro.py
+from .heap import heap_sort_range
+from .tracer import ListSink, GeneratorSink, CounterSink
+
+# Ranges of at most this many elements are finished with insertion sort
+INSERTION_CUTOFF = 16
+
+
+def trace_intro_sort(tracer):
+    """
+    Runs Introsort on tracer.array and yields a step for every action.
+
+    Quick Sort with a median-of-three pivot, which switches to Heap Sort for a
+    range once the partitioning gets deeper than 2 log2(n) (so it never goes
+    quadratic) and to Insertion Sort for ranges of INSERTION_CUTOFF elements or
+    fewer. Besides the common fields, each step carries 'pivot_index',
+    'boundary_left', 'boundary_right' (the range being worked on) and
+    'heap_size' (inside a Heap Sort fallback, else 0).
+    """
+    array = tracer.array
+    n = len(array)
+
+    yield tracer.step('initial', (), pivot_index=-1, boundary_left=-1, boundary_right=-1, heap_size=0)
+
+    def median_of_three(low, high):
+        # Orders array[low], array[mid], array[high], then moves the median to high
+        mid = (low + high) // 2
+        yield tracer.step('select_pivot', (low, mid, high), pivot_index=mid,
+                          boundary_left=low, boundary_right=high, heap_size=0)
+        if tracer.compare(mid, low) < 0:
+            tracer.swap(mid, low)
+        if tracer.compare(high, low) < 0:
+            tracer.swap(high, low)
+        if tracer.compare(mid, high) < 0:
+            tracer.swap(mid, high)
+
+    def partition(low, high):
+        # Lomuto partition around array[high], as in Quick Sort
+        yield from median_of_three(low, high)
+        pivot = array[high]
+        i = low - 1
+        for j in range(low, high):
+            yield tracer.step('comparing', (j, high), pivot_index=high,
+                              boundary_left=low, boundary_right=high, heap_size=0)
+            if tracer.compare_value(j, pivot) <= 0:
+                i += 1
+                if i != j:
+                    tracer.swap(i, j)
+                    yield tracer.step('swapped', (i, j), pivot_index=high,
+                                      boundary_left=low, boundary_right=high, heap_size=0)
+        tracer.swap(i + 1, high)
+        yield tracer.step('pivot_placed', (i + 1,), pivot_index=i + 1,
+                          boundary_left=low, boundary_right=high, heap_size=0)
+        return i + 1
+
+    def insertion_sort(low, high):
+        for i in range(low + 1, high + 1):
+            key = array[i]
+            j = i - 1
+            while j >= low:
+                yield tracer.step('comparing', (j, i), pivot_index=-1,
+                                  boundary_left=low, boundary_right=high, heap_size=0)
+                if tracer.compare_value(j, key) <= 0:
+                    break
+                tracer.write(j + 1, array[j])
+                j -= 1
+            if j + 1 != i:
+                tracer.write(j + 1, key)
+                yield tracer.step('inserted', (j + 1,), pivot_index=-1,
+                                  boundary_left=low, boundary_right=high, heap_size=0)
+
+    depth_limit = 2 * max(n, 1).bit_length()
+    # Explicit stack of (low, high, depth); the depth limit also bounds its size
+    stack = [(0, n - 1, 1)]
+    while stack:
+        low, high, depth = stack.pop()
+        if high - low + 1 <= INSERTION_CUTOFF:
+            if low < high:
+                yield from insertion_sort(low, high)
+            continue
+
+        tracer.at_depth(depth)
+        if depth > depth_limit:
+            yield tracer.step('heap_fallback', range(low, high + 1), pivot_index=-1,
+                              boundary_left=low, boundary_right=high, heap_size=high - low + 1)
+            yield from heap_sort_range(tracer, low, high, pivot_index=-1,
+                                       boundary_left=low, boundary_right=high)
+            continue
+
+        pi = yield from partition(low, high)
+        stack.append((pi + 1, high, depth + 1))
+        stack.append((low, pi - 1, depth + 1))
+
+    yield tracer.step('complete', range(n), pivot_index=-1, boundary_left=-1, boundary_right=-1, heap_size=0)
+
+
+def iter_intro_sort_steps(array):
+    """
+    Runs Introsort and yields every step as soon as it is recorded.
+    """
+    return GeneratorSink().run(trace_intro_sort, array)
+
+
+def get_intro_sort_steps(array):
+    """
+    Runs Introsort and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_intro_sort, array)['steps']
+
+
+def get_intro_sort_stats(array):
+    """
+    Runs Introsort without recording any steps and returns its counters
+    (steps, comparisons, swaps, writes, max_depth).
+    """
+    return CounterSink().run(trace_intro_sort, array)
@@ -0,0 +1,47 @@
+# backend/algorithms/jump.py
+from math import isqrt
+
+from .tracer import ListSink
+
+
+def trace_jump_search(tracer, target):
+    """
+    Runs Jump Search on the sorted tracer.array and yields a step for every action.
+
+    The last element of every block of sqrt(n) elements is checked until one
+    is not smaller than the target, then that block is scanned linearly:
+    O(sqrt(n)) comparisons, and the array is only ever read forwards.
+    Besides the common fields, each step carries 'low', 'high', 'probe' and 'found'.
+    """
+    arr = tracer.array
+    n = len(arr)
+    block = isqrt(n) or 1
+
+    yield tracer.step('initial', (), low=0, high=n - 1, probe=-1, found=False)
+
+    # Jump from block to block: [low, high] is the current block
+    low, high = 0, min(block, n) - 1
+    while low < n:
+        yield tracer.step('jump', (high,), low=low, high=high, probe=high, found=False)
+        if tracer.compare_value(high, target) >= 0:
+            break
+        low, high = high + 1, min(high + block, n - 1)
+
+    # Linear scan of the block
+    for i in range(low, min(high + 1, n)):
+        yield tracer.step('probe', (i,), low=low, high=high, probe=i, found=False)
+        order = tracer.compare_value(i, target)
+        if order == 0:
+            yield tracer.step('found', (i,), low=low, high=high, probe=i, found=True)
+            return
+        if order > 0:
+            break
+
+    yield tracer.step('not_found', (), low=low, high=high, probe=-1, found=False)
+
+
+def get_jump_search_steps(arr, target):
+    """
+    Runs Jump Search and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_jump_search, arr, target)['steps']
@@ -1,68 +1,69 @@
-import copy
+from .tracer import ListSink, GeneratorSink, CounterSink
 
-def get_linear_search_steps(arr, target):
+
+def trace_linear_search(tracer, target):
     """
-    Linear Search অ্যালগরিদমের প্রতিটি ধাপ তৈরি করে।
+    Linear Search অ্যালগরিদমের প্রতিটি ধাপ তৈরি হওয়ার সাথে সাথে yield করে।
     এটি অ্যারের প্রতিটি উপাদানকে ক্রমানুসারে টার্গেটের সাথে তুলনা করে।
+    সাধারণ fields ছাড়াও প্রতিটি ধাপে event, event_args, current_index, found থাকে
+    (event-এর লেখা algorithms.messages-এ, শুধু দরকার হলে তৈরি হয়)।
     """
-    steps = []
+    arr = tracer.array
     n = len(arr)
     found = False
     
     # প্রাথমিক ধাপ ট্র‍্যাক করা
-    steps.append({
-        "array": copy.deepcopy(arr), 
-        "action": f"Search started for {target}", 
-        "indices": [],
-        "current_index": -1,
-        "found": False
-    })
+    yield tracer.step("initial", (), event='search.start', event_args=(target,),
+                      current_index=-1, found=False)
 
     for i in range(n):
         
         # অ্যাকশন: বর্তমান উপাদান পরীক্ষা করা (comparison)
-        steps.append({
-            "array": copy.deepcopy(arr), 
-            "action": f"Comparing element at index {i}: Value is {arr[i]}", 
-            "indices": [i], # হাইলাইট করার জন্য বর্তমান সূচক
-            "current_index": i,
-            "found": False
-        })
+        # হাইলাইট করার জন্য বর্তমান সূচক
+        yield tracer.step("comparing", (i,), event='linear.compare', event_args=(i, arr[i]),
+                          current_index=i, found=False)
         
         # তুলনা
-        if arr[i] == target:
+        if tracer.compare_value(i, target) == 0:
             found = True
             break
             
-        # অ্যাকশন: তুলনা ব্যর্থ হয়েছে, পরবর্তী ধাপে যাওয়া
-        steps.append({
-            "array": copy.deepcopy(arr), 
-            "action": f"Value {arr[i]} does not match {target}. Moving to next index.", 
-            "indices": [], # কোনো বিশেষ হাইলাইট নেই, বা পরের ইনডেক্স হাইলাইট করা যেতে পারে
-            "current_index": i,
-            "found": False
-        })
+        # অ্যাকশন: তুলনা ব্যর্থ হয়েছে, পরবর্তী ধাপে যাওয়া
+        yield tracer.step("no_match", (), event='linear.no_match', event_args=(arr[i], target),
+                          current_index=i, found=False)
 
 
     # চূড়ান্ত ফলাফল ট্র‍্যাক করা
     if found:
-        steps.append({
-            "array": copy.deepcopy(arr), 
-            "action": f"Target {target} found at index {i}", 
-            "indices": [i], # যেখানে পাওয়া গেছে সেই সূচক হাইলাইট করা
-            "current_index": i,
-            "found": True
-        })
+        # যেখানে পাওয়া গেছে সেই সূচক হাইলাইট করা
+        yield tracer.step("found", (i,), event='search.found', event_args=(target, i),
+                          current_index=i, found=True)
     else:
-        steps.append({
-            "array": copy.deepcopy(arr), 
-            "action": f"Target {target} not found after checking all elements.", 
-            "indices": [],
-            "current_index": n - 1, # শেষ চেক করা সূচক
-            "found": False
-        })
-        
-    return steps
+        # শেষ চেক করা সূচক
+        yield tracer.step("not_found", (), event='linear.not_found', event_args=(target,),
+                          current_index=n - 1, found=False)
+
+
+def iter_linear_search_steps(arr, target):
+    """
+    Linear Search অ্যালগরিদমের প্রতিটি ধাপ তৈরি হওয়ার সাথে সাথে yield করে।
+    """
+    return GeneratorSink().run(trace_linear_search, arr, target)
+
+
+def get_linear_search_steps(arr, target):
+    """
+    Linear Search অ্যালগরিদমের সব ধাপ (steps) একটি list হিসেবে ফেরত দেয়।
+    """
+    return ListSink().run(trace_linear_search, arr, target)['steps']
+
+
+def get_linear_search_stats(arr, target):
+    """
+    কোনো ধাপ (steps) তৈরি না করে Linear Search চালায় এবং শুধু counters ফেরত দেয়
+    (steps, comparisons, swaps, writes, max_depth)।
+    """
+    return CounterSink().run(trace_linear_search, arr, target)
 
 if __name__ == '__main__':
     # দ্রুত পরীক্ষা করার জন্য
@@ -1,22 +1,12 @@
 # backend/algorithms/merge.py
+from .tracer import ListSink, GeneratorSink, CounterSink
 
-def get_merge_sort_steps(array):
-    steps = []
-    
-    # Start the recursive sort process
-    def merge_sort(arr, start_index, end_index):
-        if start_index >= end_index:
-            return
-
-        mid = (start_index + end_index) // 2
-        
-        # Recursive Division
-        merge_sort(arr, start_index, mid)
-        merge_sort(arr, mid + 1, end_index)
-        
-        # Merge Step
-        merge(arr, start_index, mid, end_index)
 
+def trace_merge_sort(tracer):
+    """
+    Runs Merge Sort on tracer.array and yields a step for every action.
+    """
+    
     # The actual merge function that records steps
     def merge(arr, start_index, mid, end_index):
         auxiliary_array = arr[start_index:end_index + 1]
@@ -27,45 +17,336 @@ def get_merge_sort_steps(array):
 
         while i <= mid - start_index and j <= end_index - start_index:
             # Record comparison state (Highlighting elements being compared)
-            steps.append({
-                'array': list(arr),
-                'highlight_indices': [start_index + i, start_index + j],
-                'action': 'comparing'
-            })
+            yield tracer.step('comparing', (start_index + i, start_index + j))
             
+            tracer.comparisons += 1
             if auxiliary_array[i] <= auxiliary_array[j]:
-                arr[k] = auxiliary_array[i]
+                tracer.write(k, auxiliary_array[i])
                 i += 1
             else:
-                arr[k] = auxiliary_array[j]
+                tracer.write(k, auxiliary_array[j])
                 j += 1
             k += 1
             
             # Record array state after placing an element
-            steps.append({'array': list(arr), 'highlight_indices': [k - 1], 'action': 'placement'})
+            yield tracer.step('placement', (k - 1,))
 
 
         while i <= mid - start_index:
-            arr[k] = auxiliary_array[i]
+            tracer.write(k, auxiliary_array[i])
             # Record placement state
-            steps.append({'array': list(arr), 'highlight_indices': [k], 'action': 'placement'})
+            yield tracer.step('placement', (k,))
             i += 1
             k += 1
 
         while j <= end_index - start_index:
-            arr[k] = auxiliary_array[j]
+            tracer.write(k, auxiliary_array[j])
             # Record placement state
-            steps.append({'array': list(arr), 'highlight_indices': [k], 'action': 'placement'})
+            yield tracer.step('placement', (k,))
             j += 1
             k += 1
+
+        # The whole range is now one sorted run
+        yield tracer.step('merged', range(start_index, end_index + 1))
             
-    # Copy the initial array state
-    arr_copy = list(array)
-    steps.append({'array': list(arr_copy), 'highlight_indices': [], 'action': 'initial'})
+    # Initial array state
+    yield tracer.step('initial')
     
-    # Run the sort
-    merge_sort(arr_copy, 0, len(arr_copy) - 1)
-    
-    steps.append({'array': arr_copy, 'highlight_indices': [], 'action': 'complete'})
+    # Run the sort. Instead of recursing, an explicit stack holds
+    # (start_index, end_index, depth, halves_sorted) entries; the right half is
+    # pushed first so that the left half is sorted first, as in the recursive version.
+    arr = tracer.array
+    stack = [(0, len(arr) - 1, 1, False)]
+    while stack:
+        start_index, end_index, depth, halves_sorted = stack.pop()
+        if start_index >= end_index:
+            continue
+
+        mid = (start_index + end_index) // 2
+        if halves_sorted:
+            # Merge Step
+            tracer.at_depth(depth)
+            yield from merge(arr, start_index, mid, end_index)
+        else:
+            # Recursive Division
+            stack.append((start_index, end_index, depth, True))
+            stack.append((mid + 1, end_index, depth + 1, False))
+            stack.append((start_index, mid, depth + 1, False))
     
-    return steps
\ No newline at end of file
+    yield tracer.step('complete')
+
+
+# Blocks of this many elements are sorted by insertion sort before the first merge pass
+BOTTOM_UP_CUTOFF = 8
+
+
+def trace_bottom_up_merge_sort(tracer):
+    """
+    Runs a bottom-up (iterative) Merge Sort on tracer.array and yields a step
+    for every action.
+
+    Blocks of BOTTOM_UP_CUTOFF elements are first sorted by insertion sort,
+    then neighbouring runs of width 8, 16, 32, ... are merged pass by pass. All
+    merges share one auxiliary buffer allocated up front, only the left run is
+    copied into it, and runs that are already in order are not merged at all.
+    """
+    arr = tracer.array
+    n = len(arr)
+    aux = [None] * n
+
+    yield tracer.step('initial')
+
+    # Insertion sort on every block
+    for lo in range(0, n, BOTTOM_UP_CUTOFF):
+        hi = min(lo + BOTTOM_UP_CUTOFF, n)
+        for i in range(lo + 1, hi):
+            key = arr[i]
+            j = i - 1
+            while j >= lo:
+                yield tracer.step('comparing', (j, i))
+                if tracer.compare_value(j, key) <= 0:
+                    break
+                tracer.write(j + 1, arr[j])
+                j -= 1
+            if j + 1 != i:
+                tracer.write(j + 1, key)
+                yield tracer.step('placement', (j + 1,))
+
+    width = BOTTOM_UP_CUTOFF
+    depth = 1
+    while width < n:
+        tracer.at_depth(depth)
+        for lo in range(0, n - width, 2 * width):
+            mid = lo + width
+            hi = min(lo + 2 * width, n)
+
+            # The two runs are already in order
+            yield tracer.step('comparing', (mid - 1, mid))
+            if tracer.compare(mid - 1, mid) <= 0:
+                continue
+
+            # Copied element by element: a slice of arr would allocate a new list per merge
+            for m in range(lo, mid):
+                aux[m] = arr[m]
+            i, j, k = lo, mid, lo
+            while i < mid and j < hi:
+                yield tracer.step('comparing', (k, j))
+
+                tracer.comparisons += 1
+                if aux[i] <= arr[j]:
+                    tracer.write(k, aux[i])
+                    i += 1
+                else:
+                    tracer.write(k, arr[j])
+                    j += 1
+                k += 1
+                yield tracer.step('placement', (k - 1,))
+
+            # Whatever is left of the right run is already in place
+            while i < mid:
+                tracer.write(k, aux[i])
+                yield tracer.step('placement', (k,))
+                i += 1
+                k += 1
+            yield tracer.step('merged', range(lo, hi))
+        width *= 2
+        depth += 1
+
+    yield tracer.step('complete')
+
+
+def merge_runs(tracer, lo, mid, hi):
+    """
+    Merges the sorted runs array[lo:mid] and array[mid:hi] in place. Only the
+    left run is copied out; the right run is read where it is, since the write
+    position never overtakes it.
+    """
+    arr = tracer.array
+    left = arr[lo:mid]
+    i, j, k = 0, mid, lo
+    while i < len(left) and j < hi:
+        yield tracer.step('comparing', (k, j))
+
+        tracer.comparisons += 1
+        if left[i] <= arr[j]:
+            tracer.write(k, left[i])
+            i += 1
+        else:
+            tracer.write(k, arr[j])
+            j += 1
+        k += 1
+        yield tracer.step('placement', (k - 1,))
+
+    # Whatever is left of the right run is already in place
+    while i < len(left):
+        tracer.write(k, left[i])
+        yield tracer.step('placement', (k,))
+        i += 1
+        k += 1
+    yield tracer.step('merged', range(lo, hi))
+
+
+def min_run_length(n):
+    """
+    Timsort's minimum run length: between 32 and 64, chosen so that n / minrun
+    is a power of two or slightly less (all n below 64 make one run).
+    """
+    low_bits = 0
+    while n >= 64:
+        low_bits |= n & 1
+        n >>= 1
+    return n + low_bits
+
+
+def trace_natural_merge_sort(tracer):
+    """
+    Runs a Timsort-style natural merge sort on tracer.array and yields a step
+    for every action.
+
+    The array is cut into the runs it already contains (descending runs are
+    reversed), short runs are extended to min_run_length() by insertion sort,
+    and runs are merged from a stack that keeps their lengths growing like
+    Fibonacci numbers, so nearly sorted input is sorted in close to linear time.
+    """
+    arr = tracer.array
+    n = len(arr)
+    min_run = min_run_length(n)
+    # Stack of pending runs: (start, length)
+    runs = []
+
+    def merge_at(i):
+        start, length = runs[i]
+        yield from merge_runs(tracer, start, start + length, start + length + runs[i + 1][1])
+        runs[i] = (start, length + runs[i + 1][1])
+        del runs[i + 1]
+
+    yield tracer.step('initial')
+
+    lo = 0
+    while lo < n:
+        # Find the run starting at lo
+        end = lo + 1
+        if end < n:
+            yield tracer.step('comparing', (lo, end))
+            descending = tracer.compare(end, lo) < 0
+            end += 1
+            while end < n:
+                yield tracer.step('comparing', (end - 1, end))
+                # Descending runs must be strictly descending, so reversing keeps the sort stable
+                if (tracer.compare(end, end - 1) < 0) != descending:
+                    break
+                end += 1
+            if descending:
+                i, j = lo, end - 1
+                while i < j:
+                    tracer.swap(i, j)
+                    i += 1
+                    j -= 1
+                yield tracer.step('reversed', range(lo, end))
+
+        # Extend a short run to min_run elements with insertion sort
+        forced_end = min(lo + min_run, n)
+        while end < forced_end:
+            key = arr[end]
+            j = end - 1
+            while j >= lo:
+                yield tracer.step('comparing', (j, end))
+                if tracer.compare_value(j, key) <= 0:
+                    break
+                tracer.write(j + 1, arr[j])
+                j -= 1
+            tracer.write(j + 1, key)
+            yield tracer.step('placement', (j + 1,))
+            end += 1
+
+        yield tracer.step('run_found', range(lo, end))
+        runs.append((lo, end - lo))
+        lo = end
+
+        # Merge until the run lengths satisfy the stack invariants
+        while len(runs) > 1:
+            i = len(runs) - 2
+            if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or \
+                    (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]):
+                if runs[i - 1][1] < runs[i + 1][1]:
+                    i -= 1
+            elif runs[i][1] > runs[i + 1][1]:
+                break
+            tracer.at_depth(len(runs))
+            yield from merge_at(i)
+
+    # Merge whatever is left, smallest neighbours first
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+            i -= 1
+        tracer.at_depth(len(runs))
+        yield from merge_at(i)
+
+    yield tracer.step('complete')
+
+
+def iter_merge_sort_steps(array):
+    """
+    Runs Merge Sort and yields every step as soon as it is recorded.
+    """
+    return GeneratorSink().run(trace_merge_sort, array)
+
+
+def get_merge_sort_steps(array):
+    """
+    Runs Merge Sort and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_merge_sort, array)['steps']
+
+
+def get_merge_sort_stats(array):
+    """
+    Runs Merge Sort without recording any steps and returns its counters
+    (steps, comparisons, swaps, writes, max_depth).
+    """
+    return CounterSink().run(trace_merge_sort, array)
+
+
+def iter_natural_merge_sort_steps(array):
+    """
+    Runs the natural merge sort and yields every step as soon as it is recorded.
+    """
+    return GeneratorSink().run(trace_natural_merge_sort, array)
+
+
+def get_natural_merge_sort_steps(array):
+    """
+    Runs the natural merge sort and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_natural_merge_sort, array)['steps']
+
+
+def get_natural_merge_sort_stats(array):
+    """
+    Runs the natural merge sort without recording any steps and returns its
+    counters (steps, comparisons, swaps, writes, max_depth).
+    """
+    return CounterSink().run(trace_natural_merge_sort, array)
+
+
+def iter_bottom_up_merge_sort_steps(array):
+    """
+    Runs the bottom-up Merge Sort and yields every step as soon as it is recorded.
+    """
+    return GeneratorSink().run(trace_bottom_up_merge_sort, array)
+
+
+def get_bottom_up_merge_sort_steps(array):
+    """
+    Runs the bottom-up Merge Sort and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_bottom_up_merge_sort, array)['steps']
+
+
+def get_bottom_up_merge_sort_stats(array):
+    """
+    Runs the bottom-up Merge Sort without recording any steps and returns its
+    counters (steps, comparisons, swaps, writes, max_depth).
+    """
+    return CounterSink().run(trace_bottom_up_merge_sort, array)
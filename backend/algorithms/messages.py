@@ -0,0 +1,109 @@
+# backend/algorithms/messages.py
+"""
+Message catalog of the step events.
+
+Instead of formatting a sentence on every step, an algorithm records an
+event code and its arguments:
+
+    yield tracer.step("comparing", (j, high), event='quick.compare', event_args=(array[j], pivot), ...)
+
+The text is only rendered when a client asks for it (a request 'locale', see
+render_messages()), and only for the steps that are actually sent. Clients
+can also fetch the templates (GET /api/messages) and render them themselves.
+
+Templates are str.format() strings with positional fields, so a translation
+may reorder the arguments. A locale falls back to English for codes it does
+not translate.
+"""
+
+DEFAULT_LOCALE = 'en'
+
+MESSAGES = {
+    'en': {
+        # Quick Sort
+        'quick.initial': "Initial State",
+        'quick.choose_pivot': "Choosing pivot by {0}: {1} at index {2}",
+        'quick.select_pivot': "Selecting Pivot {0} and Partitioning Range",
+        'quick.compare': "Comparing {0} with Pivot {1}",
+        'quick.swap': "Swapping {0} (at {1}) with {2} (at {3})",
+        'quick.swap_smaller': "Swapping smaller element {0} (at {1}) with element at {2}",
+        'quick.pivot_placed': "Pivot {0} placed at final sorted position ({1})",
+        'quick.pivot_placed_range': "Pivot {0} placed at final sorted positions ({1}-{2})",
+        'quick.complete': "Sorting Complete",
+        # Insertion Sort
+        'insertion.initial': "Initial state: Starting Insertion Sort.",
+        'insertion.select_key': "Selecting key {0} at index {1}. This element will be inserted into the sorted sub-array.",
+        'insertion.compare': "Comparing key {0} with {1} at index {2}. Since {1} > {0}, shifting {1} right.",
+        'insertion.shift': "Element {0} shifted to index {1}.",
+        'insertion.insert': "Key {0} inserted into final position {1}. The sub-array up to index {2} is now sorted.",
+        'insertion.complete': "Sorting complete.",
+        # Binary / Linear Search
+        'search.start': "Search started for {0}",
+        'search.found': "Target {0} found at index {1}",
+        'binary.check_mid': "Checking mid element at index {0}: Value is {1}",
+        'binary.move_low': "Target is greater than {0}. Setting new low to {1}.",
+        'binary.move_high': "Target is less than {0}. Setting new high to {1}.",
+        'binary.not_found': "Target {0} not found in the array.",
+        'linear.compare': "Comparing element at index {0}: Value is {1}",
+        'linear.no_match': "Value {0} does not match {1}. Moving to next index.",
+        'linear.not_found': "Target {0} not found after checking all elements.",
+    },
+    'bn': {
+        'quick.initial': "প্রাথমিক অবস্থা",
+        'quick.choose_pivot': "{0} পদ্ধতিতে pivot বাছাই: index {2}-এ {1}",
+        'quick.select_pivot': "Pivot {0} নির্বাচন এবং range-টি partition করা হচ্ছে",
+        'quick.compare': "{0}-কে Pivot {1}-এর সাথে তুলনা করা হচ্ছে",
+        'quick.swap': "{0} (index {1}) এবং {2} (index {3}) অদলবদল করা হচ্ছে",
+        'quick.swap_smaller': "ছোট উপাদান {0} (index {1}) index {2}-এর উপাদানের সাথে অদলবদল করা হচ্ছে",
+        'quick.pivot_placed': "Pivot {0} তার চূড়ান্ত সাজানো অবস্থানে ({1}) বসানো হয়েছে",
+        'quick.pivot_placed_range': "Pivot {0} তার চূড়ান্ত সাজানো অবস্থানে ({1}-{2}) বসানো হয়েছে",
+        'quick.complete': "সাজানো সম্পূর্ণ",
+        'insertion.initial': "প্রাথমিক অবস্থা: Insertion Sort শুরু হচ্ছে।",
+        'insertion.select_key': "index {1}-এর key {0} বাছাই করা হলো। এটি সাজানো অংশে বসানো হবে।",
+        'insertion.compare': "key {0}-কে index {2}-এর {1}-এর সাথে তুলনা। যেহেতু {1} > {0}, {1}-কে ডানে সরানো হচ্ছে।",
+        'insertion.shift': "উপাদান {0} index {1}-এ সরানো হয়েছে।",
+        'insertion.insert': "key {0} চূড়ান্ত অবস্থান {1}-এ বসানো হয়েছে। index {2} পর্যন্ত অংশটি এখন সাজানো।",
+        'insertion.complete': "সাজানো সম্পূর্ণ।",
+        'search.start': "{0}-এর জন্য অনুসন্ধান শুরু হলো",
+        'search.found': "টার্গেট {0} index {1}-এ পাওয়া গেছে",
+        'binary.check_mid': "index {0}-এর মধ্যম উপাদান পরীক্ষা করা হচ্ছে: মান {1}",
+        'binary.move_low': "টার্গেট {0}-এর চেয়ে বড়। নতুন low = {1}।",
+        'binary.move_high': "টার্গেট {0}-এর চেয়ে ছোট। নতুন high = {1}।",
+        'binary.not_found': "টার্গেট {0} অ্যারেতে পাওয়া যায়নি।",
+        'linear.compare': "index {0}-এর উপাদান তুলনা করা হচ্ছে: মান {1}",
+        'linear.no_match': "মান {0} টার্গেট {1}-এর সাথে মেলেনি। পরের index-এ যাওয়া হচ্ছে।",
+        'linear.not_found': "সব উপাদান পরীক্ষা করার পরেও টার্গেট {0} পাওয়া যায়নি।",
+    },
+}
+
+LOCALES = tuple(MESSAGES)
+
+
+def catalog(locale=DEFAULT_LOCALE):
+    """Every template of `locale`, English where it has no translation."""
+    return dict(MESSAGES[DEFAULT_LOCALE], **MESSAGES[locale])
+
+
+def render(event, args=(), locale=DEFAULT_LOCALE):
+    """The text of one event in `locale`."""
+    template = MESSAGES[locale].get(event) or MESSAGES[DEFAULT_LOCALE][event]
+    return template.format(*args)
+
+
+def render_messages(steps, locale=DEFAULT_LOCALE):
+    """
+    Step filter (see Sink's `reduce`) that adds the rendered 'message' to
+    every Step record with an event.
+    """
+    for step in steps:
+        extra = step.extra
+        if 'event' in extra:
+            extra['message'] = render(extra['event'], extra['event_args'], locale)
+        yield step
+
+
+def add_message(record, locale=DEFAULT_LOCALE):
+    """Like render_messages(), for one already encoded step dict (e.g. a page of a stored trace)."""
+    if 'event' in record:
+        record['message'] = render(record['event'], record['event_args'], locale)
+    return record
@@ -1,120 +1,245 @@
-import copy
+import random
 
-def get_quick_sort_steps(arr):
+from .tracer import ListSink, GeneratorSink, CounterSink
+
+# Pivot বাছাইয়ের কৌশল (প্রথমটি default)
+PIVOT_STRATEGIES = ('last', 'median_of_three', 'random', 'ninther')
+# 'two_way': Lomuto partition; 'three_way': pivot-এর সমান উপাদানগুলো মাঝখানে একসাথে রাখা হয়
+PARTITION_SCHEMES = ('two_way', 'three_way')
+# এর চেয়ে ছোট range-এ ninther-এর বদলে median-of-three ব্যবহার করা হয়
+NINTHER_CUTOFF = 40
+
+
+def trace_quick_sort(tracer, pivot='last', scheme='two_way'):
     """
-    Quick Sort অ্যালগরিদমের প্রতিটি ধাপ (steps) তৈরি করে।
-    প্রতিটি ধাপে array, action, indices, pivot_index ইত্যাদি তথ্য সংরক্ষণ করা হয়।
+    Quick Sort অ্যালগরিদমের প্রতিটি ধাপ (steps) তৈরি হওয়ার সাথে সাথে yield করে।
+    সাধারণ fields ছাড়াও প্রতিটি ধাপে event, event_args, pivot_index, boundary_left, boundary_right থাকে
+    (event-এর লেখা algorithms.messages-এ, শুধু দরকার হলে তৈরি হয়)।
+
+    pivot: 'last' (শেষ উপাদান), 'median_of_three', 'random' বা 'ninther' (Tukey)।
+    scheme: 'two_way' বা 'three_way' (অনেক duplicate থাকলে O(n log n) বজায় রাখে)।
+    ছোট অংশটি সবসময় আগে সাজানো হয়, তাই stack-এ O(log n)-এর বেশি range জমে না।
     """
-    steps = []
-    
+    # 'random' pivot-এর জন্য নির্দিষ্ট seed, যাতে একই input-এর trace সবসময় একই হয়
+    rng = random.Random(len(tracer.array))
+
     # প্রাথমিক ধাপ সংরক্ষণ
-    steps.append({
-        "array": copy.deepcopy(arr), 
-        "action": "Initial State", 
-        "indices": [],
-        "pivot_index": -1,
-        "boundary_left": -1,
-        "boundary_right": -1
-    })
-
-    def swap(array, i, j):
-        """দুটি উপাদানের অবস্থান পরিবর্তন করে।"""
-        array[i], array[j] = array[j], array[i]
+    yield tracer.step("initial", (), event='quick.initial', event_args=(),
+                      pivot_index=-1, boundary_left=-1, boundary_right=-1)
+
+    def median_index(a, b, c):
+        # তিনটি index-এর মধ্যে যেটির মান মাঝামাঝি, সেটি ফেরত দেয়
+        if tracer.compare(a, b) < 0:
+            if tracer.compare(b, c) < 0:
+                return b
+            return c if tracer.compare(a, c) < 0 else a
+        if tracer.compare(a, c) < 0:
+            return a
+        return c if tracer.compare(b, c) < 0 else b
+
+    def choose_pivot(low, high):
+        """
+        কৌশল অনুযায়ী pivot বেছে নিয়ে সেটিকে high-এ সরিয়ে আনে,
+        যাতে partition সবসময় array[high]-কে pivot হিসেবে নিতে পারে।
+        """
+        if pivot == 'last' or high - low < 2:
+            return
+        if pivot == 'random':
+            candidates = (rng.randint(low, high),)
+            chosen = candidates[0]
+        elif pivot == 'ninther' and high - low + 1 >= NINTHER_CUTOFF:
+            # তিনটি median-of-three-এর median
+            step = (high - low) // 8
+            mid = (low + high) // 2
+            candidates = (low, low + step, low + 2 * step,
+                          mid - step, mid, mid + step,
+                          high - 2 * step, high - step, high)
+            chosen = median_index(median_index(*candidates[0:3]),
+                                  median_index(*candidates[3:6]),
+                                  median_index(*candidates[6:9]))
+        else:
+            candidates = (low, (low + high) // 2, high)
+            chosen = median_index(*candidates)
+
+        yield tracer.step("choose_pivot", candidates,
+                          event='quick.choose_pivot', event_args=(pivot, array[chosen], chosen),
+                          pivot_index=chosen, boundary_left=low, boundary_right=high)
+        if chosen != high:
+            tracer.swap(chosen, high)
+
+    def partition_three_way(array, low, high):
+        """
+        Bentley-McIlroy three-way partition: দুই দিক থেকে scan করে (Hoare-এর মতো),
+        pivot-এর সমান উপাদানগুলো প্রথমে দুই প্রান্তে জমা হয়, শেষে মাঝখানে আনা হয়।
+        শেষে [j + 1, i - 1] == pivot; (j, i) ফেরত দেয়, অর্থাৎ যে দুটি অংশ এখনও সাজাতে হবে তাদের সীমানা।
+        """
+        def swap(a, b):
+            if a != b:
+                tracer.swap(a, b)
+
+        # pivot-কে (array[high]) low-তে সরানো হয়, এই partition সেখানেই pivot আশা করে
+        swap(low, high)
+        pivot = array[low]
+
+        yield tracer.step("select_pivot", range(low, high + 1),
+                          event='quick.select_pivot', event_args=(pivot,),
+                          pivot_index=low, boundary_left=low, boundary_right=high)
+
+        i, j = low, high + 1
+        # [low, p] এবং [q, high]: pivot-এর সমান উপাদান
+        p, q = low, high + 1
+        while True:
+            i += 1
+            while True:
+                yield tracer.step("comparing", (i, low),
+                                  event='quick.compare', event_args=(array[i], pivot),
+                                  pivot_index=low, boundary_left=low, boundary_right=high)
+                if tracer.compare_value(i, pivot) >= 0 or i == high:
+                    break
+                i += 1
+            j -= 1
+            while True:
+                yield tracer.step("comparing", (j, low),
+                                  event='quick.compare', event_args=(array[j], pivot),
+                                  pivot_index=low, boundary_left=low, boundary_right=high)
+                if tracer.compare_value(j, pivot) <= 0 or j == low:
+                    break
+                j -= 1
+
+            if i == j and tracer.compare_value(i, pivot) == 0:
+                p += 1
+                swap(p, i)
+            if i >= j:
+                break
+
+            tracer.swap(i, j)
+            yield tracer.step("swapped", (i, j),
+                              event='quick.swap', event_args=(array[i], j, array[j], i),
+                              pivot_index=low, boundary_left=low, boundary_right=high)
+            # সমান উপাদানগুলো প্রান্তে সরিয়ে রাখা
+            if tracer.compare_value(i, pivot) == 0:
+                p += 1
+                swap(p, i)
+            if tracer.compare_value(j, pivot) == 0:
+                q -= 1
+                swap(q, j)
+
+        # প্রান্তের সমান উপাদানগুলো মাঝখানে আনা
+        i = j + 1
+        for k in range(low, p + 1):
+            swap(k, j)
+            j -= 1
+        for k in range(high, q - 1, -1):
+            swap(k, i)
+            i += 1
+
+        # pivot-এর সমান সব উপাদান এখন [j + 1, i - 1]-তে, তাদের চূড়ান্ত অবস্থানে
+        yield tracer.step("pivot_placed", range(j + 1, i),
+                          event='quick.pivot_placed_range', event_args=(pivot, j + 1, i - 1),
+                          pivot_index=j + 1, boundary_left=-1, boundary_right=-1)
+        return j, i
 
     def partition(array, low, high):
         """
         Partition ফাংশনটি একটি pivot নির্বাচন করে এবং অ্যারেটিকে দুটি অংশে বিভক্ত করে।
-        এখানে ডানদিকের শেষ উপাদানটি pivot হিসেবে নেওয়া হয়েছে।
+        এখানে ডানদিকের শেষ উপাদানটি pivot হিসেবে নেওয়া হয়েছে।
         """
-        # pivot-কে ডানদিকে ধরে নেওয়া হলো
+        # pivot-কে ডানদিকে ধরে নেওয়া হলো
         pivot = array[high]
         
         # pivot-এর সঠিক অবস্থানের জন্য ইনডেক্স
         i = low - 1  
         
         # প্রতিটি ধাপ ট্র‍্যাক করা: Pivot নির্বাচন এবং Range নির্ধারণ
-        steps.append({
-            "array": copy.deepcopy(array), 
-            "action": f"Selecting Pivot {pivot} and Partitioning Range", 
-            "indices": list(range(low, high + 1)), # সম্পূর্ণ রেঞ্জ হাইলাইট করা হলো
-            "pivot_index": high,
-            "boundary_left": low,
-            "boundary_right": high
-        })
+        # সম্পূর্ণ রেঞ্জ হাইলাইট করা হলো
+        yield tracer.step("select_pivot", range(low, high + 1),
+                          event='quick.select_pivot', event_args=(pivot,),
+                          pivot_index=high, boundary_left=low, boundary_right=high)
 
         for j in range(low, high):
             # j-কে বর্তমান তুলনার index হিসেবে দেখানো
-            steps.append({
-                "array": copy.deepcopy(array), 
-                "action": f"Comparing {array[j]} with Pivot {pivot}", 
-                "indices": [j, high] + ([i + 1] if i >= low - 1 else []), # বর্তমান উপাদান, pivot, এবং পরবর্তী সম্ভাব্য swap অবস্থান
-                "pivot_index": high,
-                "boundary_left": low,
-                "boundary_right": high
-            })
+            # বর্তমান উপাদান, pivot, এবং পরবর্তী সম্ভাব্য swap অবস্থান
+            yield tracer.step("comparing", (j, high, i + 1),
+                              event='quick.compare', event_args=(array[j], pivot),
+                              pivot_index=high, boundary_left=low, boundary_right=high)
             
-            # যদি বর্তমান উপাদান pivot-এর চেয়ে ছোট বা সমান হয়
-            if array[j] <= pivot:
+            # যদি বর্তমান উপাদান pivot-এর চেয়ে ছোট বা সমান হয়
+            if tracer.compare_value(j, pivot) <= 0:
                 i += 1
                 
                 # i এবং j এর মধ্যে swapping
                 if i != j:
-                    swap(array, i, j)
+                    tracer.swap(i, j)
                 
                     # swapping এর ধাপ ট্র‍্যাক করা
-                    steps.append({
-                        "array": copy.deepcopy(array), 
-                        "action": f"Swapping smaller element {array[i]} (at {j}) with element at {i}", 
-                        "indices": [i, j, high], 
-                        "pivot_index": high,
-                        "boundary_left": low,
-                        "boundary_right": high
-                    })
-                # যদি i == j হয়, তবে array[j] সঠিক অবস্থানেই আছে। তাই কোনো অতিরিক্ত swap step log করার দরকার নেই।
+                    yield tracer.step("swapped", (i, j, high),
+                                      event='quick.swap_smaller', event_args=(array[i], j, i),
+                                      pivot_index=high, boundary_left=low, boundary_right=high)
+                # যদি i == j হয়, তবে array[j] সঠিক অবস্থানেই আছে। তাই কোনো অতিরিক্ত swap step log করার দরকার নেই।
 
 
         # pivot-কে তার সঠিক অবস্থানে স্থাপন (i + 1)
         final_pivot_index = i + 1
-        swap(array, final_pivot_index, high)
+        tracer.swap(final_pivot_index, high)
         
-        # pivot স্থাপনের শেষ ধাপ ট্র‍্যাক করা
-        steps.append({
-            "array": copy.deepcopy(array), 
-            "action": f"Pivot {pivot} placed at final sorted position ({final_pivot_index})", 
-            "indices": [final_pivot_index],
-            "pivot_index": final_pivot_index,
-            "boundary_left": -1, # Boundary reset
-            "boundary_right": -1  # Boundary reset
-        })
+        # pivot স্থাপনের শেষ ধাপ ট্র‍্যাক করা (boundary reset)
+        yield tracer.step("pivot_placed", (final_pivot_index,),
+                          event='quick.pivot_placed', event_args=(pivot, final_pivot_index),
+                          pivot_index=final_pivot_index, boundary_left=-1, boundary_right=-1)
         
-        return final_pivot_index
+        return final_pivot_index - 1, final_pivot_index + 1
 
-    def quick_sort_recursive(array, low, high):
-        if low < high:
-            # pi হল বিভাজন সূচক
-            pi = partition(array, low, high)
+    # tracer.array আসল অ্যারের একটি কপি, তাই আসল অ্যারে পরিবর্তন হয় না
+    array = tracer.array
+    n = len(array)
 
-            # বামদিকের উপাদানগুলিকে সাজানো 
-            quick_sort_recursive(array, low, pi - 1)
-            
-            # ডানদিকের উপাদানগুলিকে সাজানো 
-            quick_sort_recursive(array, pi + 1, high)
+    partition_range = partition_three_way if scheme == 'three_way' else partition
 
-    # আসল অ্যারে পরিবর্তন না করার জন্য কপি ব্যবহার করা হলো
-    temp_arr = copy.deepcopy(arr)
-    quick_sort_recursive(temp_arr, 0, len(temp_arr) - 1)
-    
-    # চূড়ান্ত সাজানোর ধাপ
-    steps.append({
-        "array": temp_arr, 
-        "action": "Sorting Complete", 
-        "indices": list(range(len(temp_arr))), # সম্পূর্ণ অ্যারে হাইলাইট
-        "pivot_index": -1,
-        "boundary_left": -1,
-        "boundary_right": -1
-    })
+    # Recursion-এর বদলে একটি explicit stack: (low, high, depth)
+    stack = [(0, n - 1, 1)]
+    while stack:
+        low, high, depth = stack.pop()
+        if low < high:
+            tracer.at_depth(depth)
+            yield from choose_pivot(low, high)
+            # left_end ও right_start: বাম ও ডান অংশের সীমানা (partition generator-এর return value)
+            left_end, right_start = yield from partition_range(array, low, high)
+
+            # বড় অংশটি আগে push করা হয়, তাই ছোট অংশটি আগে সাজানো হয়
+            # (tail-recursion elimination: stack-এ কখনও O(log n)-এর বেশি range থাকে না)
+            if left_end - low < high - right_start:
+                stack.append((right_start, high, depth + 1))
+                stack.append((low, left_end, depth + 1))
+            else:
+                stack.append((low, left_end, depth + 1))
+                stack.append((right_start, high, depth + 1))
     
-    return steps
+    # চূড়ান্ত সাজানোর ধাপ (সম্পূর্ণ অ্যারে হাইলাইট)
+    yield tracer.step("complete", range(n), event='quick.complete', event_args=(),
+                      pivot_index=-1, boundary_left=-1, boundary_right=-1)
+
+
+def iter_quick_sort_steps(arr, pivot='last', scheme='two_way'):
+    """
+    Quick Sort অ্যালগরিদমের প্রতিটি ধাপ (steps) তৈরি হওয়ার সাথে সাথে yield করে।
+    """
+    return GeneratorSink().run(trace_quick_sort, arr, pivot, scheme)
+
+
+def get_quick_sort_steps(arr, pivot='last', scheme='two_way'):
+    """
+    Quick Sort অ্যালগরিদমের সব ধাপ (steps) একটি list হিসেবে ফেরত দেয়।
+    """
+    return ListSink().run(trace_quick_sort, arr, pivot, scheme)['steps']
+
+
+def get_quick_sort_stats(arr, pivot='last', scheme='two_way'):
+    """
+    কোনো ধাপ (steps) তৈরি না করে Quick Sort চালায় এবং শুধু counters ফেরত দেয়
+    (steps, comparisons, swaps, writes, max_depth)।
+    """
+    return CounterSink().run(trace_quick_sort, arr, pivot, scheme)
+
 
 if __name__ == '__main__':
     # দ্রুত পরীক্ষা করার জন্য
@@ -0,0 +1,201 @@
+# backend/algorithms/registry.py
+import importlib
+
+
+class AlgorithmSpec:
+    """
+    Metadata of one registered algorithm plus a lazy reference to its trace_*
+    generator function: the module is only imported the first time the
+    algorithm is actually run.
+    """
+    __slots__ = ('name', 'id', 'kind', 'module', 'function', 'params', 'options',
+                 'requires_sorted', 'complexity', 'actions', 'fields', '_trace')
+
+    def __init__(self, name, id, kind, module, function, params, options, requires_sorted,
+                 complexity, actions, fields):
+        self.name = name
+        self.id = id
+        self.kind = kind
+        self.module = module
+        self.function = function
+        self.params = params
+        # (option name, allowed values) pairs; the first value is the default
+        self.options = options
+        self.requires_sorted = requires_sorted
+        self.complexity = complexity
+        self.actions = actions
+        self.fields = fields
+        self._trace = None
+
+    @property
+    def trace(self):
+        if self._trace is None:
+            module = importlib.import_module(f'.{self.module}', __package__)
+            self._trace = getattr(module, self.function)
+        return self._trace
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'id': self.id,
+            'kind': self.kind,
+            'params': list(self.params),
+            'options': {option: list(choices) for option, choices in self.options},
+            'requires_sorted': self.requires_sorted,
+            'complexity': self.complexity,
+            'step_schema': {
+                'actions': list(self.actions),
+                # Fields every step carries on top of 'array', 'action' and 'highlight_indices'
+                # ('message' is added to steps with an 'event' when the request has a 'locale')
+                'fields': list(self.fields),
+            },
+        }
+
+
+_by_name = {}
+_by_id = {}
+
+
+def register(name, id, kind, module, function, params=(), options=(), requires_sorted=False,
+             complexity=None, actions=(), fields=()):
+    """
+    Declares an algorithm. Only the module and function names are recorded,
+    so registering does not import anything.
+
+    `options` are (name, allowed values) pairs; their values are passed to the
+    trace function positionally, after the params, in the declared order.
+    """
+    if name in _by_name or id in _by_id:
+        raise ValueError(f"Algorithm already registered: {name}")
+    spec = AlgorithmSpec(name, id, kind, module, function, tuple(params),
+                         tuple((option, tuple(choices)) for option, choices in options), requires_sorted,
+                         complexity or {}, tuple(actions), tuple(fields))
+    _by_name[name] = spec
+    _by_id[id] = spec
+    return spec
+
+
+def get(name):
+    """Looks an algorithm up by display name ('Quick Sort') or id ('quick_sort'); None if unknown."""
+    return _by_name.get(name) or _by_id.get(name)
+
+
+def all_algorithms():
+    return list(_by_name.values())
+
+
+def _complexity(best, average, worst, space):
+    return {'best': best, 'average': average, 'worst': worst, 'space': space}
+
+
+# --- Built-in algorithms ---
+
+register('Bubble Sort', 'bubble_sort', 'sort', 'bubble', 'trace_bubble_sort',
+         complexity=_complexity('O(n^2)', 'O(n^2)', 'O(n^2)', 'O(1)'),
+         actions=('initial', 'comparing', 'swapped', 'complete'))
+
+register('Insertion Sort', 'insertion_sort', 'sort', 'insertion', 'trace_insertion_sort',
+         complexity=_complexity('O(n)', 'O(n^2)', 'O(n^2)', 'O(1)'),
+         actions=('initial', 'select_key', 'comparing', 'shifted', 'inserted', 'complete'),
+         fields=('pivot_index', 'event', 'event_args', 'sorted_until'))
+
+register('Selection Sort', 'selection_sort', 'sort', 'selection', 'trace_selection_sort',
+         complexity=_complexity('O(n^2)', 'O(n^2)', 'O(n^2)', 'O(1)'),
+         actions=('initial', 'start_min_search', 'comparing', 'new_minimum', 'swap',
+                  'sorted_position', 'complete'))
+
+register('Quick Sort', 'quick_sort', 'sort', 'quick', 'trace_quick_sort',
+         options=(('pivot', ('last', 'median_of_three', 'random', 'ninther')),
+                  ('partition', ('two_way', 'three_way'))),
+         complexity=_complexity('O(n log n)', 'O(n log n)', 'O(n^2)', 'O(log n)'),
+         actions=('initial', 'choose_pivot', 'select_pivot', 'comparing', 'swapped', 'pivot_placed',
+                  'complete'),
+         fields=('event', 'event_args', 'pivot_index', 'boundary_left', 'boundary_right'))
+
+register('Merge Sort', 'merge_sort', 'sort', 'merge', 'trace_merge_sort',
+         complexity=_complexity('O(n log n)', 'O(n log n)', 'O(n log n)', 'O(n)'),
+         actions=('initial', 'comparing', 'placement', 'merged', 'complete'))
+
+register('Bubble Sort (Early Exit)', 'adaptive_bubble_sort', 'sort', 'bubble', 'trace_adaptive_bubble_sort',
+         complexity=_complexity('O(n)', 'O(n^2)', 'O(n^2)', 'O(1)'),
+         actions=('initial', 'comparing', 'swapped', 'pass_complete', 'early_exit', 'complete'),
+         fields=('boundary',))
+
+register('Cocktail Shaker Sort', 'cocktail_shaker_sort', 'sort', 'bubble', 'trace_cocktail_shaker_sort',
+         complexity=_complexity('O(n)', 'O(n^2)', 'O(n^2)', 'O(1)'),
+         actions=('initial', 'comparing', 'swapped', 'pass_complete', 'early_exit', 'complete'),
+         fields=('boundary_left', 'boundary_right'))
+
+register('Binary Insertion Sort', 'binary_insertion_sort', 'sort', 'insertion', 'trace_binary_insertion_sort',
+         # Comparisons: O(n log n) at worst; the shifts stay O(n^2)
+         complexity=_complexity('O(n)', 'O(n^2)', 'O(n^2)', 'O(1)'),
+         actions=('initial', 'select_key', 'comparing', 'shifted', 'inserted', 'complete'),
+         fields=('pivot_index', 'sorted_until'))
+
+register('Double Selection Sort', 'double_selection_sort', 'sort', 'selection', 'trace_double_selection_sort',
+         complexity=_complexity('O(n^2)', 'O(n^2)', 'O(n^2)', 'O(1)'),
+         actions=('initial', 'start_min_search', 'comparing', 'new_minimum', 'new_maximum', 'swap',
+                  'sorted_position', 'complete'),
+         fields=('boundary_left', 'boundary_right'))
+
+register('Shell Sort', 'shell_sort', 'sort', 'shell', 'trace_shell_sort',
+         options=(('gaps', ('ciura', 'knuth', 'shell')),),
+         # Depends on the gap sequence; these are for Ciura's / Knuth's gaps
+         complexity=_complexity('O(n log n)', 'O(n^1.25)', 'O(n^1.5)', 'O(1)'),
+         actions=('initial', 'gap', 'select_key', 'comparing', 'shifted', 'inserted', 'complete'),
+         fields=('gap',))
+
+register('Heap Sort', 'heap_sort', 'sort', 'heap', 'trace_heap_sort',
+         complexity=_complexity('O(n log n)', 'O(n log n)', 'O(n log n)', 'O(1)'),
+         actions=('initial', 'comparing', 'swapped', 'heap_built', 'sorted_position', 'complete'),
+         fields=('heap_size',))
+
+register('Introsort', 'intro_sort', 'sort', 'intro', 'trace_intro_sort',
+         complexity=_complexity('O(n log n)', 'O(n log n)', 'O(n log n)', 'O(log n)'),
+         actions=('initial', 'select_pivot', 'comparing', 'swapped', 'pivot_placed', 'inserted',
+                  'heap_fallback', 'heap_built', 'sorted_position', 'complete'),
+         fields=('pivot_index', 'boundary_left', 'boundary_right', 'heap_size'))
+
+register('Bottom-Up Merge Sort', 'bottom_up_merge_sort', 'sort', 'merge', 'trace_bottom_up_merge_sort',
+         complexity=_complexity('O(n)', 'O(n log n)', 'O(n log n)', 'O(n)'),
+         actions=('initial', 'comparing', 'placement', 'merged', 'complete'))
+
+register('Natural Merge Sort', 'natural_merge_sort', 'sort', 'merge', 'trace_natural_merge_sort',
+         complexity=_complexity('O(n)', 'O(n log n)', 'O(n log n)', 'O(n)'),
+         actions=('initial', 'comparing', 'reversed', 'placement', 'run_found', 'merged', 'complete'))
+
+register('Binary Search', 'binary_search', 'search', 'binarysearch', 'trace_binary_search',
+         params=('target',), requires_sorted=True,
+         complexity=_complexity('O(1)', 'O(log n)', 'O(log n)', 'O(1)'),
+         actions=('initial', 'check_mid', 'move_low', 'move_high', 'found', 'not_found'),
+         fields=('event', 'event_args', 'low', 'high', 'mid', 'found'))
+
+register('Linear Search', 'linear_search', 'search', 'linear', 'trace_linear_search',
+         params=('target',),
+         complexity=_complexity('O(1)', 'O(n)', 'O(n)', 'O(1)'),
+         actions=('initial', 'comparing', 'no_match', 'found', 'not_found'),
+         fields=('event', 'event_args', 'current_index', 'found'))
+
+register('Interpolation Search', 'interpolation_search', 'search', 'interpolation', 'trace_interpolation_search',
+         params=('target',), requires_sorted=True,
+         complexity=_complexity('O(1)', 'O(log log n)', 'O(n)', 'O(1)'),
+         actions=('initial', 'probe', 'move_low', 'move_high', 'found', 'not_found'),
+         fields=('low', 'high', 'probe', 'found'))
+
+register('Exponential Search', 'exponential_search', 'search', 'exponential', 'trace_exponential_search',
+         params=('target',), requires_sorted=True,
+         complexity=_complexity('O(1)', 'O(log i)', 'O(log n)', 'O(1)'),
+         actions=('initial', 'extend_bound', 'probe', 'move_low', 'move_high', 'found', 'not_found'),
+         fields=('low', 'high', 'probe', 'found'))
+
+register('Jump Search', 'jump_search', 'search', 'jump', 'trace_jump_search',
+         params=('target',), requires_sorted=True,
+         complexity=_complexity('O(1)', 'O(sqrt n)', 'O(sqrt n)', 'O(1)'),
+         actions=('initial', 'jump', 'probe', 'found', 'not_found'),
+         fields=('low', 'high', 'probe', 'found'))
+
+register('Fibonacci Search', 'fibonacci_search', 'search', 'fibonacci', 'trace_fibonacci_search',
+         params=('target',), requires_sorted=True,
+         complexity=_complexity('O(1)', 'O(log n)', 'O(log n)', 'O(1)'),
+         actions=('initial', 'probe', 'move_low', 'move_high', 'found', 'not_found'),
+         fields=('low', 'high', 'probe', 'found'))
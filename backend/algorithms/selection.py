@@ -1,22 +1,19 @@
-def get_selection_sort_steps(array):
+from .tracer import ListSink, GeneratorSink, CounterSink
+
+
+def trace_selection_sort(tracer):
     """
-    Performs the Selection Sort algorithm and returns a list of steps 
-    for visualization.
+    Performs the Selection Sort algorithm on tracer.array and yields the steps
+    for visualization one at a time.
 
-    Each step is a dictionary containing:
-    - 'array': The state of the array after the current action.
-    - 'action': A descriptive string of the action taken (e.g., 'comparison', 'swap', 'sorted').
-    - 'highlight_indices': A list of indices to highlight for the current action.
+    Actions: 'initial', 'start_min_search', 'comparing', 'new_minimum', 'swap',
+    'sorted_position', 'complete'. 'highlight_indices' holds the indices
+    involved in the current action.
     """
-    n = len(array)
-    steps = []
+    n = len(tracer.array)
     
     # Record the initial state
-    steps.append({
-        'array': list(array),
-        'action': 'initial_state',
-        'highlight_indices': []
-    })
+    yield tracer.step('initial')
 
     # The main sorting loop
     for i in range(n):
@@ -24,61 +21,116 @@ def get_selection_sort_steps(array):
         min_idx = i
         
         # Action: Start the search for the minimum element (Highlight 'i')
-        steps.append({
-            'array': list(array),
-            'action': 'start_min_search',
-            'highlight_indices': [i]
-        })
+        yield tracer.step('start_min_search', (i,))
 
         # Find the minimum element in the unsorted portion (from i+1 to n)
         for j in range(i + 1, n):
             
             # Action: Comparison
-            steps.append({
-                'array': list(array),
-                'action': 'comparison',
-                # Highlight the current candidate for minimum (min_idx) and the element being compared (j)
-                'highlight_indices': [min_idx, j]
-            })
+            # Highlight the current candidate for minimum (min_idx) and the element being compared (j)
+            yield tracer.step('comparing', (min_idx, j))
             
-            if array[j] < array[min_idx]:
+            if tracer.compare(j, min_idx) < 0:
                 min_idx = j
                 
                 # Action: New minimum found
-                steps.append({
-                    'array': list(array),
-                    'action': 'new_minimum',
-                    # Highlight the newly found minimum index
-                    'highlight_indices': [min_idx]
-                })
+                yield tracer.step('new_minimum', (min_idx,))
 
         # If the minimum element is not at the current position 'i', swap them
         if min_idx != i:
             
             # --- FIX: Record the 'swap' action BEFORE modifying the array ---
             # Action: Highlight the indices that are about to be swapped (Pre-swap state)
-            steps.append({
-                'array': list(array),
-                'action': 'swap',
-                'highlight_indices': [i, min_idx]
-            })
+            yield tracer.step('swap', (i, min_idx))
             
-            # Perform the swap (Modifies the array in place)
-            array[i], array[min_idx] = array[min_idx], array[i]
+            # Perform the swap
+            tracer.swap(i, min_idx)
         
         # Action: Mark the current position 'i' as sorted/finalized
-        # The 'list(array)' here captures the result of the swap (or lack thereof)
-        steps.append({
-            'array': list(array),
-            'action': 'sorted_position',
-            'highlight_indices': [i]
-        })
+        # The snapshot here captures the result of the swap (or lack thereof)
+        yield tracer.step('sorted_position', (i,))
 
     # Action: Final state (entire array is sorted)
-    steps.append({
-        'array': list(array),
-        'action': 'complete',
-        'highlight_indices': []
-    })
-    
-    return steps
\ No newline at end of file
+    yield tracer.step('complete')
+
+
+def trace_double_selection_sort(tracer):
+    """
+    Double-ended Selection Sort: every pass over the unsorted range
+    [boundary_left, boundary_right] finds both its minimum and its maximum and
+    moves them to the two ends, so only n / 2 passes are needed.
+
+    Actions: 'initial', 'start_min_search', 'comparing', 'new_minimum',
+    'new_maximum', 'swap', 'sorted_position', 'complete'. Besides the common
+    fields, each step carries 'boundary_left' and 'boundary_right'.
+    """
+    n = len(tracer.array)
+    lo, hi = 0, n - 1
+
+    yield tracer.step('initial', boundary_left=lo, boundary_right=hi)
+
+    while lo < hi:
+        min_idx = max_idx = lo
+        yield tracer.step('start_min_search', (lo, hi), boundary_left=lo, boundary_right=hi)
+
+        for j in range(lo + 1, hi + 1):
+            yield tracer.step('comparing', (min_idx, j), boundary_left=lo, boundary_right=hi)
+            if tracer.compare(j, min_idx) < 0:
+                min_idx = j
+                yield tracer.step('new_minimum', (min_idx,), boundary_left=lo, boundary_right=hi)
+                # A new minimum can never be a new maximum
+                continue
+
+            yield tracer.step('comparing', (max_idx, j), boundary_left=lo, boundary_right=hi)
+            if tracer.compare(j, max_idx) > 0:
+                max_idx = j
+                yield tracer.step('new_maximum', (max_idx,), boundary_left=lo, boundary_right=hi)
+
+        if min_idx != lo:
+            yield tracer.step('swap', (lo, min_idx), boundary_left=lo, boundary_right=hi)
+            tracer.swap(lo, min_idx)
+            # The maximum was at lo and has just moved to min_idx
+            if max_idx == lo:
+                max_idx = min_idx
+
+        if max_idx != hi:
+            yield tracer.step('swap', (hi, max_idx), boundary_left=lo, boundary_right=hi)
+            tracer.swap(hi, max_idx)
+
+        yield tracer.step('sorted_position', (lo, hi), boundary_left=lo, boundary_right=hi)
+        lo += 1
+        hi -= 1
+
+    yield tracer.step('complete', boundary_left=-1, boundary_right=-1)
+
+
+def iter_selection_sort_steps(array):
+    """
+    Performs the Selection Sort algorithm and yields the steps for
+    visualization one at a time.
+    """
+    return GeneratorSink().run(trace_selection_sort, array)
+
+
+def get_selection_sort_steps(array):
+    """
+    Performs the Selection Sort algorithm and returns a list of steps 
+    for visualization (see trace_selection_sort for the actions).
+    """
+    return ListSink().run(trace_selection_sort, array)['steps']
+
+
+def get_selection_sort_stats(array):
+    """
+    Performs the Selection Sort algorithm without recording any steps and
+    returns its counters (steps, comparisons, swaps, writes, max_depth).
+    """
+    return CounterSink().run(trace_selection_sort, array)
+
+
+def get_double_selection_sort_steps(array):
+    """
+    Performs the double-ended Selection Sort and returns a list of steps for
+    visualization (see trace_double_selection_sort for the actions).
+    """
+    return ListSink().run(trace_double_selection_sort, array)['steps']
@@ -1,16 +1,97 @@
 # backend/algorithms/shell.py
+from .tracer import ListSink, GeneratorSink, CounterSink
 
-def get_shell_sort_steps(array):
+# Ciura's empirically best gaps; extended by x2.25 for larger arrays
+CIURA_GAPS = (1, 4, 10, 23, 57, 132, 301, 701, 1750)
+
+
+def shell_gaps(n):
+    """Shell's original sequence: n/2, n/4, ..., 1."""
+    gaps = []
+    gap = n // 2
+    while gap > 0:
+        gaps.append(gap)
+        gap //= 2
+    return gaps
+
+
+def knuth_gaps(n):
+    """Knuth's sequence (3^k - 1) / 2: 1, 4, 13, 40, ... below n/3, largest first."""
+    gaps = [1]
+    while gaps[-1] * 3 + 1 < max(n // 3, 2):
+        gaps.append(gaps[-1] * 3 + 1)
+    return gaps[::-1]
+
+
+def ciura_gaps(n):
+    """Ciura's sequence below n, largest first."""
+    gaps = list(CIURA_GAPS)
+    while gaps[-1] * 2.25 < n:
+        gaps.append(int(gaps[-1] * 2.25))
+    return [gap for gap in reversed(gaps) if gap < n] or [1]
+
+
+GAP_SEQUENCES = {
+    'ciura': ciura_gaps,
+    'knuth': knuth_gaps,
+    'shell': shell_gaps,
+}
+
+
+def trace_shell_sort(tracer, gaps='ciura'):
+    """
+    Runs Shell Sort on tracer.array and yields a step for every action: an
+    insertion sort over every gap-th element, for each gap of the chosen
+    sequence ('ciura', 'knuth' or 'shell') down to 1.
+
+    Besides the common fields, each step carries 'gap', the current gap.
+    """
+    array = tracer.array
+    n = len(array)
+
+    yield tracer.step('initial', (), gap=0)
+
+    for gap in GAP_SEQUENCES[gaps](n):
+        yield tracer.step('gap', (), gap=gap)
+
+        for i in range(gap, n):
+            key = array[i]
+            j = i
+            yield tracer.step('select_key', (i,), gap=gap)
+
+            # Shift the larger elements of this gap's chain one gap to the right
+            while j >= gap:
+                yield tracer.step('comparing', (j - gap, i), gap=gap)
+                if tracer.compare_value(j - gap, key) <= 0:
+                    break
+                tracer.write(j, array[j - gap])
+                yield tracer.step('shifted', (j,), gap=gap)
+                j -= gap
+
+            if j != i:
+                tracer.write(j, key)
+                yield tracer.step('inserted', (j,), gap=gap)
+
+    yield tracer.step('complete', range(n), gap=0)
+
+
+def iter_shell_sort_steps(array, gaps='ciura'):
+    """
+    Runs Shell Sort and yields every step as soon as it is recorded.
+    """
+    return GeneratorSink().run(trace_shell_sort, array, gaps)
+
+
+def get_shell_sort_steps(array, gaps='ciura'):
+    """
+    Runs Shell Sort and returns the list of recorded steps.
+    """
+    return ListSink().run(trace_shell_sort, array, gaps)['steps']
+
+
+def get_shell_sort_stats(array, gaps='ciura'):
     """
-    Placeholder for the Shell Sort algorithm.
+    Runs Shell Sort without recording any steps and returns its counters
+    (steps, comparisons, swaps, writes, max_depth).
     """
-    # In a real implementation, this would return the step-by-step
-    # visualization data. For now, we return a structure that tells
-    # the frontend this algorithm is unsupported.
-    
-    # We return a single step that represents the original array and an error action.
-    return [{
-        'array': array,
-        'action': 'unsupported_algorithm',
-        'highlight_indices': []
-    }]
\ No newline at end of file
+    return CounterSink().run(trace_shell_sort, array, gaps)
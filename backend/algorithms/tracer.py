@@ -0,0 +1,320 @@
+# backend/algorithms/tracer.py
+import json
+
+from .delta import iter_delta_trace
+
+
+class Step:
+    """
+    One recorded visualization step.
+
+    Every algorithm produces the same schema:
+    - 'array': Snapshot of the array (None when the tracer does not snapshot this step).
+    - 'action': Short machine-readable code of the action (e.g. 'comparing', 'swapped').
+    - 'highlight_indices': Indices to highlight for this step.
+    - 'ops': Array operations applied since the previous step (delta mode only).
+    - 'extra': Algorithm-specific fields (pivot_index, low/high/mid, event, ...).
+    """
+    __slots__ = ('action', 'indices', 'array', 'ops', 'extra')
+
+    def __init__(self, action, indices, array, ops, extra):
+        self.action = action
+        self.indices = indices
+        self.array = array
+        self.ops = ops
+        self.extra = extra
+
+    def to_dict(self):
+        """Full-snapshot representation (the default /api/visualize format)."""
+        step = {'array': self.array, 'action': self.action, 'highlight_indices': list(self.indices)}
+        if self.extra:
+            step.update(self.extra)
+        return step
+
+    def to_delta(self):
+        """
+        Delta representation: the step metadata plus the ops since the previous
+        step, and the array snapshot as 'keyframe' when this step has one.
+        """
+        step = {'action': self.action, 'highlight_indices': list(self.indices)}
+        if self.extra:
+            step.update(self.extra)
+        step['ops'] = self.ops
+        if self.array is not None:
+            step['keyframe'] = self.array
+        return step
+
+
+class Tracer:
+    """
+    Shared step-recording engine used by every algorithm in this package.
+
+    The algorithm works on `tracer.array` (a private copy of the input), mutates
+    it only through swap()/write(), counts comparisons through compare() /
+    compare_value(), reports the recursion depth of divide-and-conquer
+    algorithms through at_depth(), and yields
+    `tracer.step(...)` for everything worth showing.
+
+    The mode decides what a step costs:
+    - 'full': every step carries an array snapshot. Snapshots are copy-on-write:
+      a new list is only made after swap()/write() changed the array, so
+      consecutive steps over an unchanged array (comparisons, every step of a
+      search) share one snapshot. Snapshots must therefore be treated as read-only.
+    - 'delta': only the first step, and every `keyframe_interval`-th step after
+      it, carries a snapshot (a keyframe); every step carries the swap/write
+      ops applied since the previous step.
+    - 'count': no Step is created at all, only the counters are updated.
+    """
+
+    def __init__(self, array, mode='full', keyframe_interval=None):
+        if mode not in ('full', 'delta', 'count'):
+            raise ValueError(f"Unknown tracer mode: {mode}")
+        self.array = list(array)
+        self.mode = mode
+        self.keyframe_interval = keyframe_interval
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.steps = 0
+        self.depth = 0
+        self.max_depth = 0
+        self._ops = []
+        # Last snapshot handed out, or None once the array has changed since
+        self._snapshot = None
+
+    def compare(self, i, j):
+        """Compares the elements at i and j; returns -1, 0 or 1."""
+        self.comparisons += 1
+        a, b = self.array[i], self.array[j]
+        return (a > b) - (a < b)
+
+    def compare_value(self, i, value):
+        """Compares the element at i with a value held outside the array (pivot, key, target)."""
+        self.comparisons += 1
+        a = self.array[i]
+        return (a > value) - (a < value)
+
+    def swap(self, i, j):
+        array = self.array
+        array[i], array[j] = array[j], array[i]
+        self.swaps += 1
+        self._snapshot = None
+        if self.mode == 'delta':
+            self._ops.append(('swap', i, j))
+
+    def write(self, k, value):
+        self.array[k] = value
+        self.writes += 1
+        self._snapshot = None
+        if self.mode == 'delta':
+            self._ops.append(('write', k, value))
+
+    def at_depth(self, depth):
+        """
+        Marks that the algorithm now works on a sub-problem `depth` levels deep.
+        Algorithms keep their own explicit stack instead of nesting generators,
+        since every `yield from` level is paid again on each yielded step.
+        """
+        self.depth = depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def step(self, action, indices=(), **extra):
+        """Records one step of the given action; returns None in 'count' mode."""
+        self.steps += 1
+        if self.mode == 'count':
+            return None
+        if self.mode == 'full' or self.steps == 1 or (
+                self.keyframe_interval and (self.steps - 1) % self.keyframe_interval == 0):
+            snapshot = self._snapshot
+            if snapshot is None:
+                snapshot = self._snapshot = list(self.array)
+        else:
+            snapshot = None
+        ops = self._ops
+        if ops:
+            self._ops = []
+        else:
+            ops = ()
+        return Step(action, indices, snapshot, ops, extra)
+
+    def counters(self):
+        return {
+            'steps': self.steps,
+            'comparisons': self.comparisons,
+            'swaps': self.swaps,
+            'writes': self.writes,
+            'max_depth': self.max_depth,
+        }
+
+
+def encode_steps(steps, encoding='full'):
+    """
+    Lazily converts Step records into JSON-ready dicts.
+
+    'full' yields Step.to_dict() for every step; 'delta' first yields the
+    {'format': 'delta', 'initial': [...]} header and then Step.to_delta().
+    """
+    if encoding == 'delta':
+        return iter_delta_trace(steps)
+    return (step.to_dict() for step in steps)
+
+
+# Actions that only show progress within a larger operation (a comparison, one
+# element placed / shifted, a probe); reduce_frames() drops these first
+MINOR_ACTIONS = frozenset({
+    'comparing', 'placement', 'shifted', 'select_key', 'start_min_search', 'new_minimum',
+    'new_maximum', 'no_match', 'check_mid', 'probe', 'move_low', 'move_high', 'jump', 'extend_bound',
+})
+# Swaps come next; every other action marks a structural event (pivot placed, run merged, ...)
+SWAP_ACTIONS = frozenset({'swapped', 'swap'})
+
+
+def reduce_frames(steps, max_frames, total_steps):
+    """
+    Reduces a stream of Step records to at most `max_frames` frames in a single
+    pass, holding no more than one step back.
+
+    Frames are handed out in proportion to the progress through the
+    `total_steps` expected steps; with the exact count exactly `max_frames`
+    frames are kept (an upper bound gives fewer). Structural steps (pivot
+    placements, completed merges, ...) are kept whenever a frame is
+    available, swaps only while one more frame is held back for the next
+    structural step, and runs of MINOR_ACTIONS steps (comparisons,
+    placements, ...) are coalesced, taking a frame only while two more are
+    held back. Frames are only held back while the budget has them to spare
+    and the steps left can still use them up. The first and the last step
+    are always kept.
+
+    A kept step stands for the steps dropped right before it: it carries
+    their ops (so a delta trace still replays to the same arrays) and, when
+    it stands for more than itself, 'coalesced', the number of steps it covers.
+    """
+    # The last step is always kept on top of these, so they are spread over the steps before it
+    budget = max_frames - 1
+    spread = max(total_steps - 1, 1)
+    emitted = 0
+    carried = []
+    dropped = 0
+    # The last dropped step, kept after all if it turns out to be the final one
+    held = None
+    for index, step in enumerate(steps):
+        if held is not None:
+            carried.extend(held.ops)
+            held = None
+        allowed = min(max(budget * (index + 1) // spread, 1), budget)
+        # Frames held back for structural steps, as long as the budget has them to spare
+        if step.action in MINOR_ACTIONS:
+            allowed -= min(2, budget - allowed)
+        elif step.action in SWAP_ACTIONS:
+            allowed -= min(1, budget - allowed)
+        if budget - emitted >= spread - index:
+            # Every step left before the last one is needed to use up the budget
+            allowed = budget
+        if emitted >= allowed:
+            held = step
+            dropped += 1
+            continue
+        yield _coalesce(step, carried, dropped)
+        carried = []
+        dropped = 0
+        emitted += 1
+    if held is not None:
+        yield _coalesce(held, carried, dropped - 1)
+
+
+def _coalesce(step, carried, dropped):
+    if carried:
+        step.ops = carried + list(step.ops)
+    if dropped:
+        step.extra['coalesced'] = dropped + 1
+    return step
+
+
+# --- Sinks: what happens to the steps an algorithm yields ---
+
+class Sink:
+    """
+    Base class of all sinks. `run` creates a Tracer in the mode the sink needs,
+    starts the algorithm (a generator function taking the tracer first) and
+    hands its steps to `consume`. `reduce`, if given, filters the step stream
+    on the way (e.g. functools.partial(reduce_frames, max_frames=..., total_steps=...)).
+    """
+    counts_only = False
+
+    def __init__(self, encoding='full', keyframe_interval=None, reduce=None):
+        if encoding not in ('full', 'delta'):
+            raise ValueError(f"Unknown encoding: {encoding}")
+        self.encoding = encoding
+        self.keyframe_interval = keyframe_interval
+        self.reduce = reduce
+
+    def run(self, algorithm, array, *args):
+        tracer = Tracer(array, mode='count' if self.counts_only else self.encoding,
+                        keyframe_interval=self.keyframe_interval)
+        steps = algorithm(tracer, *args)
+        if self.reduce is not None and not self.counts_only:
+            steps = self.reduce(steps)
+        return self.consume(steps, tracer)
+
+    def consume(self, steps, tracer):
+        raise NotImplementedError
+
+
+class ListSink(Sink):
+    """Collects the whole trace into one response document."""
+
+    def consume(self, steps, tracer):
+        records = encode_steps(steps, self.encoding)
+        if self.encoding == 'delta':
+            document = next(records, {'format': 'delta', 'initial': []})
+        else:
+            document = {}
+        document['steps'] = list(records)
+        return document
+
+
+class GeneratorSink(Sink):
+    """Hands out the encoded steps lazily, one at a time (used for streaming)."""
+
+    def consume(self, steps, tracer):
+        return encode_steps(steps, self.encoding)
+
+
+class CounterSink(Sink):
+    """
+    Runs the algorithm without creating any steps and returns its counters;
+    with a `limit`, returns None as soon as the algorithm goes over `limit` steps.
+    """
+    counts_only = True
+
+    def __init__(self, limit=None):
+        super().__init__()
+        self.limit = limit
+
+    def consume(self, steps, tracer):
+        limit = self.limit
+        if limit is None:
+            for _ in steps:
+                pass
+        else:
+            for _ in steps:
+                if tracer.steps > limit:
+                    return None
+        return tracer.counters()
+
+
+class FileSink(Sink):
+    """Writes the encoded steps to a file as newline-delimited JSON."""
+
+    def __init__(self, fp, encoding='full', keyframe_interval=None, reduce=None):
+        super().__init__(encoding, keyframe_interval, reduce)
+        self.fp = fp
+
+    def consume(self, steps, tracer):
+        written = 0
+        for record in encode_steps(steps, self.encoding):
+            self.fp.write(json.dumps(record))
+            self.fp.write('\n')
+            written += 1
+        return written
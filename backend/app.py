@@ -1,113 +1,599 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
+import json
+import os
 import random
 
 # --- Algorithm imports ---
 # Assuming these files exist in an 'algorithms' directory
-from algorithms.selection import get_selection_sort_steps
-from algorithms.bubble import get_bubble_sort_steps
-from algorithms.insertion import get_insertion_sort_steps
-from algorithms.quick import get_quick_sort_steps
-from algorithms.merge import get_merge_sort_steps
-from algorithms.binarysearch import get_binary_search_steps
-from algorithms.linear import get_linear_search_steps
-from algorithms.bst import get_bst_steps
+from algorithms import registry
+from algorithms.bst import TREE_TYPES, TREE_FORMATS, StepBudgetExceeded, get_bst_steps
+from algorithms.messages import DEFAULT_LOCALE, LOCALES, catalog, add_message
+from algorithms.tracer import GeneratorSink
+from dispatch import OverBudget, parse_trace_request, select_job, plan_trace, run_trace
+from batch import MAX_BATCH_JOBS, run_jobs
+from trace_cache import TraceCache, trace_key
+from trace_store import TraceStore
+from bst_sessions import BSTSessionStore
+from wire import JSON, MIMETYPES, CONTENT_ENCODINGS, encode, compress
+import arrays
 
 # Initialize Flask App
 app = Flask(__name__)
 # Enable CORS for frontend connection (crucial when running on different ports/domains)
-CORS(app) 
+# The X-Array-* headers describe binary /api/array responses
+CORS(app, expose_headers=['X-Array-Length', 'X-Array-Dtype', 'X-Array-Seed', 'X-Array-Generator']) 
+
+# Serialized /api/visualize responses, shared by all requests (64 MB budget)
+trace_cache = TraceCache(max_bytes=64 * 1024 * 1024)
+# Pre-generated traces, stored on disk and paged through mmap
+trace_store = TraceStore(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'traces'))
+# Largest number of steps returned by one /api/visualize/<trace_id> page
+MAX_PAGE_STEPS = 5000
+# Operations of /api/bst, and the most of them (or values to build from) per /api/bst/batch request
+BST_OPERATIONS = ('insert', 'delete', 'search')
+MAX_BST_BATCH = 100000
+# Most steps one /api/bst/batch request may record (like the trace budget of /api/visualize)
+MAX_BST_STEPS = 1_000_000
+# Server-side BST sessions, dropped after 30 minutes without an operation
+bst_sessions = BSTSessionStore(ttl=30 * 60, max_sessions=1000)
+
+def stream_steps(steps, stream_mode):
+    """
+    Serializes steps one at a time while the algorithm is still running.
+
+    'ndjson' writes one JSON document per line; 'sse' wraps every document in a
+    Server-Sent Events 'data:' frame. Only the current step is held in memory.
+    """
+    if stream_mode == 'sse':
+        prefix, suffix = 'data: ', '\n\n'
+    else:
+        prefix, suffix = '', '\n'
+
+    try:
+        for step in steps:
+            yield prefix + json.dumps(step) + suffix
+    except OverBudget as e:
+        # A trace of unknown length went over the budget it was recorded with (see dispatch.capped_filter)
+        yield prefix + json.dumps({"error": str(e), "estimate": e.estimate}) + suffix
+    except Exception as e:
+        # The status code has already been sent, so report the failure in-band
+        print(f"Algorithm error while streaming: {e}")
+        yield prefix + json.dumps({"error": f"Error during algorithm execution: {str(e)}"}) + suffix
+
+def job_cache_key(job, array, args, representation=(JSON, 'identity')):
+    """
+    Cache key of a parsed job, given the array and arguments select_trace() resolved for it,
+    and the (mimetype, content encoding) of the cached body.
+    """
+    return trace_key(job['algorithm'], array, args, job['format'], job['mode'], job['keyframe_interval'],
+                     job['max_frames'], job['locale'], job['max_steps'], job['max_bytes'], job['over_budget'],
+                     *representation)
+
+def negotiate_encoding():
+    """The best content encoding the client accepts (Accept-Encoding); 'identity' if none."""
+    return request.accept_encodings.best_match(CONTENT_ENCODINGS, default='identity')
+
+def negotiate():
+    """
+    Picks the response format from the Accept / Accept-Encoding headers (see wire.py);
+    returns (mimetype, content encoding), or None when no supported mimetype is acceptable.
+    Without an Accept header the response is JSON.
+    """
+    accept = request.accept_mimetypes
+    mimetype = accept.best_match(MIMETYPES) if accept else JSON
+    if mimetype is None:
+        return None
+    return mimetype, negotiate_encoding()
+
+def not_acceptable():
+    return jsonify({"error": f"Supported response formats: {', '.join(MIMETYPES)}"}), 406
+
+def encoded_response(body, representation, status=200):
+    """Wraps a body already encoded (and compressed) for the negotiated representation."""
+    mimetype, content_encoding = representation
+    response = Response(body, status=status, mimetype=mimetype)
+    if content_encoding != 'identity':
+        response.headers['Content-Encoding'] = content_encoding
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    return response
+
+def send_document(document, status=200):
+    """Like jsonify(document), in the format the client negotiated."""
+    representation = negotiate()
+    if representation is None:
+        return not_acceptable()
+    mimetype, content_encoding = representation
+    body = compress(encode(document, mimetype), content_encoding)
+    return encoded_response(body, representation, status)
 
 @app.route('/api/visualize', methods=['POST'])
 def visualize_algorithm():
     """Handles requests for visualization steps for sorting and searching."""
     data = request.get_json()
+    # None (default): a single response in the negotiated format (see negotiate());
+    # 'ndjson' / 'sse': steps are streamed as they are generated
+    stream_mode = data.get('stream') if isinstance(data, dict) else None
+    representation = negotiate()
+    if representation is None and not stream_mode:
+        return not_acceptable()
+
+    try:
+        job = parse_trace_request(data)
+        trace, array, args = select_job(job)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if stream_mode not in [None, 'ndjson', 'sse']:
+        return jsonify({"error": "Stream must be 'ndjson' or 'sse'"}), 400
+
+    if stream_mode and job['targets'] is not None:
+        return jsonify({"error": "'targets' cannot be streamed"}), 400
+
+    if stream_mode:
+        # Only the step budget applies: a streamed trace is never held in memory. A stats job
+        # (asked for, or the budget's fallback) has nothing to stream and is answered as plain JSON
+        try:
+            plan = plan_trace(job, trace, array, args, check_bytes=False)
+            mode, reduce, _ = plan
+            if mode == 'stats':
+                return jsonify(run_trace(job, trace, array, args, plan))
+        except OverBudget as e:
+            return jsonify({"error": str(e), "estimate": e.estimate}), 413
+        except Exception as e:
+            # e.g. values that cannot be compared, found while the step bounds are computed
+            print(f"Algorithm error for {job['algorithm']}: {e}")
+            return jsonify({"error": f"Error during algorithm execution: {str(e)}"}), 500
+
+        # The algorithm only runs while the response is being sent (also when it is reduced to
+        # max_frames); in delta format the first streamed document is the {'format', 'initial'} header
+        steps = GeneratorSink(job['format'], job['keyframe_interval'], reduce).run(trace, array, *args)
+        mimetype = 'text/event-stream' if stream_mode == 'sse' else 'application/x-ndjson'
+        return Response(stream_with_context(stream_steps(steps, stream_mode)), mimetype=mimetype)
+
+    # Re-runs of the same array (replay, speed change, rewind) are served from the cache
+    cache_key = job_cache_key(job, array, args, representation)
+    body = trace_cache.get(cache_key)
+
+    if body is None:
+        try:
+            document = run_trace(job, trace, array, args)
+            mimetype, content_encoding = representation
+            # Also fails on values JSON cannot hold (NaN, Infinity)
+            body = compress(encode(document, mimetype), content_encoding)
+        except OverBudget as e:
+            # Refused before any step was recorded
+            return jsonify({"error": str(e), "estimate": e.estimate}), 413
+        except Exception as e:
+            # Generic error handling for algorithm logic failure
+            print(f"Algorithm error for {job['algorithm']}: {e}")
+            return jsonify({"error": f"Error during algorithm execution: {str(e)}"}), 500
+
+        trace_cache.put(cache_key, body)
+
+    return encoded_response(body, representation)
+
+@app.route('/api/algorithms', methods=['GET'])
+def list_algorithms():
+    """Lists the registered algorithms with their parameters, complexity and step schema."""
+    return jsonify({"algorithms": [spec.to_dict() for spec in registry.all_algorithms()]})
+
+@app.route('/api/messages', methods=['GET'])
+def list_messages():
+    """
+    The message templates of the step events (see algorithms/messages.py), for
+    clients that render the 'event' / 'event_args' of the steps themselves.
+    """
+    locale = request.args.get('locale', DEFAULT_LOCALE)
+    if locale not in LOCALES:
+        return jsonify({"error": f"'locale' must be one of: {', '.join(LOCALES)}"}), 400
+    return jsonify({"locale": locale, "locales": list(LOCALES), "messages": catalog(locale)})
+
+@app.route('/api/visualize/batch', methods=['POST'])
+def visualize_batch():
+    """
+    Runs several /api/visualize jobs (e.g. every sort on the same array for the
+    "race" view) in one request. Jobs not already cached are spread over a pool
+    of worker processes; 'results' holds one document per job, in order.
+    """
+    data = request.get_json()
+    jobs = data.get('jobs') if isinstance(data, dict) else None
+
+    if not jobs or not isinstance(jobs, list):
+        return jsonify({"error": "Invalid or missing 'jobs' in request."}), 400
+    if len(jobs) > MAX_BATCH_JOBS:
+        return jsonify({"error": f"At most {MAX_BATCH_JOBS} jobs per batch"}), 400
+
+    parsed = []
+    for index, item in enumerate(jobs):
+        try:
+            job = parse_trace_request(item)
+            _, array, args = select_job(job)
+        except ValueError as e:
+            return jsonify({"error": f"Job {index}: {str(e)}"}), 400
+        parsed.append((job, job_cache_key(job, array, args)))
+
+    bodies = [trace_cache.get(cache_key) for _, cache_key in parsed]
+    missing = [index for index, body in enumerate(bodies) if body is None]
+
+    if missing:
+        results = run_jobs([parsed[index][0] for index in missing])
+        for index, (body, ok) in zip(missing, results):
+            bodies[index] = body
+            if ok:
+                trace_cache.put(parsed[index][1], body)
+
+    # The job documents are already encoded as JSON; splice them into one response body
+    content_encoding = negotiate_encoding()
+    body = compress(b'{"results":[' + b','.join(bodies) + b']}', content_encoding)
+    return encoded_response(body, (JSON, content_encoding))
+
+@app.route('/api/cache', methods=['GET'])
+def cache_stats():
+    """Reports the hit/miss/eviction counters and size of the trace cache."""
+    return jsonify(trace_cache.stats())
+
+def is_int64(value):
+    """Whether a request value fits the int64 values of the binary trace format (bools excluded)."""
+    return isinstance(value, int) and not isinstance(value, bool) and -2 ** 63 <= value < 2 ** 63
+
+@app.route('/api/traces', methods=['POST'])
+def create_trace():
+    """
+    Generates a trace and stores it on disk for later paging through
+    /api/visualize/<trace_id>. The same input always maps to the same trace id.
+    Traces over the budget of /api/visualize (see dispatch.plan_trace) are
+    refused with 413 before anything is run or written.
+    """
+    data = request.get_json()
     algorithm = data.get('algorithm')
     array = data.get('array')
-    target = data.get('target') # for search algorithms
+    target = data.get('target')
+    # Every keyframe_interval-th step is stored with the full array (default: see default_keyframe_interval)
+    keyframe_interval = data.get('keyframe_interval')
 
-    steps = []
-    
-    # Validation for array presence
-    if not array or not isinstance(array, list):
-        return jsonify({"error": "Invalid or missing 'array' in request."}), 400
+    # The binary trace format stores the values as 64-bit integers
+    if not array or not isinstance(array, list) or not all(is_int64(v) for v in array):
+        return jsonify({"error": "Invalid or missing 'array' in request (64-bit integers only)."}), 400
+
+    if keyframe_interval is not None and (not isinstance(keyframe_interval, int) or keyframe_interval < 1):
+        return jsonify({"error": "'keyframe_interval' must be a positive integer"}), 400
 
     try:
-        if algorithm == 'Bubble Sort':
-            steps = get_bubble_sort_steps(list(array))
-        elif algorithm == 'Insertion Sort':
-            steps = get_insertion_sort_steps(list(array))
-        elif algorithm == 'Selection Sort':
-            steps = get_selection_sort_steps(list(array))
-        elif algorithm == 'Quick Sort':
-            steps = get_quick_sort_steps(list(array))
-        elif algorithm == 'Merge Sort':
-            steps = get_merge_sort_steps(list(array))
-        elif algorithm == 'Binary Search':
-            # Binary search requires a sorted array
-            sorted_array = sorted(list(array)) 
-            # Note: This returns (steps, found)
-            steps, found = get_binary_search_steps(sorted_array, target)
-        elif algorithm == 'Linear Search':
-            # Note: This returns (steps, found)
-            steps, found = get_linear_search_steps(list(array), target)
-        else:
-            return jsonify({"error": f"Unsupported algorithm: {algorithm}"}), 400
+        # Stored traces get the same step / byte budget as a delta-format /api/visualize response
+        job = parse_trace_request({'algorithm': algorithm, 'array': array, 'target': target,
+                                   'options': data.get('options'), 'format': 'delta',
+                                   'keyframe_interval': keyframe_interval})
+        trace, array, args = select_job(job)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    except Exception as e:
-        # Generic error handling for algorithm logic failure
-        print(f"Algorithm error for {algorithm}: {e}")
-        return jsonify({"error": f"Error during algorithm execution: {str(e)}"}), 500
+    # Keyed and stored by id, so 'Bubble Sort' and 'bubble_sort' share one trace
+    algorithm = registry.get(algorithm).id
+    trace_id = trace_key(algorithm, array, args, keyframe_interval)
+    if not trace_store.exists(trace_id):
+        try:
+            _, reduce, _ = plan_trace(job, trace, array, args)
+            trace_store.save(trace_id, algorithm, trace, array, *args, keyframe_interval=keyframe_interval,
+                             reduce=reduce)
+        except OverBudget as e:
+            return jsonify({"error": str(e), "estimate": e.estimate}), 413
+        except Exception as e:
+            print(f"Algorithm error for {algorithm}: {e}")
+            return jsonify({"error": f"Error during algorithm execution: {str(e)}"}), 500
 
-    return jsonify({"steps": steps})
+    with trace_store.open(trace_id) as stored:
+        return jsonify({"trace_id": trace_id, "algorithm": stored.algorithm, "total_steps": stored.step_count})
+
+@app.route('/api/visualize/<trace_id>', methods=['GET'])
+def page_trace(trace_id):
+    """
+    Returns steps [from, to) of a stored trace in the delta format, together with
+    'array', the state of the array right before step 'from'. Keyframe steps in
+    the window carry their full array as 'keyframe', so seeking anywhere only
+    replays the deltas since the nearest keyframe. With ?locale= the steps of
+    the page also get their rendered 'message'.
+    """
+    start = request.args.get('from', 0, type=int)
+    stop = request.args.get('to', start + MAX_PAGE_STEPS, type=int)
+    locale = request.args.get('locale')
+
+    if start < 0 or stop < start:
+        return jsonify({"error": "Expected 0 <= from <= to"}), 400
+    if locale is not None and locale not in LOCALES:
+        return jsonify({"error": f"'locale' must be one of: {', '.join(LOCALES)}"}), 400
+    stop = min(stop, start + MAX_PAGE_STEPS)
+
+    try:
+        stored = trace_store.open(trace_id)
+    except KeyError:
+        return jsonify({"error": f"Unknown trace: {trace_id}"}), 404
+
+    with stored:
+        stop = min(stop, stored.step_count)
+        start = min(start, stop)
+        steps = stored.steps(start, stop)
+        if locale is not None:
+            steps = [add_message(step, locale) for step in steps]
+        return jsonify({
+            "trace_id": trace_id,
+            "algorithm": stored.algorithm,
+            "total_steps": stored.step_count,
+            "keyframe_interval": stored.keyframe_interval,
+            "from": start,
+            "to": stop,
+            "array": stored.array_before(start),
+            "steps": steps,
+        })
 
 @app.route('/api/array', methods=['GET'])
 def generate_array():
-    """Generates a random array for visualization."""
+    """
+    Generates an array for visualization or for stress tests (see arrays.py):
+    ?size=&max_val=&distribution=&seed=, plus 'swaps' (nearly_sorted),
+    'unique' (few_unique) and 'exponent' (zipf). The response carries the seed,
+    so the same array can be asked for again. With ?format=binary the body is
+    the raw little-endian int32 values, described by the X-Array-* headers.
+    """
     size = request.args.get('size', 15, type=int)
     max_val = request.args.get('max_val', 100, type=int)
+    distribution = request.args.get('distribution', 'uniform')
+    seed = request.args.get('seed', type=int)
+    output = request.args.get('format', 'json')
     
-    if size > 100 or size < 1:
+    if size > arrays.MAX_ARRAY_SIZE or size < 1:
         size = 15
     if max_val < 1:
         max_val = 100
+    max_val = min(max_val, arrays.MAX_VALUE)
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+
+    if seed < 0:
+        return jsonify({"error": "'seed' must be a non-negative integer"}), 400
+    if output not in ['json', 'binary']:
+        return jsonify({"error": "Format must be 'json' or 'binary'"}), 400
+
+    try:
+        values = arrays.generate(size, distribution, seed, max_val,
+                                 swaps=request.args.get('swaps', type=int),
+                                 unique=request.args.get('unique', type=int),
+                                 exponent=request.args.get('exponent', arrays.DEFAULT_ZIPF_EXPONENT, type=float))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    new_array = [random.randint(1, max_val) for _ in range(size)]
-    return jsonify({"array": new_array})
+    if output == 'binary':
+        return Response(arrays.to_bytes(values), mimetype='application/octet-stream', headers={
+            'X-Array-Length': str(size),
+            'X-Array-Dtype': 'int32',
+            'X-Array-Seed': str(seed),
+            'X-Array-Generator': arrays.BACKEND,
+        })
+    return jsonify({"array": values.tolist(), "seed": seed, "distribution": distribution,
+                    "generator": arrays.BACKEND})
 
 @app.route('/api/bst', methods=['POST'])
 def bst_operation():
-    """Handles insert/delete operations for the Binary Search Tree."""
+    """
+    Handles insert/delete/search operations for the Binary Search Tree.
+
+    With a 'session_id' (see /api/bst/sessions) the tree stays on the server and
+    only the steps plus a structural diff are returned; otherwise the whole
+    'tree_state' is sent along and returned as 'new_tree_state_dict'.
+    'tree_type' picks a plain ('bst', default), 'avl' or 'red_black' tree, and
+    'tree_format' the wire format of the tree: nested dicts ('nested', default)
+    or parallel index arrays ('flat', see algorithms.bst.to_flat).
+    """
     data = request.get_json()
     operation = data.get('operation')
     value = data.get('value')
+    session_id = data.get('session_id')
+    tree_type = data.get('tree_type', 'bst')
+    tree_format = data.get('tree_format', 'nested')
     
     # FIX: Use 'tree_state' (snake_case) to match React request payload
     tree_state = data.get('tree_state') 
     
     # Validation
-    if operation not in ['insert', 'delete']:
-        return jsonify({"error": "Operation must be 'insert' or 'delete'"}), 400
+    if operation not in BST_OPERATIONS:
+        return jsonify({"error": "Operation must be 'insert', 'delete' or 'search'"}), 400
     
     if value is None:
         return jsonify({"error": "Missing 'value' in request"}), 400
+
+    if not is_bst_value(value):
+        return jsonify({"error": "'value' must be an integer"}), 400
+
+    if tree_type not in TREE_TYPES:
+        return jsonify({"error": f"'tree_type' must be one of {', '.join(TREE_TYPES)}"}), 400
+
+    if tree_format not in TREE_FORMATS:
+        return jsonify({"error": "'tree_format' must be 'nested' or 'flat'"}), 400
+
+    if session_id is not None:
+        session = bst_sessions.get(session_id)
+        if session is None:
+            return jsonify({"error": f"Unknown or expired BST session: {session_id}"}), 404
+        try:
+            with session.lock:
+                steps, diff = session.tree.apply(operation, value)
+        except Exception as e:
+            print(f"BST operation error: {e}")
+            return jsonify({"error": f"Error during BST operation: {str(e)}"}), 500
+        return send_document({"session_id": session_id, "steps": steps, "diff": diff})
     
     try:
         # get_bst_steps returns (steps, new_tree_state_dict)
-        steps, new_state = get_bst_steps(tree_state, operation, value)
+        steps, new_state = get_bst_steps(tree_state, operation, value, tree_type, tree_format)
         
         # Log for debugging purposes
-        print(f"BST Operation: {operation}, Value: {value}. New State Head Value: {new_state.get('value') if new_state else 'None'}")
+        if tree_format == 'flat':
+            head = new_state['values'][0] if new_state['values'] else None
+        else:
+            head = new_state.get('value') if new_state else None
+        print(f"BST Operation: {operation}, Value: {value}. New State Head Value: {head}")
         
-        return jsonify({
+        return send_document({
             "steps": steps,
             # FIX: Use 'new_tree_state_dict' (snake_case) to match React expectation
             "new_tree_state_dict": new_state 
         })
+    except ValueError as e:
+        # Malformed flat tree_state
+        return jsonify({"error": f"Invalid 'tree_state': {str(e)}"}), 400
     except Exception as e:
         print(f"BST operation error: {e}")
         return jsonify({"error": f"Error during BST operation: {str(e)}"}), 500
 
+def is_bst_value(value):
+    """Tree nodes hold integers; anything else would be truncated and break the BST order."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def parse_bst_batch(data):
+    """
+    Validates the 'operations' ([{operation, value}, ...]) or 'build' ([values])
+    of a batch request; returns (operations, build values), one of them None.
+    Raises ValueError with a client-facing message.
+    """
+    operations = data.get('operations')
+    build = data.get('build')
+    if (operations is None) == (build is None):
+        raise ValueError("Expected either 'operations' or 'build'")
+
+    if build is not None:
+        if not isinstance(build, list) or len(build) > MAX_BST_BATCH or not all(is_bst_value(v) for v in build):
+            raise ValueError(f"'build' must be a list of at most {MAX_BST_BATCH} integers")
+        return None, build
+
+    if not isinstance(operations, list) or not operations or len(operations) > MAX_BST_BATCH:
+        raise ValueError(f"'operations' must be a list of 1 to {MAX_BST_BATCH} operations")
+    parsed = []
+    for i, op in enumerate(operations):
+        if not isinstance(op, dict) or op.get('operation') not in BST_OPERATIONS or not is_bst_value(op.get('value')):
+            raise ValueError(f"Operation {i}: expected {{'operation': 'insert'|'delete'|'search', 'value': integer}}")
+        parsed.append((op['operation'], op['value']))
+    return parsed, None
+
+@app.route('/api/bst/batch', methods=['POST'])
+def bst_batch():
+    """
+    Runs many BST operations in one call: either a list of 'operations' applied
+    in order, or 'build', which replaces the tree by a balanced one holding the
+    given values (sorted first if necessary) in O(n).
+
+    Returns the combined 'steps', plus 'operations' with the first step and
+    step count of every operation. The tree is given and returned like in
+    /api/bst: through 'session_id' (returns a 'diff') or 'tree_state'.
+    Operations recording more than MAX_BST_STEPS steps in total are refused
+    with 413, and a session tree is left as it was.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object."}), 400
+    session_id = data.get('session_id')
+    tree_type = data.get('tree_type', 'bst')
+    tree_format = data.get('tree_format', 'nested')
+
+    if tree_type not in TREE_TYPES:
+        return jsonify({"error": f"'tree_type' must be one of {', '.join(TREE_TYPES)}"}), 400
+    if tree_format not in TREE_FORMATS:
+        return jsonify({"error": "'tree_format' must be 'nested' or 'flat'"}), 400
+    try:
+        operations, build = parse_bst_batch(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def run(tree):
+        if build is not None:
+            steps, diff = tree.build(build)
+            spans = [(0, len(steps))]
+            operations_done = [{"operation": "build", "value": None}]
+        else:
+            steps, diff, spans = tree.apply_batch(operations, MAX_BST_STEPS)
+            operations_done = [{"operation": op, "value": value} for op, value in operations]
+        for op, (first, count) in zip(operations_done, spans):
+            op["first_step"] = first
+            op["step_count"] = count
+        return steps, diff, operations_done
+
+    if session_id is not None:
+        session = bst_sessions.get(session_id)
+        if session is None:
+            return jsonify({"error": f"Unknown or expired BST session: {session_id}"}), 404
+        try:
+            with session.lock:
+                # A batch over the step budget is undone, so the session tree stays as the client knows it
+                backup = session.tree.to_state('flat') if operations is not None else None
+                try:
+                    steps, diff, operations_done = run(session.tree)
+                except StepBudgetExceeded:
+                    session.tree = type(session.tree).from_state(backup, 'flat')
+                    raise
+        except StepBudgetExceeded as e:
+            return jsonify({"error": str(e), "estimate": {"steps": e.steps, "exact": False,
+                                                          "max_steps": e.max_steps}}), 413
+        except Exception as e:
+            print(f"BST batch error: {e}")
+            return jsonify({"error": f"Error during BST operation: {str(e)}"}), 500
+        return send_document({"session_id": session_id, "steps": steps, "operations": operations_done, "diff": diff})
+
+    try:
+        tree = TREE_TYPES[tree_type].from_state(data.get('tree_state'), tree_format)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid 'tree_state': {str(e)}"}), 400
+    try:
+        steps, _, operations_done = run(tree)
+    except StepBudgetExceeded as e:
+        return jsonify({"error": str(e), "estimate": {"steps": e.steps, "exact": False,
+                                                      "max_steps": e.max_steps}}), 413
+    except Exception as e:
+        print(f"BST batch error: {e}")
+        return jsonify({"error": f"Error during BST operation: {str(e)}"}), 500
+    return send_document({
+        "steps": steps,
+        "operations": operations_done,
+        "new_tree_state_dict": tree.to_state(tree_format),
+    })
+
+@app.route('/api/bst/sessions', methods=['POST'])
+def create_bst_session():
+    """
+    Opens a server-side BST session, optionally starting from a 'tree_state'.
+    The session keeps its 'tree_type' for all later operations.
+    """
+    data = request.get_json(silent=True) or {}
+    tree_type = data.get('tree_type', 'bst')
+    tree_format = data.get('tree_format', 'nested')
+    if tree_type not in TREE_TYPES:
+        return jsonify({"error": f"'tree_type' must be one of {', '.join(TREE_TYPES)}"}), 400
+    if tree_format not in TREE_FORMATS:
+        return jsonify({"error": "'tree_format' must be 'nested' or 'flat'"}), 400
+    try:
+        tree = TREE_TYPES[tree_type].from_state(data.get('tree_state'), tree_format)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid 'tree_state': {str(e)}"}), 400
+    session_id = bst_sessions.create(tree)
+    return jsonify({"session_id": session_id, "tree_type": tree_type, "ttl": bst_sessions.ttl,
+                    "tree_state": tree.to_state(tree_format)}), 201
+
+@app.route('/api/bst/sessions/<session_id>', methods=['GET'])
+def get_bst_session(session_id):
+    """Returns the full tree of a session (e.g. to resynchronize a client); ?format=flat for the flat format."""
+    tree_format = request.args.get('format', 'nested')
+    if tree_format not in TREE_FORMATS:
+        return jsonify({"error": "'format' must be 'nested' or 'flat'"}), 400
+    session = bst_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": f"Unknown or expired BST session: {session_id}"}), 404
+    with session.lock:
+        return jsonify({"session_id": session_id, "tree_state": session.tree.to_state(tree_format)})
+
+@app.route('/api/bst/sessions/<session_id>', methods=['DELETE'])
+def delete_bst_session(session_id):
+    if not bst_sessions.delete(session_id):
+        return jsonify({"error": f"Unknown or expired BST session: {session_id}"}), 404
+    return '', 204
+
 if __name__ == '__main__':
     # Running on port 5001 as shown in your console log
     app.run(debug=True, port=5001)
\ No newline at end of file
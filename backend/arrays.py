@@ -0,0 +1,138 @@
+# backend/arrays.py
+"""
+Input arrays for /api/array: seeded, in several distributions, up to
+MAX_ARRAY_SIZE elements. Uses NumPy when it is installed and the standard
+library otherwise; either way the values are int32 (see to_bytes() for the
+binary form).
+
+The same seed, parameters and backend always give the same array. NumPy and
+the fallback draw different numbers, so the backend is reported with every
+array (see BACKEND).
+"""
+import random
+import sys
+from array import array
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BACKEND = 'numpy' if np is not None else 'stdlib'
+
+DISTRIBUTIONS = ('uniform', 'sorted', 'reversed', 'nearly_sorted', 'few_unique', 'zipf', 'organ_pipe')
+MAX_ARRAY_SIZE = 5_000_000
+MAX_VALUE = 2 ** 31 - 1
+# few_unique: number of distinct values; zipf: exponent of the rank weights 1 / k^s
+DEFAULT_UNIQUE = 8
+DEFAULT_ZIPF_EXPONENT = 1.2
+# Zipf is drawn from the ranks 1..max_val; larger ranges are cut here (the tail is negligible)
+MAX_ZIPF_RANKS = 1_000_000
+
+
+def default_swaps(size):
+    """nearly_sorted: about 1% of the elements out of place (none in a one-element array)."""
+    return min(max(1, size // 100), size // 2)
+
+
+def generate(size, distribution='uniform', seed=0, max_val=100, swaps=None, unique=None,
+             exponent=DEFAULT_ZIPF_EXPONENT):
+    """
+    `size` values in 1..max_val:
+    - uniform:       independent, uniformly distributed
+    - sorted:        uniform, ascending
+    - reversed:      uniform, descending
+    - nearly_sorted: sorted, then `swaps` disjoint random pairs swapped
+                     (at most size // 2; default: see default_swaps; ignored
+                     by the other distributions)
+    - few_unique:    `unique` distinct values (default: DEFAULT_UNIQUE, at most max_val;
+                     more than `size` are cut to `size`) drawn once, then repeated at random
+    - zipf:          value k with probability proportional to 1 / k^exponent
+    - organ_pipe:    uniform values rising, then falling (sorted into a pipe)
+    Raises ValueError for arguments out of range.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"'distribution' must be one of: {', '.join(DISTRIBUTIONS)}")
+    if not 1 <= size <= MAX_ARRAY_SIZE:
+        raise ValueError(f"'size' must be between 1 and {MAX_ARRAY_SIZE}")
+    if not 1 <= max_val <= MAX_VALUE:
+        raise ValueError(f"'max_val' must be between 1 and {MAX_VALUE}")
+    if distribution == 'nearly_sorted':
+        if swaps is None:
+            swaps = default_swaps(size)
+        if not 0 <= swaps <= size // 2:
+            raise ValueError(f"'swaps' must be between 0 and {size // 2}")
+    else:
+        swaps = 0
+    if unique is None:
+        unique = DEFAULT_UNIQUE
+    elif not 1 <= unique <= max_val:
+        raise ValueError("'unique' must be between 1 and 'max_val'")
+    # No more distinct values than there are elements (or values to draw them from)
+    unique = min(unique, size, max_val)
+    if not exponent > 0:
+        raise ValueError("'exponent' must be positive")
+
+    if np is not None:
+        return _generate_numpy(size, distribution, seed, max_val, swaps, unique, exponent)
+    return _generate_stdlib(size, distribution, seed, max_val, swaps, unique, exponent)
+
+
+def _generate_numpy(size, distribution, seed, max_val, swaps, unique, exponent):
+    rng = np.random.default_rng(seed)
+    if distribution == 'few_unique':
+        values = (rng.choice(max_val, unique, replace=False) + 1).astype(np.int32)
+        result = values[rng.integers(0, unique, size)]
+    elif distribution == 'zipf':
+        ranks = np.arange(1, min(max_val, MAX_ZIPF_RANKS) + 1, dtype=np.float64)
+        cumulative = np.cumsum(ranks ** -exponent)
+        # Inverse CDF: the rank whose cumulative weight first reaches a uniform draw
+        draws = rng.random(size) * cumulative[-1]
+        result = (np.minimum(np.searchsorted(cumulative, draws), len(ranks) - 1) + 1).astype(np.int32)
+    else:
+        result = rng.integers(1, max_val + 1, size, dtype=np.int32)
+
+    if distribution in ('sorted', 'reversed', 'nearly_sorted', 'organ_pipe'):
+        result.sort()
+    if distribution == 'reversed':
+        result = result[::-1]
+    elif distribution == 'nearly_sorted' and swaps:
+        positions = rng.choice(size, 2 * swaps, replace=False)
+        first, second = positions[:swaps], positions[swaps:]
+        result[first], result[second] = result[second], result[first]
+    elif distribution == 'organ_pipe':
+        result = np.concatenate((result[0::2], result[1::2][::-1]))
+    return result.astype('<i4', copy=False)
+
+
+def _generate_stdlib(size, distribution, seed, max_val, swaps, unique, exponent):
+    rng = random.Random(seed)
+    if distribution == 'few_unique':
+        values = rng.sample(range(1, max_val + 1), unique)
+        result = rng.choices(values, k=size)
+    elif distribution == 'zipf':
+        ranks = range(1, min(max_val, MAX_ZIPF_RANKS) + 1)
+        result = rng.choices(ranks, cum_weights=list(accumulate(k ** -exponent for k in ranks)), k=size)
+    else:
+        # choices() over a range is several times faster than randint() per element
+        result = rng.choices(range(1, max_val + 1), k=size)
+
+    if distribution in ('sorted', 'reversed', 'nearly_sorted', 'organ_pipe'):
+        result.sort(reverse=distribution == 'reversed')
+    if distribution == 'nearly_sorted' and swaps:
+        positions = rng.sample(range(size), 2 * swaps)
+        for i, j in zip(positions[:swaps], positions[swaps:]):
+            result[i], result[j] = result[j], result[i]
+    elif distribution == 'organ_pipe':
+        result = result[0::2] + result[1::2][::-1]
+
+    return array('i', result)
+
+
+def to_bytes(values):
+    """The values of generate() as little-endian int32 bytes."""
+    if isinstance(values, array) and sys.byteorder == 'big':
+        values = array('i', values)
+        values.byteswap()
+    return values.tobytes()
@@ -0,0 +1,49 @@
+# backend/batch.py
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from dispatch import OverBudget, select_job, run_trace
+from wire import dumps_json
+
+# Largest number of jobs accepted by one /api/visualize/batch request
+MAX_BATCH_JOBS = 32
+
+_pool = None
+
+
+def get_pool():
+    """
+    The shared worker pool, started on the first batch request (one process per
+    core). Workers are started by a forkserver (or spawned where there is
+    none): forking the threaded Flask server itself could copy a lock another
+    thread holds, and deadlock the child on it.
+    """
+    global _pool
+    if _pool is None:
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        _pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context(start_method))
+    return _pool
+
+
+def run_job(job):
+    """
+    Runs one parsed job inside a worker process. Returns (body, ok) where body
+    is the JSON document encoded like /api/visualize does (wire.dumps_json),
+    so only bytes travel back to the app process.
+    """
+    try:
+        trace, array, args = select_job(job)
+        return dumps_json(run_trace(job, trace, array, args)).encode(), True
+    except OverBudget as e:
+        return dumps_json({"error": str(e), "estimate": e.estimate}).encode(), False
+    except Exception as e:
+        return dumps_json({"error": f"Error during algorithm execution: {str(e)}"}).encode(), False
+
+
+def run_jobs(jobs):
+    """Runs the jobs in parallel on the worker pool; returns their (body, ok) pairs in order."""
+    if len(jobs) == 1:
+        # Not worth a round-trip to another process
+        return [run_job(jobs[0])]
+    return list(get_pool().map(run_job, jobs))
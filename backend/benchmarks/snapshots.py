@@ -0,0 +1,58 @@
+# backend/benchmarks/snapshots.py
+"""
+Compares the per-step snapshot cost of the shared Tracer against the old
+`copy.deepcopy(arr)`-on-every-step strategy, at sizes 1k-100k.
+
+Run from the backend directory:
+    python -m benchmarks.snapshots
+"""
+import copy
+import random
+import time
+from itertools import islice
+
+from algorithms.tracer import Tracer
+from algorithms.quick import trace_quick_sort
+from algorithms.binarysearch import trace_binary_search
+from algorithms.linear import trace_linear_search
+
+SIZES = (1_000, 10_000, 100_000)
+# Sorting traces have O(n log n) steps or more; only the first steps are timed
+MAX_STEPS = 500
+
+
+class DeepcopyTracer(Tracer):
+    """The previous copy policy: a deep copy of the array on every step."""
+
+    def step(self, action, indices=(), **extra):
+        step = super().step(action, indices, **extra)
+        step.array = copy.deepcopy(self.array)
+        return step
+
+
+def time_trace(tracer_class, algorithm, array, *args):
+    tracer = tracer_class(array)
+    start = time.perf_counter()
+    steps = sum(1 for _ in islice(algorithm(tracer, *args), MAX_STEPS))
+    return time.perf_counter() - start, steps
+
+
+def main():
+    print(f"{'workload':<16}{'size':>9}{'steps':>8}{'deepcopy':>12}{'tracer':>12}{'speedup':>10}")
+    for n in SIZES:
+        rng = random.Random(n)
+        array = [rng.randint(1, n) for _ in range(n)]
+        sorted_array = sorted(array)
+        workloads = [
+            ('quick sort', trace_quick_sort, array, ()),
+            ('binary search', trace_binary_search, sorted_array, (-1,)),
+            ('linear search', trace_linear_search, array, (-1,)),
+        ]
+        for name, algorithm, data, args in workloads:
+            old, steps = time_trace(DeepcopyTracer, algorithm, data, *args)
+            new, _ = time_trace(Tracer, algorithm, data, *args)
+            print(f"{name:<16}{n:>9}{steps:>8}{old * 1000:>10.1f}ms{new * 1000:>10.1f}ms{old / new:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+# backend/benchmarks/suite.py
+"""
+Benchmarks every registered sort/search tracer over input sizes and
+distributions, in three layers:
+- count:    the algorithm alone, run by CounterSink (no steps are created)
+- record:   ListSink in the given format; its peak memory is measured in a
+            separate run under tracemalloc
+- endpoint: POST /api/visualize end to end, including the budget check and
+            the JSON encoding of the response (the response cache is cleared
+            before every request); '-' when the server refuses the trace
+
+Traces too long to record (see --max-steps / MAX_FULL_CELLS) are only
+counted. Quadratic sorts are skipped above QUADRATIC_MAX_SIZE.
+
+Run from the backend directory:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --sizes 10,1000 --algorithms quick_sort,binary_search --formats full
+    python -m benchmarks.suite --json before.json
+    python -m benchmarks.suite --compare before.json     # exits with 1 on a regression
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from algorithms import registry
+from algorithms.delta import default_keyframe_interval
+from algorithms.tracer import CounterSink, ListSink
+from dispatch import select_trace
+
+SIZES = (10, 100, 1_000, 10_000, 100_000)
+DISTRIBUTIONS = ('random', 'sorted', 'reversed', 'few_unique', 'nearly_sorted')
+FORMATS = ('full', 'delta')
+# O(n^2) sorts produce about n^2 / 2 steps; larger inputs would take minutes each
+QUADRATIC_MAX_SIZE = 2_000
+# Traces with more steps are only counted, not recorded
+MAX_RECORDED_STEPS = 2_000_000
+# Full format only: upper bound of steps x array length (every step may need its own snapshot)
+MAX_FULL_CELLS = 50_000_000
+# Each measurement is repeated until it took this long in total (at most --repeat times)
+MIN_TOTAL_SECONDS = 0.2
+# --compare: a timing is a regression when it grew by this factor; shorter timings are noise
+REGRESSION_FACTOR = 1.25
+MIN_COMPARED_SECONDS = 0.002
+
+TIMINGS = ('count_s', 'record_s', 'endpoint_s')
+
+
+def make_array(distribution, n, seed=0):
+    rng = random.Random(f'{distribution}-{n}-{seed}')
+    if distribution == 'few_unique':
+        return [rng.randint(1, 8) for _ in range(n)]
+    array = [rng.randint(1, n) for _ in range(n)]
+    if distribution == 'random':
+        return array
+    array.sort(reverse=distribution == 'reversed')
+    if distribution == 'nearly_sorted':
+        # About 1% of the elements swapped out of place
+        for _ in range(max(1, n // 100)):
+            i, j = rng.randrange(n), rng.randrange(n)
+            array[i], array[j] = array[j], array[i]
+    return array
+
+
+def is_quadratic(spec):
+    return spec.complexity.get('average') == 'O(n^2)'
+
+
+def best_time(fn, repeat):
+    """Minimum wall time of fn() over up to `repeat` runs; returns (seconds, last result)."""
+    best, total, runs = None, 0.0, 0
+    while runs < repeat and (runs == 0 or total < MIN_TOTAL_SECONDS):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        total += elapsed
+        runs += 1
+    return best, result
+
+
+def peak_memory(fn):
+    """Peak bytes allocated by Python while fn() runs."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_case(spec, distribution, n, formats, repeat, max_steps, client=None, cache=None):
+    """Measures one algorithm on one input; returns one result row per format."""
+    array = make_array(distribution, n)
+    # Searches look for an element that is present
+    target = array[n // 2] if 'target' in spec.params else None
+    trace, array, args = select_trace(spec.id, array, target)
+
+    count_s, counters = best_time(lambda: CounterSink().run(trace, array, *args), repeat)
+    steps = counters['steps']
+
+    rows = []
+    for fmt in formats:
+        row = {
+            'algorithm': spec.id, 'distribution': distribution, 'size': n, 'format': fmt,
+            'steps': steps, 'count_s': count_s,
+            'record_s': None, 'peak_bytes': None, 'endpoint_s': None, 'response_bytes': None,
+        }
+        rows.append(row)
+        if steps > max_steps or (fmt == 'full' and steps * n > MAX_FULL_CELLS):
+            continue
+
+        keyframe_interval = default_keyframe_interval(n) if fmt == 'delta' else None
+        record = lambda: ListSink(fmt, keyframe_interval).run(trace, array, *args)
+        row['record_s'], _ = best_time(record, repeat)
+        row['peak_bytes'] = peak_memory(record)
+
+        if client is not None:
+            body = {'algorithm': spec.id, 'array': array, 'format': fmt}
+            if target is not None:
+                body['target'] = target
+
+            def request():
+                cache.clear()
+                response = client.post('/api/visualize', json=body)
+                if response.status_code == 413:
+                    # Over the server's trace budget
+                    return None
+                if response.status_code != 200:
+                    raise RuntimeError(f"{spec.id}: {response.get_json()}")
+                return len(response.data)
+
+            endpoint_s, response_bytes = best_time(request, repeat)
+            if response_bytes is not None:
+                row['endpoint_s'], row['response_bytes'] = endpoint_s, response_bytes
+    return rows
+
+
+def run_suite(algorithms, sizes, distributions, formats, repeat=5, max_steps=MAX_RECORDED_STEPS,
+              endpoint=True, out=sys.stdout):
+    client = cache = None
+    if endpoint:
+        # Imported here so that the recorder benchmarks also run without Flask
+        from app import app, trace_cache
+        client, cache = app.test_client(), trace_cache
+
+    print(f"{'algorithm':<24}{'distribution':<15}{'size':>8}{'format':>7}{'steps':>10}"
+          f"{'count':>11}{'record':>11}{'peak':>11}{'endpoint':>11}{'response':>11}", file=out)
+    rows = []
+    for spec in algorithms:
+        for n in sizes:
+            if is_quadratic(spec) and n > QUADRATIC_MAX_SIZE:
+                continue
+            for distribution in distributions:
+                for row in bench_case(spec, distribution, n, formats, repeat, max_steps, client, cache):
+                    rows.append(row)
+                    print(format_row(row), file=out, flush=True)
+    return rows
+
+
+def format_row(row):
+    def ms(seconds):
+        return '-' if seconds is None else f'{seconds * 1000:.2f}ms'
+
+    def kib(size):
+        return '-' if size is None else f'{size / 1024:.0f}KiB'
+
+    return (f"{row['algorithm']:<24}{row['distribution']:<15}{row['size']:>8}{row['format']:>7}"
+            f"{row['steps']:>10}{ms(row['count_s']):>11}{ms(row['record_s']):>11}"
+            f"{kib(row['peak_bytes']):>11}{ms(row['endpoint_s']):>11}{kib(row['response_bytes']):>11}")
+
+
+def compare(rows, baseline, factor=REGRESSION_FACTOR):
+    """
+    Compares result rows against the rows of an earlier --json run.
+    Returns messages for every changed step count and every timing that grew
+    by more than `factor`.
+    """
+    key = lambda row: (row['algorithm'], row['distribution'], row['size'], row['format'])
+    before = {key(row): row for row in baseline}
+    problems = []
+    for row in rows:
+        old = before.get(key(row))
+        if old is None:
+            continue
+        name = '/'.join(str(part) for part in key(row))
+        if row['steps'] != old['steps']:
+            problems.append(f"{name}: step count changed {old['steps']} -> {row['steps']}")
+        for timing in TIMINGS:
+            new_s, old_s = row[timing], old.get(timing)
+            if new_s is None or old_s is None or max(new_s, old_s) < MIN_COMPARED_SECONDS:
+                continue
+            if new_s > old_s * factor:
+                problems.append(f"{name}: {timing[:-2]} {old_s * 1000:.2f}ms -> {new_s * 1000:.2f}ms "
+                                f"({new_s / old_s:.2f}x)")
+    return problems
+
+
+def parse_list(value, allowed=None):
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    if allowed is not None:
+        unknown = set(items) - set(allowed)
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown value(s): {', '.join(sorted(unknown))}; "
+                                             f"expected {', '.join(allowed)}")
+    return items
+
+
+def parse_sizes(value):
+    # Accepts 100_000 as well
+    return [int(item.replace('_', '')) for item in parse_list(value)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the algorithm tracers and /api/visualize.")
+    parser.add_argument('--algorithms', type=parse_list,
+                        help="comma-separated algorithm ids (default: every sort and search)")
+    parser.add_argument('--sizes', type=parse_sizes, default=list(SIZES))
+    parser.add_argument('--distributions', type=lambda v: parse_list(v, DISTRIBUTIONS), default=list(DISTRIBUTIONS))
+    parser.add_argument('--formats', type=lambda v: parse_list(v, FORMATS), default=list(FORMATS))
+    parser.add_argument('--repeat', type=int, default=5, help="most runs per measurement (the best is kept)")
+    parser.add_argument('--max-steps', type=int, default=MAX_RECORDED_STEPS,
+                        help="longer traces are only counted, not recorded")
+    parser.add_argument('--no-endpoint', action='store_true', help="skip the /api/visualize measurements")
+    parser.add_argument('--json', metavar='PATH', help="write the result rows to PATH")
+    parser.add_argument('--compare', metavar='PATH', help="report regressions against an earlier --json file")
+    options = parser.parse_args(argv)
+
+    if options.algorithms:
+        algorithms = []
+        for name in options.algorithms:
+            spec = registry.get(name)
+            if spec is None or spec.kind not in ('sort', 'search'):
+                parser.error(f"unknown algorithm: {name}")
+            algorithms.append(spec)
+    else:
+        algorithms = [spec for spec in registry.all_algorithms() if spec.kind in ('sort', 'search')]
+
+    rows = run_suite(algorithms, options.sizes, options.distributions, options.formats,
+                     options.repeat, options.max_steps, endpoint=not options.no_endpoint)
+
+    if options.json:
+        with open(options.json, 'w') as fp:
+            json.dump(rows, fp, indent=1)
+
+    if options.compare:
+        with open(options.compare) as fp:
+            problems = compare(rows, json.load(fp))
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# backend/benchmarks/wire.py
+"""
+Compares the response wire formats of wire.py: payload size and encode time
+(serialization plus compression) of one trace per algorithm, for every
+available mimetype x content encoding.
+
+Run from the backend directory:
+    python -m benchmarks.wire
+    python -m benchmarks.wire --size 2000 --format delta --algorithms quick_sort,merge_sort
+"""
+import argparse
+
+from algorithms import registry
+from algorithms.delta import default_keyframe_interval
+from algorithms.tracer import ListSink
+from dispatch import select_trace
+from wire import JSON, MIMETYPES, CONTENT_ENCODINGS, encode, compress
+from benchmarks.suite import make_array, best_time
+
+SIZE = 500
+SHORT_NAMES = {JSON: 'json', 'application/msgpack': 'msgpack', 'application/vnd.algoviz.packed': 'packed'}
+
+
+def bench_algorithm(spec, size, trace_format, repeat):
+    """Returns {(mimetype, content encoding): (bytes, seconds)} for one recorded trace."""
+    array = make_array('random', size)
+    target = array[size // 2] if 'target' in spec.params else None
+    trace, array, args = select_trace(spec.id, array, target)
+    keyframe_interval = default_keyframe_interval(size) if trace_format == 'delta' else None
+    document = ListSink(trace_format, keyframe_interval).run(trace, array, *args)
+
+    results = {}
+    for mimetype in MIMETYPES:
+        for content_encoding in CONTENT_ENCODINGS:
+            seconds, body = best_time(lambda: compress(encode(document, mimetype), content_encoding), repeat)
+            results[mimetype, content_encoding] = (len(body), seconds)
+    return len(document['steps']), results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compares the response wire formats.")
+    parser.add_argument('--algorithms', help="comma-separated algorithm ids (default: every sort and search)")
+    parser.add_argument('--size', type=int, default=SIZE)
+    parser.add_argument('--format', choices=('full', 'delta'), default='full')
+    parser.add_argument('--repeat', type=int, default=3, help="most runs per measurement (the best is kept)")
+    options = parser.parse_args(argv)
+
+    if options.algorithms:
+        algorithms = [registry.get(name.strip()) for name in options.algorithms.split(',')]
+        if None in algorithms:
+            parser.error("unknown algorithm")
+    else:
+        algorithms = [spec for spec in registry.all_algorithms() if spec.kind in ('sort', 'search')]
+
+    columns = [(mimetype, content_encoding) for mimetype in MIMETYPES for content_encoding in CONTENT_ENCODINGS]
+    names = [f"{SHORT_NAMES.get(mimetype, mimetype)}/{content_encoding}" for mimetype, content_encoding in columns]
+    print(f"{'algorithm':<24}{'steps':>9}" + ''.join(f"{name:>22}" for name in names))
+    for spec in algorithms:
+        steps, results = bench_algorithm(spec, options.size, options.format, options.repeat)
+        cells = []
+        for column in columns:
+            size, seconds = results[column]
+            cells.append(f"{size / 1024:.0f}KiB {seconds * 1000:.1f}ms")
+        print(f"{spec.id:<24}{steps:>9}" + ''.join(f"{cell:>22}" for cell in cells), flush=True)
+
+
+if __name__ == '__main__':
+    main()
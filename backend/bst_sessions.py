@@ -0,0 +1,76 @@
+# backend/bst_sessions.py
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+
+class BSTSession:
+    """One server-side tree plus the lock that serializes operations on it."""
+    __slots__ = ('tree', 'last_used', 'lock')
+
+    def __init__(self, tree, now):
+        self.tree = tree
+        self.last_used = now
+        self.lock = threading.Lock()
+
+
+class BSTSessionStore:
+    """
+    Trees kept in memory between /api/bst calls, keyed by a random session id.
+
+    Sessions are kept in least-recently-used order, so expiring the ones idle
+    for longer than `ttl` seconds only looks at the front of the queue. When
+    more than `max_sessions` are open, the least recently used one is dropped.
+    """
+
+    def __init__(self, ttl, max_sessions):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _expire(self, now):
+        sessions = self._sessions
+        while sessions:
+            session_id, session = next(iter(sessions.items()))
+            if now - session.last_used < self.ttl and len(sessions) <= self.max_sessions:
+                break
+            del sessions[session_id]
+            self.evictions += 1
+
+    def create(self, tree):
+        """Stores a tree under a new session id and returns the id."""
+        session_id = secrets.token_hex(16)
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = BSTSession(tree, now)
+            self._expire(now)
+        return session_id
+
+    def get(self, session_id):
+        """Returns the live session (and marks it used), or None if unknown or expired."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            session.last_used = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self):
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                'sessions': len(self._sessions),
+                'evictions': self.evictions,
+                'ttl': self.ttl,
+                'max_sessions': self.max_sessions,
+            }
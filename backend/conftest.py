@@ -0,0 +1,3 @@
+# backend/conftest.py
+# Makes the backend modules (algorithms, dispatch, trace_store, ...) importable
+# from the tests, wherever pytest is started from.
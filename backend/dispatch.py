@@ -0,0 +1,384 @@
+# backend/dispatch.py
+"""
+Turns /api/visualize request bodies into algorithm runs. Kept out of app.py
+so that the batch worker processes can import it without the Flask app.
+"""
+import math
+from functools import partial
+
+from algorithms import registry
+from algorithms.cost import predict_steps, measure_steps, trace_bytes
+from algorithms.tracer import ListSink, CounterSink, reduce_frames
+from algorithms.delta import default_keyframe_interval
+from algorithms.messages import LOCALES, render_messages
+
+# Largest number of search targets in one multi-target request
+MAX_TARGETS = 1000
+# Trace budget of a steps-mode request; a request may lower it with 'max_steps' / 'max_bytes'
+MAX_TRACE_STEPS = 1_000_000
+MAX_TRACE_BYTES = 128 * 1024 * 1024
+# Longest run of a steps-mode request: downsampling still goes through every step
+MAX_RUN_STEPS = 20_000_000
+# Longest run of a stats-mode request, which records nothing: refused up front only when the
+# step bounds are already above it, otherwise stopped once it gets there
+MAX_STATS_STEPS = 100_000_000
+# What to do with a trace over budget: refuse it, keep only every k-th step, or return only the counters
+OVER_BUDGET_POLICIES = ('reject', 'downsample', 'stats')
+
+
+class OverBudget(ValueError):
+    """A request rejected for the size of its trace; `estimate` holds the prediction."""
+
+    def __init__(self, message, estimate):
+        super().__init__(message)
+        self.estimate = estimate
+
+
+def parse_trace_request(data):
+    """
+    Validates the options of a trace request and fills in their defaults.
+    Returns a job dict (algorithm, array, target, targets, options, format,
+    mode, keyframe_interval, max_frames, locale, max_steps, max_bytes, over_budget);
+    raises ValueError with a client-facing message.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object.")
+
+    array = data.get('array')
+    # 'full' (default): every step carries a full array snapshot (used by the current frontend)
+    # 'delta': the initial array once, plus per-step swap/write operations
+    trace_format = data.get('format', 'full')
+    # 'steps' (default): the visualization trace; 'stats': only the operation counters, no steps are recorded
+    mode = data.get('mode', 'steps')
+    # Delta format only: every keyframe_interval-th step also carries the full array
+    keyframe_interval = data.get('keyframe_interval')
+    # Search algorithms only: many targets answered against the same array, which is prepared (sorted) once
+    targets = data.get('targets')
+    # Steps mode only: reduce the trace to about this many frames (see reduce_frames); None keeps every step
+    max_frames = data.get('max_frames')
+    # Steps mode only: render the 'message' of steps with an event in this locale; None sends only the event codes
+    locale = data.get('locale')
+    # The trace budget (at most the server's) and what happens to a trace that would exceed it
+    max_steps = data.get('max_steps', MAX_TRACE_STEPS)
+    max_bytes = data.get('max_bytes', MAX_TRACE_BYTES)
+    over_budget = data.get('over_budget', 'reject')
+
+    # Validation for array presence
+    if not array or not isinstance(array, list):
+        raise ValueError("Invalid or missing 'array' in request.")
+
+    if trace_format not in ['full', 'delta']:
+        raise ValueError("Format must be 'full' or 'delta'")
+
+    if mode not in ['steps', 'stats']:
+        raise ValueError("Mode must be 'steps' or 'stats'")
+
+    if keyframe_interval is None:
+        keyframe_interval = default_keyframe_interval(len(array))
+    elif not isinstance(keyframe_interval, int) or keyframe_interval < 1:
+        raise ValueError("'keyframe_interval' must be a positive integer")
+    if trace_format != 'delta':
+        keyframe_interval = None
+
+    if targets is not None and (not isinstance(targets, list) or not 1 <= len(targets) <= MAX_TARGETS):
+        raise ValueError(f"'targets' must be a list of 1 to {MAX_TARGETS} values")
+
+    # A reduced trace keeps at least its first and last step
+    if max_frames is not None and (not isinstance(max_frames, int) or max_frames < 2):
+        raise ValueError("'max_frames' must be an integer of at least 2")
+    if locale is not None and locale not in LOCALES:
+        raise ValueError(f"'locale' must be one of: {', '.join(LOCALES)}")
+    if not isinstance(max_steps, int) or max_steps < 2:
+        raise ValueError("'max_steps' must be an integer of at least 2")
+    if not isinstance(max_bytes, int) or max_bytes < 1:
+        raise ValueError("'max_bytes' must be a positive integer")
+    if over_budget not in OVER_BUDGET_POLICIES:
+        raise ValueError(f"'over_budget' must be one of: {', '.join(OVER_BUDGET_POLICIES)}")
+
+    return {
+        'algorithm': data.get('algorithm'),
+        'array': array,
+        'target': data.get('target'), # for search algorithms
+        'targets': targets,
+        'options': data.get('options'), # algorithm-specific, see registry.register
+        'format': trace_format,
+        'mode': mode,
+        'keyframe_interval': keyframe_interval,
+        'max_frames': max_frames,
+        'locale': locale,
+        'max_steps': min(max_steps, MAX_TRACE_STEPS),
+        'max_bytes': min(max_bytes, MAX_TRACE_BYTES),
+        'over_budget': over_budget,
+    }
+
+
+def select_trace(algorithm, array, target, options=None):
+    """
+    Looks the algorithm up in the registry (by display name or id) and loads
+    its trace_* generator function on first use.
+    Returns (trace, array to run it on, extra arguments); raises ValueError
+    for an unknown algorithm, a missing search target or an invalid option.
+    """
+    spec, array, option_args = prepare_trace(algorithm, array, options)
+    return spec.trace, array, target_args(spec, target) + option_args
+
+
+def select_targets(algorithm, array, targets, options=None):
+    """
+    Like select_trace(), for a search over many targets: the array is prepared
+    (sorted) only once. Returns (trace, array, list of extra arguments per target).
+    """
+    spec, array, option_args = prepare_trace(algorithm, array, options)
+    if 'target' not in spec.params:
+        raise ValueError(f"'targets' is only supported by search algorithms, not {spec.name}")
+    return spec.trace, array, [target_args(spec, target) + option_args for target in targets]
+
+
+def select_job(job):
+    """select_trace() or, for a multi-target job, select_targets() of a parsed job."""
+    if job['targets'] is not None:
+        return select_targets(job['algorithm'], job['array'], job['targets'], job['options'])
+    return select_trace(job['algorithm'], job['array'], job['target'], job['options'])
+
+
+def target_args(spec, target):
+    if 'target' not in spec.params:
+        return ()
+    # NaN and the infinities parse from JSON too, but cannot be searched for (or sent back)
+    if not isinstance(target, (int, float)) or isinstance(target, bool) or (
+            isinstance(target, float) and not math.isfinite(target)):
+        raise ValueError("Invalid or missing 'target' in request.")
+    return (target,)
+
+
+def prepare_trace(algorithm, array, options):
+    """
+    Resolves the algorithm and its options. Returns (spec, array to run it on,
+    option arguments for the trace function).
+    """
+    spec = registry.get(algorithm) if isinstance(algorithm, str) else None
+    if spec is None:
+        raise ValueError(f"Unsupported algorithm: {algorithm}")
+
+    if spec.requires_sorted:
+        # e.g. Binary search requires a sorted array
+        array = sorted(array)
+
+    args = ()
+    if options is None:
+        options = {}
+    if not isinstance(options, dict):
+        raise ValueError("'options' must be an object")
+    unknown = set(options) - {option for option, _ in spec.options}
+    if unknown:
+        raise ValueError(f"Unknown option(s) for {spec.name}: {', '.join(sorted(unknown))}")
+    for option, choices in spec.options:
+        value = options.get(option, choices[0])
+        if value not in choices:
+            raise ValueError(f"Option '{option}' must be one of: {', '.join(choices)}")
+        args += (value,)
+
+    return spec, array, args
+
+
+def plan_trace(job, trace, array, args, check_bytes=True):
+    """plan_traces() of a single-target job: returns its one (mode, reduce, notes) plan."""
+    return plan_traces(job, trace, array, [args], check_bytes)[0]
+
+
+def plan_traces(job, trace, array, args_list, check_bytes=True):
+    """
+    Checks a job against its budget before anything is recorded (see
+    algorithms.cost). `args_list` holds the extra arguments of every trace of
+    the job: one, or one per target, and the traces of all targets share the
+    budget. Returns a (mode, reduce, notes) plan per trace: the mode to run
+    in, the step filter for the sink (None to keep every step) and the keys to
+    add to its document: 'frames' when 'max_frames' reduced the trace,
+    'budget' when the job was over budget. Raises OverBudget when the job is
+    rejected. Streamed responses pass check_bytes=False, since they are never
+    held in memory.
+
+    The algorithms are only counted when their step bounds cannot decide.
+    Not even then for a single trace under the 'reject' policy: it is
+    recorded with a cap at the budget instead (see capped_filter), which
+    costs at most the budget rather than a full extra run.
+    """
+    algorithm_id = registry.get(job['algorithm']).id
+    if job['mode'] == 'stats':
+        # Stats runs are only refused on their bounds; CounterSink stops a run that goes further
+        low = sum(predict_steps(algorithm_id, trace, array, args, MAX_STATS_STEPS)[0] for args in args_list)
+        if low > MAX_STATS_STEPS:
+            raise OverBudget(f"The algorithm would run for more than {MAX_STATS_STEPS} steps on this input",
+                             {'steps': low, 'exact': False})
+        return [('stats', None, {})] * len(args_list)
+
+    max_steps, max_bytes, max_frames = job['max_steps'], job['max_bytes'], job['max_frames']
+    # (array bytes, step bytes); the traces of all targets have steps of about the same size
+    sizes = measure_steps(trace, array, args_list[0], job['format'], job['locale']) if check_bytes else None
+
+    def usage(counts, frames=None):
+        """Frames per trace and estimated bytes of all traces, for these step counts (reduced to `frames`)."""
+        if frames is None:
+            frames = [steps if max_frames is None else min(steps, max_frames) for steps in counts]
+        size = 0
+        if sizes is not None:
+            size = sum(trace_bytes(steps, *sizes, job['format'], job['keyframe_interval']) * kept // steps
+                       for steps, kept in zip(counts, frames) if steps)
+        return frames, size
+
+    # Frames are handed out in proportion to the step count, so it has to be exact
+    count_exactly = max_frames is not None
+    while True:
+        bounds = [predict_steps(algorithm_id, trace, array, args, MAX_RUN_STEPS, count_exactly)
+                  for args in args_list]
+        lows = [low for low, _ in bounds]
+        highs = [high for _, high in bounds]
+        if sum(lows) > MAX_RUN_STEPS:
+            raise OverBudget(f"The algorithm would run for more than {MAX_RUN_STEPS} steps on this input",
+                             {'steps': sum(lows), 'exact': False})
+        exact = lows == highs
+
+        if sum(highs) <= MAX_RUN_STEPS:
+            frames, size = usage(highs)
+            if sum(frames) <= max_steps and size <= max_bytes:
+                # Within budget even at the upper bound
+                counts, over = highs, False
+                break
+        frames, size = usage(lows)
+        over = sum(frames) > max_steps or size > max_bytes
+        # Downsampling hands out frames in proportion to the exact step counts
+        if exact or (over and job['over_budget'] != 'downsample'):
+            counts = lows
+            break
+        if len(args_list) == 1 and not count_exactly and job['over_budget'] == 'reject':
+            return [('steps', capped_filter(job, sizes), {})]
+        count_exactly = True
+
+    total = sum(counts)
+    total_frames = sum(frames)
+    notes = [{} for _ in counts]
+    for note, steps, kept in zip(notes, counts, frames):
+        if kept < steps:
+            note['frames'] = {'steps': steps, 'exact': exact, 'max_frames': max_frames}
+    if not over:
+        return [('steps', frame_filter(kept, steps, job['locale']), note)
+                for steps, kept, note in zip(counts, frames, notes)]
+
+    report = {'steps': total, 'exact': exact, 'max_steps': max_steps}
+    if len(args_list) > 1:
+        report['targets'] = len(args_list)
+    if total_frames < total:
+        report['frames'] = total_frames
+    if check_bytes:
+        report.update(bytes=size, max_bytes=max_bytes)
+    if job['over_budget'] == 'reject':
+        # Over budget already at the lower bound: the count is not needed
+        length = f"{total_frames} steps" if exact else f"at least {total_frames} steps"
+        if check_bytes:
+            raise OverBudget(f"The trace would be too large ({length}, about {size} bytes); "
+                             f"the budget is {max_steps} steps / {max_bytes} bytes", report)
+        raise OverBudget(f"The trace would be too long ({length}); the budget is {max_steps} steps", report)
+    if job['over_budget'] == 'stats':
+        return [('stats', None, {'budget': dict(report, action='stats')})] * len(counts)
+
+    # As many frames as fit both budgets, shared by the traces in proportion to their frames
+    kept_total = min(total_frames, max_steps)
+    if size > max_bytes:
+        kept_total = max(min(kept_total, max_bytes * total_frames // size), 2)
+    if len(counts) > 1:
+        frames = [min(kept, max(kept * kept_total // total_frames, 2)) for kept in frames]
+    else:
+        frames = [kept_total]
+    # Every trace keeps at least its first and last step, which may not fit either
+    kept_frames, kept_size = sum(frames), usage(counts, frames)[1]
+    if kept_frames > max_steps or kept_size > max_bytes:
+        raise OverBudget(f"The trace would be too large even downsampled ({kept_frames} steps, "
+                         f"about {kept_size} bytes); the budget is {max_steps} steps / {max_bytes} bytes",
+                         dict(report, frames=kept_frames))
+    plans = []
+    for steps, kept, note in zip(counts, frames, notes):
+        note['budget'] = dict(report, action='downsample', frames=kept)
+        plans.append(('steps', frame_filter(kept, steps, job['locale']), note))
+    return plans
+
+
+def capped_filter(job, sizes=None):
+    """
+    The sink filter of a trace whose length is unknown: it is recorded up to
+    the budget (the step budget, and given the measure_steps() sizes also the
+    byte budget) and rejected with OverBudget once it goes over.
+    """
+    max_steps = cap = job['max_steps']
+    report = {'steps': cap + 1, 'exact': False, 'max_steps': max_steps}
+    if sizes is not None:
+        size = trace_bytes(cap, *sizes, job['format'], job['keyframe_interval'])
+        if size > job['max_bytes']:
+            cap = max(job['max_bytes'] * cap // size, 1)
+        report.update(steps=cap + 1, max_bytes=job['max_bytes'])
+        message = (f"The trace would be too large (more than {cap} steps); "
+                   f"the budget is {max_steps} steps / {job['max_bytes']} bytes")
+    else:
+        message = f"The trace would be too long (more than {cap} steps); the budget is {max_steps} steps"
+    capped = partial(cap_steps, max_steps=cap, message=message, report=report)
+    if job['locale'] is None:
+        return capped
+    return partial(_chain, [capped, partial(render_messages, locale=job['locale'])])
+
+
+def cap_steps(steps, max_steps, message, report):
+    """Passes at most `max_steps` steps on; raises OverBudget(message, report) at the next one."""
+    for count, step in enumerate(steps, 1):
+        if count > max_steps:
+            raise OverBudget(message, report)
+        yield step
+
+
+def frame_filter(frames, steps, locale=None):
+    """
+    The sink filter that reduces a `steps`-step trace to `frames` frames and then,
+    with a locale, renders the messages of the kept steps; None if there is nothing to do.
+    """
+    filters = []
+    if frames < steps:
+        filters.append(partial(reduce_frames, max_frames=frames, total_steps=steps))
+    if locale is not None:
+        filters.append(partial(render_messages, locale=locale))
+    if not filters:
+        return None
+    if len(filters) == 1:
+        return filters[0]
+    return partial(_chain, filters)
+
+
+def _chain(filters, steps):
+    for step_filter in filters:
+        steps = step_filter(steps)
+    return steps
+
+
+def run_trace(job, trace, array, args, plan=None):
+    """
+    Runs a parsed job with the trace selected for it; returns the response
+    document. A multi-target job returns {"results": [...]}, one document
+    (plus its 'target') per target, in order. A reduced trace also gets the
+    'frames' and / or 'budget' reports of plan_traces() in its document.
+    """
+    if job['targets'] is not None:
+        single = dict(job, targets=None)
+        plans = plan or plan_traces(job, trace, array, args)
+        return {"results": [dict(run_trace(single, trace, array, target_args, target_plan), target=target)
+                            for target, target_args, target_plan in zip(job['targets'], args, plans)]}
+    mode, reduce, notes = plan or plan_trace(job, trace, array, args)
+    if mode == 'stats':
+        stats = CounterSink(MAX_STATS_STEPS).run(trace, array, *args)
+        if stats is None:
+            raise OverBudget(f"The algorithm ran for more than {MAX_STATS_STEPS} steps on this input",
+                             {'steps': MAX_STATS_STEPS + 1, 'exact': False})
+        document = {"stats": stats}
+    else:
+        document = ListSink(job['format'], job['keyframe_interval'], reduce).run(trace, array, *args)
+    document.update(notes)
+    if 'budget' in notes and mode == 'steps':
+        # The frames actually kept, rather than the planned number
+        document['budget'] = dict(notes['budget'], frames=len(document['steps']))
+    return document
@@ -0,0 +1,105 @@
+# backend/tests/test_arrays.py
+import sys
+from array import array
+from collections import Counter
+
+import pytest
+
+import arrays
+from arrays import DISTRIBUTIONS, default_swaps, generate, to_bytes
+
+
+@pytest.fixture(params=['stdlib', 'numpy'])
+def backend(request, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(arrays, 'np', None)
+    elif arrays.np is None:
+        pytest.skip("numpy is not installed")
+    return request.param
+
+
+def values(size, distribution, **kwargs):
+    return [int(v) for v in generate(size, distribution, **kwargs)]
+
+
+@pytest.mark.parametrize('distribution', DISTRIBUTIONS)
+@pytest.mark.parametrize('max_val', [1, 7, 100, 2 ** 31 - 1])
+def test_values_are_in_range_and_seeded(backend, distribution, max_val):
+    result = values(5000, distribution, seed=3, max_val=max_val)
+    assert len(result) == 5000
+    assert all(1 <= v <= max_val for v in result)
+    assert values(5000, distribution, seed=3, max_val=max_val) == result
+    if max_val > 7:
+        assert values(5000, distribution, seed=4, max_val=max_val) != result
+
+
+def test_shapes(backend):
+    size = 20000
+    assert values(size, 'sorted', seed=1) == sorted(values(size, 'sorted', seed=1))
+    reversed_values = values(size, 'reversed', seed=1)
+    assert reversed_values == sorted(reversed_values, reverse=True)
+
+    uniform = values(size, 'uniform', seed=1, max_val=100)
+    assert 48 < sum(uniform) / size < 53
+    assert len(set(uniform)) == 100
+
+    pipe = values(size, 'organ_pipe', seed=1)
+    top = pipe.index(max(pipe))
+    assert pipe[:top + 1] == sorted(pipe[:top + 1])
+    assert pipe[top:] == sorted(pipe[top:], reverse=True)
+
+    few = values(size, 'few_unique', seed=1, max_val=1000, unique=5)
+    assert len(set(few)) == 5
+
+    counts = Counter(values(size, 'zipf', seed=1, max_val=1000))
+    assert counts[1] > counts[2] > counts[4] > counts[16]
+    assert counts.most_common(1)[0][0] == 1
+
+
+@pytest.mark.parametrize('swaps', [None, 0, 1, 25, 500])
+def test_nearly_sorted_swaps(backend, swaps):
+    size = 1000
+    result = values(size, 'nearly_sorted', seed=2, max_val=10 ** 6, swaps=swaps)
+    expected = default_swaps(size) if swaps is None else swaps
+    out_of_place = sum(a != b for a, b in zip(result, sorted(result)))
+    # Disjoint pairs: each swap moves at most two elements (fewer when the values are equal)
+    assert out_of_place <= 2 * expected
+    if expected:
+        assert out_of_place > 0
+
+
+def test_swaps_only_apply_to_nearly_sorted(backend):
+    with pytest.raises(ValueError):
+        generate(10, 'nearly_sorted', swaps=6)
+    with pytest.raises(ValueError):
+        generate(10, 'nearly_sorted', swaps=-1)
+    # Ignored, and so not checked, by every other distribution
+    assert values(10, 'uniform', seed=5, swaps=6) == values(10, 'uniform', seed=5)
+    assert default_swaps(1) == 0 and default_swaps(2) == 1 and default_swaps(1000) == 10
+
+
+def test_unique_is_capped(backend):
+    assert len(set(values(3, 'few_unique', seed=1, max_val=100, unique=50))) <= 3
+    assert len(set(values(1000, 'few_unique', seed=1, max_val=4))) == 4
+    with pytest.raises(ValueError):
+        generate(10, 'few_unique', max_val=4, unique=5)
+    with pytest.raises(ValueError):
+        generate(10, 'few_unique', unique=0)
+
+
+@pytest.mark.parametrize('kwargs', [{'size': 0}, {'size': arrays.MAX_ARRAY_SIZE + 1}, {'max_val': 0},
+                                    {'max_val': 2 ** 31}, {'distribution': 'normal'}, {'exponent': 0}])
+def test_invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        generate(**dict({'size': 10}, **kwargs))
+
+
+def test_to_bytes_is_little_endian_int32(backend):
+    result = generate(100, 'uniform', seed=9, max_val=2 ** 31 - 1)
+    data = to_bytes(result)
+    assert len(data) == 400
+    decoded = array('i')
+    decoded.frombytes(data)
+    if sys.byteorder == 'big':
+        decoded.byteswap()
+    assert [int(v) for v in result] == decoded.tolist()
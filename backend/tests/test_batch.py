@@ -0,0 +1,29 @@
+# backend/tests/test_batch.py
+import json
+
+from batch import run_job, run_jobs
+from dispatch import parse_trace_request, select_job, run_trace
+from wire import JSON, encode
+
+
+def job(algorithm, **data):
+    return parse_trace_request(dict(data, algorithm=algorithm, array=[5, 2, 9, 1]))
+
+
+def test_worker_bodies_match_the_visualize_encoding():
+    for parsed in (job('quick_sort', locale='en'), job('binary_search', target=9), job('heap_sort', mode='stats')):
+        body, ok = run_job(parsed)
+        trace, array, args = select_job(parsed)
+        assert ok and body == encode(run_trace(parsed, trace, array, args), JSON)
+
+
+def test_values_json_cannot_hold_are_an_error():
+    body, ok = run_job(parse_trace_request({'algorithm': 'bubble_sort', 'array': [float('nan'), 1.0]}))
+    assert not ok and 'error' in json.loads(body)
+
+
+def test_pool_runs_jobs_in_order():
+    jobs = [job('bubble_sort'), job('merge_sort'), job('linear_search', target=1)]
+    results = run_jobs(jobs)
+    assert [ok for _, ok in results] == [True] * 3
+    assert [json.loads(body)['steps'][-1]['array'] for body, _ in results[:2]] == [[1, 2, 5, 9]] * 2
@@ -0,0 +1,124 @@
+# backend/tests/test_bst.py
+import random
+
+import pytest
+
+from algorithms.bst import AVLTree, BinarySearchTree, RedBlackTree, inorder_values
+
+
+def avl_height(node):
+    """Height of an AVL subtree, checking the balance and stored height of every node on the way."""
+    if node is None:
+        return 0
+    left, right = avl_height(node.left), avl_height(node.right)
+    assert abs(left - right) <= 1, node.value
+    assert node.height == 1 + max(left, right), node.value
+    return 1 + max(left, right)
+
+
+def black_height(node):
+    """Black height of a left-leaning red-black subtree, checking the colour rules on the way."""
+    if node is None:
+        return 1
+    # Red links lean left, and never two in a row
+    assert not (node.right is not None and node.right.red), node.value
+    assert not (node.red and node.left is not None and node.left.red), node.value
+    left, right = black_height(node.left), black_height(node.right)
+    assert left == right, node.value
+    return left + (not node.red)
+
+
+def max_depth(node):
+    return 0 if node is None else 1 + max(max_depth(node.left), max_depth(node.right))
+
+
+def check(tree, values):
+    assert inorder_values(tree.root) == sorted(values)
+    assert tree.is_valid()
+    if isinstance(tree, AVLTree):
+        avl_height(tree.root)
+    else:
+        assert tree.root is None or not tree.root.red
+        black_height(tree.root)
+
+
+@pytest.mark.parametrize('tree_class', [AVLTree, RedBlackTree])
+def test_invariants_hold_under_random_inserts_and_deletes(tree_class):
+    rng = random.Random(4)
+    tree = tree_class()
+    values = set()
+    for _ in range(2000):
+        value = rng.randint(0, 300)
+        if rng.random() < 0.6:
+            tree.apply('insert', value)
+            values.add(value)
+        else:
+            _, diff = tree.apply('delete', value)
+            assert diff['removed'] == ([value] if value in values else [])
+            values.discard(value)
+        check(tree, values)
+
+
+@pytest.mark.parametrize('tree_class', [AVLTree, RedBlackTree])
+def test_sorted_inserts_stay_logarithmic(tree_class):
+    tree = tree_class()
+    n = 1023
+    for value in range(n):
+        tree.apply('insert', value)
+    check(tree, range(n))
+    depth = avl_height(tree.root) if tree_class is AVLTree else max_depth(tree.root)
+    # AVL: below 1.44 log2(n); red-black: below 2 log2(n)
+    assert depth <= (15 if tree_class is AVLTree else 20)
+
+
+@pytest.mark.parametrize('tree_class', [AVLTree, RedBlackTree])
+def test_deleting_everything_empties_the_tree(tree_class):
+    rng = random.Random(8)
+    values = rng.sample(range(1000), 200)
+    tree = tree_class()
+    for value in values:
+        tree.apply('insert', value)
+    rng.shuffle(values)
+    remaining = set(values)
+    for value in values:
+        tree.apply('delete', value)
+        remaining.discard(value)
+        check(tree, remaining)
+    assert tree.root is None
+    steps, diff = tree.apply('delete', 5)
+    assert steps[-1]['action'] == 'Value Not Found' and diff == {'root': None, 'nodes': [], 'removed': []}
+
+
+@pytest.mark.parametrize('tree_class', [AVLTree, RedBlackTree])
+def test_unbalanced_state_is_rebuilt(tree_class):
+    # A skewed plain BST sent to a balanced mode
+    chain = None
+    for value in range(9, -1, -1):
+        chain = {'value': value, 'left': None, 'right': chain}
+    tree = tree_class.from_state(chain)
+    check(tree, range(10))
+
+
+@pytest.mark.parametrize('tree_class', [BinarySearchTree, AVLTree, RedBlackTree])
+def test_from_sorted_builds_a_valid_balanced_tree(tree_class):
+    for n in range(0, 130):
+        steps = []
+        tree = tree_class.from_sorted(list(range(0, 2 * n, 2)), steps)
+        assert len(steps) == n
+        if tree_class is BinarySearchTree:
+            assert inorder_values(tree.root) == list(range(0, 2 * n, 2))
+            assert max_depth(tree.root) == n.bit_length()
+        else:
+            check(tree, range(0, 2 * n, 2))
+        # The built tree keeps working as a tree of its mode
+        for value in range(1, 2 * n, 4):
+            tree.apply('insert', value)
+        if tree_class is not BinarySearchTree:
+            check(tree, set(range(0, 2 * n, 2)) | set(range(1, 2 * n, 4)))
+
+
+def test_build_sorts_and_deduplicates():
+    tree = RedBlackTree()
+    steps, diff = tree.build([5, 1, 5, 3, 9, 1])
+    check(tree, [1, 3, 5, 9])
+    assert len(steps) == 4 and diff['root'] == tree.root.value
@@ -0,0 +1,157 @@
+# backend/tests/test_bst_sessions.py
+import random
+
+import pytest
+
+import bst_sessions
+from algorithms.bst import TREE_TYPES, BinarySearchTree, inorder_values
+from bst_sessions import BSTSessionStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(bst_sessions.time, 'monotonic', clock)
+    return clock
+
+
+def test_idle_sessions_expire_after_the_ttl(clock):
+    store = BSTSessionStore(ttl=60, max_sessions=10)
+    kept = store.create(BinarySearchTree())
+    idle = store.create(BinarySearchTree())
+    clock.now += 40
+    assert store.get(kept) is not None
+    clock.now += 30
+    # 70 s since idle was last used, 30 s since kept was
+    assert store.get(idle) is None
+    assert store.get(kept) is not None
+    assert store.stats()['sessions'] == 1 and store.stats()['evictions'] == 1
+
+
+def test_least_recently_used_session_is_evicted(clock):
+    store = BSTSessionStore(ttl=60, max_sessions=2)
+    first = store.create(BinarySearchTree())
+    clock.now += 1
+    second = store.create(BinarySearchTree())
+    clock.now += 1
+    store.get(first)
+    store.create(BinarySearchTree())
+    assert store.get(second) is None
+    assert store.get(first) is not None
+    assert store.stats()['sessions'] == 2
+
+
+def test_delete(clock):
+    store = BSTSessionStore(ttl=60, max_sessions=2)
+    session_id = store.create(BinarySearchTree())
+    assert store.delete(session_id)
+    assert not store.delete(session_id)
+    assert store.get(session_id) is None
+
+
+def apply_diff(client, diff):
+    """What a client does with a session diff: drop the removed values, overwrite the changed nodes."""
+    for value in diff['removed']:
+        client.pop(value, None)
+    for entry in diff['nodes']:
+        client[entry['value']] = entry
+    return diff['root']
+
+
+def rebuild(client, root):
+    """The nested tree_state the client's node table describes."""
+    if root is None:
+        return None
+    node = dict(client[root])
+    node['left'] = rebuild(client, node['left'])
+    node['right'] = rebuild(client, node['right'])
+    return node
+
+
+@pytest.mark.parametrize('tree_type', sorted(TREE_TYPES))
+def test_diffs_rebuild_the_server_tree(tree_type):
+    rng = random.Random(6)
+    tree = TREE_TYPES[tree_type]()
+    client = {}
+    for _ in range(300):
+        batch = [(rng.choice(('insert', 'insert', 'delete', 'search')), rng.randint(0, 60))
+                 for _ in range(rng.randint(1, 4))]
+        _, diff, _ = tree.apply_batch(batch)
+        root = apply_diff(client, diff)
+        assert rebuild(client, root) == tree.to_dict()
+        assert sorted(client) == inorder_values(tree.root)
+
+    _, diff = tree.build(rng.sample(range(100), 40))
+    root = apply_diff(client, diff)
+    assert rebuild(client, root) == tree.to_dict()
+    assert sorted(client) == inorder_values(tree.root)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    pytest.importorskip('flask')
+    import app
+    monkeypatch.setattr(app, 'bst_sessions', BSTSessionStore(ttl=60, max_sessions=10))
+    return app.app.test_client()
+
+
+def test_session_endpoints(client, clock):
+    created = client.post('/api/bst/sessions', json={'tree_type': 'avl'})
+    assert created.status_code == 201
+    session_id = created.get_json()['session_id']
+
+    client_nodes = {}
+    root = None
+    for value in (5, 3, 8, 1, 4, 9, 2):
+        response = client.post('/api/bst', json={'session_id': session_id, 'operation': 'insert', 'value': value})
+        root = apply_diff(client_nodes, response.get_json()['diff'])
+    response = client.post('/api/bst', json={'session_id': session_id, 'operation': 'delete', 'value': 3})
+    root = apply_diff(client_nodes, response.get_json()['diff'])
+
+    server = client.get(f'/api/bst/sessions/{session_id}').get_json()['tree_state']
+    assert rebuild(client_nodes, root) == server
+    assert inorder_values(TREE_TYPES['avl'].from_state(server).root) == [1, 2, 4, 5, 8, 9]
+
+    clock.now += 61
+    assert client.get(f'/api/bst/sessions/{session_id}').status_code == 404
+    assert client.post('/api/bst', json={'session_id': session_id, 'operation': 'search',
+                                         'value': 1}).status_code == 404
+
+
+def test_deleted_session_is_gone(client):
+    session_id = client.post('/api/bst/sessions', json={}).get_json()['session_id']
+    assert client.delete(f'/api/bst/sessions/{session_id}').status_code == 204
+    assert client.delete(f'/api/bst/sessions/{session_id}').status_code == 404
+    assert client.get(f'/api/bst/sessions/{session_id}').status_code == 404
+
+
+def test_batch_over_the_step_budget_leaves_the_session_unchanged(client, monkeypatch):
+    import app
+    monkeypatch.setattr(app, 'MAX_BST_STEPS', 200)
+    session_id = client.post('/api/bst/sessions', json={'tree_type': 'red_black'}).get_json()['session_id']
+    response = client.post('/api/bst/batch', json={'session_id': session_id,
+                                                   'build': list(range(0, 100, 3))})
+    assert response.status_code == 200
+    before = client.get(f'/api/bst/sessions/{session_id}').get_json()['tree_state']
+
+    # Enough inserts and deletes to go over 200 steps part way through
+    operations = [{'operation': 'insert', 'value': v} for v in range(1, 100, 3)]
+    operations += [{'operation': 'delete', 'value': v} for v in range(0, 100, 3)]
+    response = client.post('/api/bst/batch', json={'session_id': session_id, 'operations': operations})
+    assert response.status_code == 413
+    assert response.get_json()['estimate']['max_steps'] == 200
+    assert client.get(f'/api/bst/sessions/{session_id}').get_json()['tree_state'] == before
+
+    # The restored tree still takes operations, with diffs against the state the client knows
+    response = client.post('/api/bst/batch', json={'session_id': session_id, 'operations': operations[:3]})
+    assert response.status_code == 200
+    tree = TREE_TYPES['red_black'].from_state(client.get(f'/api/bst/sessions/{session_id}').get_json()['tree_state'])
+    assert tree.is_valid() and inorder_values(tree.root) == sorted(set(range(0, 100, 3)) | {1, 4, 7})
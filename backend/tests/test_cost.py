@@ -0,0 +1,79 @@
+# backend/tests/test_cost.py
+import itertools
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from algorithms import registry
+from algorithms.cost import step_bounds, count_steps
+from dispatch import MAX_STATS_STEPS, OverBudget, parse_trace_request, select_job, plan_trace, run_trace
+
+
+def sample_arrays():
+    rng = random.Random(3)
+    for n in (1, 2, 3, 8, 9, 17, 40, 65, 300):
+        yield [rng.randint(0, 1000) for _ in range(n)]
+        yield [rng.randint(0, 3) for _ in range(n)]
+        yield list(range(n))
+        yield list(range(n, 0, -1))
+
+
+@pytest.mark.parametrize('spec', registry.all_algorithms(), ids=lambda spec: spec.id)
+def test_step_bounds_contain_the_count(spec):
+    for array in sample_arrays():
+        if spec.requires_sorted:
+            array = sorted(array)
+        targets = [array[len(array) // 2], -1] if 'target' in spec.params else [None]
+        for target, options in itertools.product(targets, itertools.product(*(c for _, c in spec.options))):
+            args = (() if target is None else (target,)) + options
+            low, high = step_bounds(spec.id, array, args)
+            assert low <= count_steps(spec.trace, array, args) <= high, (len(array), args)
+
+
+def plan(data):
+    job = parse_trace_request(data)
+    trace, array, args = select_job(job)
+    return job, trace, array, args
+
+
+def test_stats_refused_on_bounds_without_running():
+    job, trace, array, args = plan({'algorithm': 'Bubble Sort', 'array': list(range(20000, 0, -1)), 'mode': 'stats'})
+    with pytest.raises(OverBudget) as e:
+        plan_trace(job, trace, array, args)
+    assert e.value.estimate['steps'] > MAX_STATS_STEPS
+
+
+def test_targets_share_the_budget():
+    array = list(range(2000))
+    job, trace, array, args = plan({'algorithm': 'Binary Search', 'array': array,
+                                    'targets': list(range(0, 2000, 10)), 'max_steps': 1000})
+    with pytest.raises(OverBudget) as e:
+        run_trace(job, trace, array, args)
+    assert e.value.estimate['targets'] == 200
+
+
+def test_unknown_length_is_capped_at_the_budget():
+    # 8242 steps, which the bounds (4000 to 250999) cannot tell apart from 6000
+    rng = random.Random(5)
+    job, trace, array, args = plan({'algorithm': 'Quick Sort', 'array': [rng.randint(0, 99) for _ in range(500)],
+                                    'max_steps': 6000})
+    with pytest.raises(OverBudget) as e:
+        run_trace(job, trace, array, args)
+    assert e.value.estimate['steps'] == 6001 and not e.value.estimate['exact']
+    job['max_steps'] = 8242
+    steps = run_trace(job, trace, array, args)['steps']
+    assert len(steps) == 8242 and steps[-1]['action'] == 'complete'
+
+
+def test_loading_cost_imports_no_algorithm_module():
+    # A fresh interpreter, since the other tests have long imported every algorithm
+    code = ("import sys, dispatch; "
+            "print(sorted(m for m in sys.modules if m.startswith('algorithms.') and m not in "
+            "('algorithms.cost', 'algorithms.delta', 'algorithms.messages', 'algorithms.registry', "
+            "'algorithms.tracer')))")
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', code], cwd=backend, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
@@ -0,0 +1,46 @@
+# backend/tests/test_dispatch.py
+import random
+
+import pytest
+
+from dispatch import parse_trace_request, select_job, run_trace
+
+
+def select(data):
+    return select_job(parse_trace_request(data))
+
+
+def run(data):
+    job = parse_trace_request(data)
+    return run_trace(job, *select_job(job))
+
+
+@pytest.mark.parametrize('target', [float('nan'), float('inf'), float('-inf'), True, False, '3', None])
+def test_invalid_targets_are_rejected(target):
+    with pytest.raises(ValueError):
+        select({'algorithm': 'interpolation_search', 'array': [1, 2, 3, 4, 5, 6], 'target': target})
+    with pytest.raises(ValueError):
+        select({'algorithm': 'interpolation_search', 'array': [1, 2, 3, 4, 5, 6], 'targets': [2, target]})
+
+
+@pytest.mark.parametrize('target', [3, 2.5, -7, 10 ** 30])
+def test_finite_targets_are_accepted(target):
+    _, _, args = select({'algorithm': 'interpolation_search', 'array': [1, 2, 3, 4, 5, 6], 'target': target})
+    assert args[0] == target
+
+
+@pytest.mark.parametrize('algorithm', ['bubble_sort', 'bottom_up_merge_sort', 'quick_sort', 'heap_sort'])
+@pytest.mark.parametrize('max_frames', [2, 5, 50])
+def test_max_frames_is_reached(algorithm, max_frames):
+    rng = random.Random(11)
+    steps = run({'algorithm': algorithm, 'array': [rng.randint(0, 99) for _ in range(60)],
+                 'max_frames': max_frames})['steps']
+    assert len(steps) == max_frames
+    assert steps[0]['action'] == 'initial' and steps[-1]['action'] == 'complete'
+
+
+def test_downsample_reports_the_frames_kept():
+    rng = random.Random(12)
+    document = run({'algorithm': 'quick_sort', 'array': [rng.randint(0, 999) for _ in range(2000)],
+                    'max_steps': 7915, 'over_budget': 'downsample'})
+    assert document['budget']['frames'] == len(document['steps']) == 7915
@@ -0,0 +1,76 @@
+# backend/tests/test_trace_store.py
+import json
+import random
+
+import pytest
+
+from algorithms.delta import apply_delta_ops
+from algorithms.quick import trace_quick_sort
+from algorithms.tracer import ListSink
+from trace_store import TraceStore
+
+TRACE_ID = 'ab' * 32
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TraceStore(str(tmp_path))
+
+
+def test_round_trip_matches_delta_trace(store):
+    rng = random.Random(7)
+    array = [rng.randint(-1000, 1000) for _ in range(300)]
+    store.save(TRACE_ID, 'Quick Sort', trace_quick_sort, array, keyframe_interval=50)
+    # As the client sees it: tuples become lists
+    expected = json.loads(json.dumps(ListSink('delta', 50).run(trace_quick_sort, array)))
+
+    with store.open(TRACE_ID) as stored:
+        assert stored.algorithm == 'Quick Sort'
+        assert stored.initial() == expected['initial']
+        assert stored.step_count == len(expected['steps'])
+        assert stored.steps(0, stored.step_count) == expected['steps']
+
+        current = list(expected['initial'])
+        for index, step in enumerate(expected['steps']):
+            assert stored.array_before(index) == current
+            apply_delta_ops(current, step['ops'])
+        assert current == sorted(array)
+
+
+def test_round_trip_over_uint16_sizes(store):
+    # Highlight and op counts above 65535, as in the final step of a sort over a large array
+    n = 70_000
+
+    def trace_reverse(tracer):
+        yield tracer.step('initial')
+        for i in range(n // 2):
+            tracer.swap(i, n - 1 - i)
+        yield tracer.step('complete', range(n))
+
+    array = list(range(n))
+    store.save(TRACE_ID, 'Reverse', trace_reverse, array)
+
+    with store.open(TRACE_ID) as stored:
+        assert stored.array_len == n
+        initial, complete = stored.steps(0, 2)
+        assert initial['highlight_indices'] == []
+        assert complete['highlight_indices'] == list(range(n))
+        assert len(complete['ops']) == n // 2
+        assert apply_delta_ops(stored.initial(), complete['ops']) == array[::-1]
+
+
+def test_stale_format_is_not_reused(store):
+    with open(store.path(TRACE_ID), 'wb') as fp:
+        fp.write(b'ATRC\x02\x00')
+    assert not store.exists(TRACE_ID)
+    with pytest.raises(KeyError):
+        store.open(TRACE_ID)
+
+
+def test_round_trip_at_int64_limits(store):
+    # The extremes of the range create_trace accepts
+    array = [2 ** 63 - 1, -2 ** 63, 0, 5]
+    store.save(TRACE_ID, 'quick_sort', trace_quick_sort, array)
+    with store.open(TRACE_ID) as stored:
+        assert stored.initial() == array
+        assert stored.array_before(stored.step_count - 1) == sorted(array)
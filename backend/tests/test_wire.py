@@ -0,0 +1,130 @@
+# backend/tests/test_wire.py
+import gzip
+import json
+import random
+
+import pytest
+
+from algorithms.bst import AVLTree
+from dispatch import parse_trace_request, select_job, run_trace
+from wire import (JSON, MSGPACK, PACKED, HEADER, MIMETYPES, CONTENT_ENCODINGS, encode, compress,
+                  unpack_document)
+
+
+def trace_document(**data):
+    job = parse_trace_request(dict({'array': [5, 2, 9, 1, 7, 3]}, **data))
+    return run_trace(job, *select_job(job))
+
+
+def bst_document():
+    tree = AVLTree()
+    steps = []
+    for value in (4, 2, 6, 1):
+        steps += tree.apply('insert', value)[0]
+    return {'steps': steps, 'new_tree_state_dict': tree.to_dict()}
+
+
+DOCUMENTS = {
+    'full': lambda: trace_document(algorithm='quick_sort', options={'pivot': 'median_of_three'}),
+    'delta': lambda: trace_document(algorithm='heap_sort', format='delta', keyframe_interval=4),
+    'locale': lambda: trace_document(algorithm='bubble_sort', locale='en'),
+    'search': lambda: trace_document(algorithm='binary_search', target=7),
+    'targets': lambda: trace_document(algorithm='linear_search', targets=[2, 8]),
+    'reduced': lambda: trace_document(algorithm='merge_sort', array=list(range(40, 0, -1)), max_frames=10),
+    'stats': lambda: trace_document(algorithm='shell_sort', mode='stats'),
+    'floats': lambda: trace_document(algorithm='insertion_sort', array=[2.5, -1.0, 3e40, 0.0]),
+    'large_ints': lambda: trace_document(algorithm='selection_sort', array=[2 ** 40, 3, -2 ** 35, 7]),
+    'bst': bst_document,
+}
+
+
+def decode(body, mimetype):
+    if mimetype == MSGPACK:
+        import msgpack
+        return msgpack.unpackb(body, raw=False)
+    if mimetype == PACKED:
+        return unpack_document(body)
+    return json.loads(body)
+
+
+@pytest.mark.parametrize('mimetype', [JSON, MSGPACK, PACKED])
+@pytest.mark.parametrize('name', sorted(DOCUMENTS))
+def test_encode_decode_round_trip(name, mimetype):
+    if mimetype not in MIMETYPES:
+        pytest.skip(f"{mimetype} needs an optional package")
+    document = DOCUMENTS[name]()
+    # What every client sees: tuples and ranges turned into lists
+    expected = json.loads(json.dumps(document))
+    assert decode(encode(document, mimetype), mimetype) == expected
+
+
+def test_packed_trace_uses_typed_sections():
+    body = encode(DOCUMENTS['delta'](), PACKED)
+    _, _, _, meta_length = HEADER.unpack_from(body, 0)
+    meta = json.loads(body[HEADER.size:HEADER.size + meta_length])
+    # The steps are not in the JSON metadata but in typed arrays
+    assert 'steps' not in meta and 'initial' not in meta
+    assert {name for name, _, _ in meta['sections']} >= {'actions', 'ops', 'op_offsets', 'snapshots'}
+
+
+@pytest.mark.parametrize('content_encoding', ['zstd', 'gzip', 'identity'])
+def test_compress_round_trip(content_encoding):
+    if content_encoding not in CONTENT_ENCODINGS:
+        pytest.skip(f"{content_encoding} needs an optional package")
+    body = encode(DOCUMENTS['full'](), JSON)
+    compressed = compress(body, content_encoding)
+    if content_encoding == 'gzip':
+        compressed = gzip.decompress(compressed)
+    elif content_encoding == 'zstd':
+        import zstandard
+        compressed = zstandard.ZstdDecompressor().decompress(compressed)
+    assert compressed == body
+
+
+def test_unknown_content_encoding():
+    with pytest.raises(ValueError):
+        compress(b'{}', 'br')
+
+
+def test_json_refuses_nan():
+    with pytest.raises(ValueError):
+        encode({'value': float('nan')}, JSON)
+
+
+@pytest.fixture
+def client():
+    pytest.importorskip('flask')
+    import app
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize('mimetype', [JSON, MSGPACK, PACKED])
+@pytest.mark.parametrize('content_encoding', ['zstd', 'gzip', 'identity'])
+def test_negotiated_visualize_response(client, mimetype, content_encoding):
+    if mimetype not in MIMETYPES or content_encoding not in CONTENT_ENCODINGS:
+        pytest.skip("needs an optional package")
+    request = {'algorithm': 'quick_sort', 'array': [random.Random(2).randint(0, 50) for _ in range(30)]}
+    response = client.post('/api/visualize', json=request,
+                           headers={'Accept': mimetype, 'Accept-Encoding': content_encoding})
+    assert response.status_code == 200
+    assert response.mimetype == mimetype
+    assert response.headers.get('Content-Encoding', 'identity') == content_encoding
+    body = response.get_data()
+    if content_encoding == 'gzip':
+        body = gzip.decompress(body)
+    elif content_encoding == 'zstd':
+        import zstandard
+        body = zstandard.ZstdDecompressor().decompress(body)
+    assert decode(body, mimetype) == json.loads(json.dumps(trace_document(**request)))
+
+
+def test_unacceptable_format_is_406(client):
+    request = {'algorithm': 'bubble_sort', 'array': [3, 1, 2]}
+    response = client.post('/api/visualize', json=request, headers={'Accept': 'text/html'})
+    assert response.status_code == 406
+    assert 'error' in response.get_json()
+    # A streamed request is not negotiated: streamed steps and stats stay JSON
+    for mode in ('steps', 'stats'):
+        response = client.post('/api/visualize', json=dict(request, stream='ndjson', mode=mode),
+                               headers={'Accept': 'text/html'})
+        assert response.status_code == 200
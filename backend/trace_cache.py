@@ -0,0 +1,74 @@
+# backend/trace_cache.py
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def trace_key(*parts):
+    """
+    Builds the cache key of a trace request from its JSON-serializable parts
+    (algorithm name, input array, target, format, ...).
+    """
+    payload = json.dumps(parts, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class TraceCache:
+    """
+    LRU cache of serialized trace responses with a total size budget in bytes.
+
+    Values are the encoded response bodies, so their size is known exactly.
+    When an insert pushes the total over `max_bytes`, the least recently used
+    entries are evicted. A body larger than the whole budget is not cached.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = body
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
@@ -0,0 +1,228 @@
+# backend/trace_store.py
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+from array import array
+
+from algorithms.delta import apply_delta_ops, default_keyframe_interval
+from algorithms.tracer import Sink
+
+# File layout (all little-endian):
+#   header        magic, version, array length, step count, offsets position, metadata position
+#   initial array array length x int64
+#   step records  one per step, see RECORD / OP below; every keyframe_interval-th
+#                 record (except the first) ends with the full array as int64
+#   offsets       (step count + 1) x uint64, byte position of every step record (+ end)
+#   metadata      UTF-8 JSON: {"algorithm": ..., "actions": [action names by id], "keyframe_interval": ...}
+MAGIC = b'ATRC'
+VERSION = 3
+HEADER = struct.Struct('<4sHIQQQ')
+# action id, number of highlight indices, number of ops, length of the extra-fields JSON, has keyframe
+RECORD = struct.Struct('<HIIIB')
+# kind (0 = swap i j, 1 = write k value), first index, second index or written value
+OP = struct.Struct('<Biq')
+OP_KINDS = {'swap': 0, 'write': 1}
+OP_NAMES = ('swap', 'write')
+
+TRACE_ID_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+class StoreSink(Sink):
+    """
+    Writes a delta-mode trace into the binary trace file format.
+
+    Steps are written as they are produced, so the trace never has to fit in
+    memory; only an 8-byte offset per step is kept until the end. The file is
+    written under a temporary name and moved into place once complete.
+    """
+
+    def __init__(self, path, algorithm_name, keyframe_interval, reduce=None):
+        super().__init__('delta', keyframe_interval, reduce)
+        self.path = path
+        self.algorithm_name = algorithm_name
+
+    def consume(self, steps, tracer):
+        actions = {}
+        offsets = array('Q')
+        # A unique temporary name, so concurrent writers of the same trace do not collide
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0))
+                array_len = 0
+                for step in steps:
+                    keyframe = step.array
+                    if not offsets:
+                        # The first step always carries the initial snapshot
+                        array_len = len(keyframe)
+                        array('q', keyframe).tofile(fp)
+                        keyframe = None
+                    offsets.append(fp.tell())
+
+                    action_id = actions.setdefault(step.action, len(actions))
+                    indices = list(step.indices)
+                    extra = json.dumps(step.extra, separators=(',', ':')).encode() if step.extra else b''
+                    fp.write(RECORD.pack(action_id, len(indices), len(step.ops), len(extra), keyframe is not None))
+                    if indices:
+                        fp.write(struct.pack(f'<{len(indices)}i', *indices))
+                    for kind, a, b in step.ops:
+                        fp.write(OP.pack(OP_KINDS[kind], a, b))
+                    fp.write(extra)
+                    if keyframe is not None:
+                        array('q', keyframe).tofile(fp)
+
+                step_count = len(offsets)
+                offsets.append(fp.tell())
+                offsets_pos = fp.tell()
+                offsets.tofile(fp)
+
+                meta_pos = fp.tell()
+                fp.write(json.dumps({
+                    'algorithm': self.algorithm_name,
+                    'actions': list(actions),
+                    'keyframe_interval': self.keyframe_interval,
+                }).encode())
+
+                fp.seek(0)
+                fp.write(HEADER.pack(MAGIC, VERSION, array_len, step_count, offsets_pos, meta_pos))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        os.replace(tmp_path, self.path)
+        return step_count
+
+
+class StoredTrace:
+    """
+    Read-only view of a trace file through mmap: only the header, metadata and
+    the requested step records are ever touched.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.array_len, self.step_count, self._offsets_pos, meta_pos = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a trace file: {path}")
+        meta = json.loads(self._map[meta_pos:])
+        self.algorithm = meta['algorithm']
+        self.actions = meta['actions']
+        self.keyframe_interval = meta['keyframe_interval']
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def initial(self):
+        return self._read_array(HEADER.size)
+
+    def _offset(self, index):
+        return struct.unpack_from('<Q', self._map, self._offsets_pos + 8 * index)[0]
+
+    def _read_array(self, pos):
+        return list(array('q', self._map[pos:pos + 8 * self.array_len]))
+
+    def _read_step(self, pos):
+        """
+        Decodes the step record at `pos`; returns (action, indices, ops, extra,
+        keyframe position or None).
+        """
+        buf = self._map
+        action_id, n_indices, n_ops, extra_len, has_keyframe = RECORD.unpack_from(buf, pos)
+        pos += RECORD.size
+        indices = list(struct.unpack_from(f'<{n_indices}i', buf, pos))
+        pos += 4 * n_indices
+        ops = []
+        for _ in range(n_ops):
+            kind, a, b = OP.unpack_from(buf, pos)
+            ops.append([OP_NAMES[kind], a, b])
+            pos += OP.size
+        extra = json.loads(buf[pos:pos + extra_len]) if extra_len else None
+        keyframe_pos = pos + extra_len if has_keyframe else None
+        return self.actions[action_id], indices, ops, extra, keyframe_pos
+
+    def steps(self, start, stop):
+        """
+        Returns steps [start, stop) in the delta step format; keyframe steps
+        also carry their full array as 'keyframe'.
+        """
+        stop = min(stop, self.step_count)
+        result = []
+        for index in range(start, stop):
+            action, indices, ops, extra, keyframe_pos = self._read_step(self._offset(index))
+            step = {'action': action, 'highlight_indices': indices}
+            if extra:
+                step.update(extra)
+            step['ops'] = ops
+            if keyframe_pos is not None:
+                step['keyframe'] = self._read_array(keyframe_pos)
+            result.append(step)
+        return result
+
+    def array_before(self, index):
+        """
+        Rebuilds the array as it was before the ops of step `index` were applied:
+        the nearest keyframe at or before step index - 1, plus the ops of at
+        most keyframe_interval - 1 steps after it.
+        """
+        last = min(index, self.step_count) - 1
+        if last <= 0:
+            return self.initial()
+
+        keyframe_step = last - last % self.keyframe_interval
+        if keyframe_step == 0:
+            current = self.initial()
+        else:
+            current = self._read_array(self._read_step(self._offset(keyframe_step))[4])
+        for i in range(keyframe_step + 1, last + 1):
+            apply_delta_ops(current, self._read_step(self._offset(i))[2])
+        return current
+
+
+class TraceStore:
+    """A directory of trace files named by trace id."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, trace_id):
+        if not TRACE_ID_PATTERN.match(trace_id):
+            raise KeyError(trace_id)
+        return os.path.join(self.directory, trace_id + '.trace')
+
+    def exists(self, trace_id):
+        """Whether the trace is stored in the current file format (older versions are generated again)."""
+        try:
+            with open(self.path(trace_id), 'rb') as fp:
+                header = fp.read(6)
+        except FileNotFoundError:
+            return False
+        return header == MAGIC + struct.pack('<H', VERSION)
+
+    def save(self, trace_id, algorithm_name, trace, array, *args, keyframe_interval=None, reduce=None):
+        """
+        Runs `trace` (a trace_* generator function) and stores its steps, passed
+        through the `reduce` filter if given (see Sink); returns the step count.
+        """
+        if keyframe_interval is None:
+            keyframe_interval = default_keyframe_interval(len(array))
+        sink = StoreSink(self.path(trace_id), algorithm_name, keyframe_interval, reduce)
+        return sink.run(trace, array, *args)
+
+    def open(self, trace_id):
+        if not self.exists(trace_id):
+            raise KeyError(trace_id)
+        return StoredTrace(self.path(trace_id))
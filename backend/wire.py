@@ -0,0 +1,305 @@
+# backend/wire.py
+"""
+Wire formats of the /api/visualize and /api/bst responses. app.py picks one
+by content negotiation (Accept / Accept-Encoding):
+
+- application/json: the default.
+- application/msgpack: the same document as MessagePack (optional `msgpack`
+  package).
+- application/vnd.algoviz.packed: traces as typed arrays, see pack_document().
+
+and compresses the body with gzip or zstd (optional `zstandard` package).
+"""
+import gzip
+import json
+import struct
+import sys
+from array import array
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+PACKED = 'application/vnd.algoviz.packed'
+
+# Offered in this order of preference: JSON stays the default for */* and a missing Accept header
+MIMETYPES = (JSON,) + ((MSGPACK,) if msgpack is not None else ()) + (PACKED,)
+CONTENT_ENCODINGS = (('zstd',) if zstandard is not None else ()) + ('gzip', 'identity')
+
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+
+# Packed layout (little-endian):
+#   header    magic, version, reserved, length of the metadata
+#   metadata  UTF-8 JSON, padded to a multiple of 8 bytes; the document without its
+#             'steps', plus 'trace' (see _pack_trace) and 'sections': [[name, typecode, count], ...]
+#   sections  one typed array per entry of 'sections', each padded to a multiple of 8 bytes,
+#             so a client can view them in place (Int32Array, Float64Array, Uint16Array)
+MAGIC = b'ATRP'
+VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+ALIGN = 8
+OP_CODES = ('swap', 'write')
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+# Step keys stored in their own sections; all others are columns
+STEP_KEYS = ('action', 'highlight_indices', 'array', 'keyframe', 'ops')
+
+
+def dumps_json(document):
+    """
+    The JSON text of a response document. Keys are sorted (as by Flask's
+    jsonify) and NaN / Infinity are refused, since they are not JSON; the
+    batch workers encode with this too, so a cached body does not depend on
+    which endpoint produced it.
+    """
+    return json.dumps(document, sort_keys=True, allow_nan=False)
+
+
+def encode(document, mimetype):
+    """Serializes a response document in one of MIMETYPES."""
+    if mimetype == MSGPACK:
+        return msgpack.packb(document, use_bin_type=True)
+    if mimetype == PACKED:
+        return pack_document(document)
+    return dumps_json(document).encode()
+
+
+def compress(body, content_encoding):
+    """Compresses a response body with one of CONTENT_ENCODINGS."""
+    if content_encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    if content_encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    if content_encoding == 'identity':
+        return body
+    raise ValueError(f"Unsupported content encoding: {content_encoding}")
+
+
+def _is_int32(value):
+    return type(value) is int and INT32_MIN <= value <= INT32_MAX
+
+
+def _value_typecode(values):
+    """'i' (int32) when every value fits, 'd' (float64) for other numbers, None otherwise."""
+    typecode = 'i'
+    for value in values:
+        if _is_int32(value):
+            continue
+        if type(value) not in (int, float):
+            return None
+        typecode = 'd'
+    return typecode
+
+
+def _pack_trace(document, steps, sections):
+    """
+    Splits the steps into sections; returns the 'trace' metadata, or None when
+    the steps do not fit the packed layout (and stay JSON).
+
+    - actions: uint16 index into trace['actions'] per step
+    - highlight / highlight_offsets: the highlighted indices of all steps, and
+      where the indices of step s start (s + 1: where they end)
+    - ops / op_offsets: delta ops as (op code, i, j or value) triples, by step
+    - snapshots / snapshot_of: every distinct array snapshot once (steps of a
+      full trace share unchanged snapshots), and which one step s carries
+      (-1: none); trace['initial'] is the snapshot of a delta header
+    - col:<name>: int32 columns of extra fields every step has as an integer;
+      any other extra field is in trace['columns'] as JSON
+
+    Snapshots and ops are int32, or float64 (typecode 'd') as soon as one
+    value does not fit.
+    """
+    actions = {}
+    action_ids = array('H')
+    highlight, highlight_offsets = [], [0]
+    ops, op_offsets = [], [0]
+    snapshots, snapshot_ids = [], {}
+    snapshot_of = []
+    columns = {}
+    snapshot_key = 'keyframe' if document.get('format') == 'delta' else 'array'
+    n = len(steps)
+
+    def snapshot_index(values):
+        key = id(values)
+        if key not in snapshot_ids:
+            snapshot_ids[key] = len(snapshots)
+            snapshots.append(values)
+        return snapshot_ids[key]
+
+    initial = document.get('initial')
+    if isinstance(initial, list):
+        snapshot_index(initial)
+
+    for index, step in enumerate(steps):
+        if not isinstance(step, dict) or not isinstance(step.get('action'), str):
+            return None
+        action_ids.append(actions.setdefault(step['action'], len(actions)))
+        highlight.extend(step.get('highlight_indices', ()))
+        highlight_offsets.append(len(highlight))
+        for kind, a, b in step.get('ops', ()):
+            ops.extend((OP_CODES.index(kind), a, b))
+        op_offsets.append(len(ops) // 3)
+        values = step.get(snapshot_key)
+        snapshot_of.append(-1 if values is None else snapshot_index(values))
+        for key, value in step.items():
+            if key not in STEP_KEYS:
+                columns.setdefault(key, {})[index] = value
+
+    if len(actions) > 0xFFFF or not all(_is_int32(i) for i in highlight):
+        return None
+    array_length = len(snapshots[0]) if snapshots else 0
+    if any(len(values) != array_length for values in snapshots):
+        return None
+    typecode = _value_typecode(value for values in snapshots for value in values)
+    op_typecode = _value_typecode(ops)
+    if typecode is None or op_typecode is None:
+        return None
+    if op_typecode == 'd':
+        typecode = 'd'
+    flat = array(typecode)
+    for values in snapshots:
+        flat.extend(values)
+
+    sections += [
+        ('actions', action_ids),
+        ('highlight', array('i', highlight)),
+        ('highlight_offsets', array('i', highlight_offsets)),
+        ('ops', array(typecode, ops)),
+        ('op_offsets', array('i', op_offsets)),
+        ('snapshots', flat),
+        ('snapshot_of', array('i', snapshot_of)),
+    ]
+    json_columns = {}
+    for name, values in columns.items():
+        if len(values) == n and all(_is_int32(value) for value in values.values()):
+            sections.append((f'col:{name}', array('i', values.values())))
+        elif len(values) == n:
+            json_columns[name] = {'values': list(values.values())}
+        else:
+            # Only some steps have it
+            json_columns[name] = {'steps': list(values), 'values': list(values.values())}
+
+    trace = {
+        'steps': n,
+        'actions': list(actions),
+        'op_codes': list(OP_CODES),
+        'array_length': array_length,
+        'snapshots': len(snapshots),
+        'snapshot_key': snapshot_key,
+        'has_highlight': 'highlight_indices' in steps[0],
+        'has_ops': 'ops' in steps[0],
+        'columns': json_columns,
+    }
+    if isinstance(initial, list):
+        trace['initial'] = 0
+    return trace
+
+
+def _pad(length):
+    return -length % ALIGN
+
+
+def pack_document(document):
+    """
+    Encodes a response document in the packed layout (see above). Its 'steps'
+    become typed-array sections; everything else (and documents without
+    steps, such as stats) stays in the JSON metadata.
+    """
+    meta = dict(document)
+    sections = []
+    steps = meta.get('steps')
+    if isinstance(steps, list) and steps:
+        trace = _pack_trace(document, steps, sections)
+        if trace is not None:
+            del meta['steps']
+            meta.pop('initial', None)
+            meta['trace'] = trace
+        else:
+            sections = []
+
+    meta['sections'] = [[name, data.typecode, len(data)] for name, data in sections]
+    meta_bytes = json.dumps(meta, separators=(',', ':')).encode()
+    meta_bytes += b' ' * _pad(HEADER.size + len(meta_bytes))
+
+    parts = [HEADER.pack(MAGIC, VERSION, 0, len(meta_bytes)), meta_bytes]
+    for _, data in sections:
+        if sys.byteorder == 'big':
+            data = array(data.typecode, data)
+            data.byteswap()
+        raw = data.tobytes()
+        parts.append(raw + b'\0' * _pad(len(raw)))
+    return b''.join(parts)
+
+
+def _unpack_op(kind, a, b):
+    # In a float64 trace the indices come back as floats
+    if kind == 'swap':
+        return [kind, int(a), int(b)]
+    return [kind, int(a), b]
+
+
+def unpack_document(body):
+    """Decodes pack_document() output back into the response document."""
+    magic, version, _, meta_length = HEADER.unpack_from(body, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a packed document")
+    position = HEADER.size + meta_length
+    meta = json.loads(body[HEADER.size:position])
+
+    sections = {}
+    for name, typecode, count in meta.pop('sections'):
+        data = array(typecode)
+        size = data.itemsize * count
+        data.frombytes(body[position:position + size])
+        if sys.byteorder == 'big':
+            data.byteswap()
+        sections[name] = data.tolist()
+        position += size + _pad(size)
+
+    trace = meta.pop('trace', None)
+    if trace is None:
+        return meta
+
+    length = trace['array_length']
+    flat = sections['snapshots']
+    snapshots = [flat[i * length:(i + 1) * length] for i in range(trace['snapshots'])]
+    if 'initial' in trace:
+        meta['initial'] = snapshots[trace['initial']]
+
+    columns = {name[4:]: values for name, values in sections.items() if name.startswith('col:')}
+    partial = {}
+    for name, column in trace['columns'].items():
+        if 'steps' in column:
+            partial[name] = dict(zip(column['steps'], column['values']))
+        else:
+            columns[name] = column['values']
+
+    steps = []
+    highlight, highlight_offsets = sections['highlight'], sections['highlight_offsets']
+    ops, op_offsets = sections['ops'], sections['op_offsets']
+    for s in range(trace['steps']):
+        step = {'action': trace['actions'][sections['actions'][s]]}
+        if trace['has_highlight']:
+            step['highlight_indices'] = highlight[highlight_offsets[s]:highlight_offsets[s + 1]]
+        for name, values in columns.items():
+            step[name] = values[s]
+        for name, values in partial.items():
+            if s in values:
+                step[name] = values[s]
+        if trace['has_ops']:
+            step['ops'] = [_unpack_op(trace['op_codes'][int(ops[3 * k])], ops[3 * k + 1], ops[3 * k + 2])
+                           for k in range(op_offsets[s], op_offsets[s + 1])]
+        snapshot = sections['snapshot_of'][s]
+        if snapshot >= 0:
+            step[trace['snapshot_key']] = snapshots[snapshot]
+        steps.append(step)
+    meta['steps'] = steps
+    return meta